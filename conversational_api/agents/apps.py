@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class AgentsConfig(AppConfig):
+    name = 'agents'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from .db_connections import get_connection_counter
+
+        counter = get_connection_counter()
+        request_started.connect(counter.request_started, dispatch_uid='agents.db_connections.request_started')
+        connection_created.connect(counter.connection_created, dispatch_uid='agents.db_connections.connection_created')
@@ -0,0 +1,315 @@
+# agents/async_bland_client.py
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import APIException
+
+from .bland_client import RETRY_STATUSES, BlandClient, changed_fields, payload_field_hashes, retry_delay
+from .circuit_breaker import get_bland_breaker
+from .rate_limiter import bucket_for, get_rate_limiters
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBlandClient:
+    """
+    asyncio-native counterpart to BlandClient, for the ASGI deployment.
+    Requests are awaited on the event loop instead of blocking a thread each.
+    """
+    # Payloads are built exactly as the blocking client builds them.
+    _prepare_agent_payload = BlandClient._prepare_agent_payload
+    _prepare_pathway_payload = BlandClient._prepare_pathway_payload
+
+    def __init__(self):
+        self.base_url = settings.BLAND_AI_BASE_URL.rstrip('/')
+        self.api_key = os.getenv('BLAND_AI_API_KEY')
+        self.max_retries = settings.BLAND_AI_MAX_RETRIES
+        self.backoff_factor = settings.BLAND_AI_BACKOFF_FACTOR
+        self.request_budget = settings.BLAND_AI_REQUEST_BUDGET
+        self.breaker = get_bland_breaker()
+        self.rate_limiters = get_rate_limiters(self.api_key)
+        self.client = httpx.AsyncClient(
+            headers={
+                'Authorization': f'{self.api_key}',
+                'Content-Type': 'application/json',
+            },
+            limits=httpx.Limits(
+                max_connections=settings.BLAND_AI_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.BLAND_AI_POOL_MAXSIZE,
+            ),
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _request(self, method, url, timeout, idempotent=None, **kwargs):
+        """
+        Sends a request through the rate limiter and circuit breaker shared with BlandClient, retrying
+        429/502/503/504 responses and connection errors within the same `request_budget` deadline.
+        Non-idempotent calls are only retried when the attempt never reached Bland AI.
+        """
+        if idempotent is None:
+            idempotent = method.upper() != 'POST'
+        limiter = self.rate_limiters[bucket_for(method)]
+        deadline = time.monotonic() + self.request_budget
+        await self._wait_for_token(limiter, deadline)
+        self.breaker.before_call()
+        try:
+            response = await self._send(method, url, timeout, idempotent, limiter, deadline, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release_call()  # Cancelled: no outcome, but the trial slot must be given back
+            raise
+        if response.status_code in RETRY_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    async def _send(self, method, url, timeout, idempotent, limiter, deadline, **kwargs):
+        """
+        The retry loop of `_request`, which records its outcome with the breaker.
+        """
+        attempt = 0
+        while True:
+            if attempt:
+                await self._wait_for_token(limiter, deadline)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise httpx.TimeoutException(f"Bland AI request budget of {self.request_budget}s exhausted.")
+
+            error = None
+            response = None
+            try:
+                response = await self.client.request(method, url, timeout=min(timeout, remaining), **kwargs)
+            except (httpx.ConnectError, httpx.RemoteProtocolError, httpx.TimeoutException) as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+
+            attempt += 1
+            delay = retry_delay(response, attempt, self.backoff_factor)
+            retryable = idempotent or _never_reached_bland(response, error)
+            if not retryable or attempt > self.max_retries or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return response
+
+            await asyncio.sleep(delay)
+
+    async def _wait_for_token(self, limiter, deadline):
+        """
+        Async counterpart of BlandClient._wait_for_token. The cache round trip runs in a thread.
+        """
+        wait = await sync_to_async(limiter.reserve)() if limiter.enabled else 0
+        if not wait:
+            return
+        if time.monotonic() + wait >= deadline:
+            raise httpx.TimeoutException(
+                f"Bland AI rate limit wait of {wait:.2f}s does not fit the {self.request_budget}s request budget."
+            )
+        await asyncio.sleep(wait)
+
+    async def _record_synced_fields(self, instance, payload, persist=True):
+        """
+        Async counterpart of bland_client.record_synced_fields.
+        """
+        state = dict(instance.bland_sync_state or {})
+        state.update(payload_field_hashes(payload))
+        instance.bland_sync_state = state
+        if persist and instance.pk:
+            await type(instance).objects.filter(pk=instance.pk).aupdate(bland_sync_state=state)
+
+    async def create_agent(self, agent, request_data):
+        """
+        Creates an agent in Bland AI using the script as the prompt.
+        Returns the `bland_ai_id` of the created agent.
+        """
+        url = f"{self.base_url}/agents"
+        payload = self._prepare_agent_payload(agent, request_data)
+
+        try:
+            logger.info(f"Creating agent at URL: {url}")
+            logger.info(f"Request Payload: {json.dumps(payload, indent=4)}")
+
+            response = await self._request('POST', url, json=payload, timeout=60)
+            response.raise_for_status()
+            response_data = response.json()
+            logger.info(f"Agent Created in Bland Systems successfully")
+
+            bland_ai_id = response_data.get('agent', {}).get('agent_id')
+            if not bland_ai_id:
+                logger.error("Response does not contain 'agent_id'")
+                raise APIException("Failed to retrieve bland_ai_id from Bland AI.")
+
+            await self._record_synced_fields(agent, payload, persist=False)
+            return bland_ai_id
+        except APIException:
+            raise
+        except httpx.TimeoutException:
+            logger.error("Request to Bland AI timed out.", exc_info=True)
+            raise APIException("Timed out while creating agent in Bland AI.")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error occurred: {e}", exc_info=True)
+            raise APIException("HTTP error occurred while creating agent in Bland AI.")
+        except httpx.HTTPError as e:
+            logger.error(f"Request exception occurred: {e}", exc_info=True)
+            raise APIException("Failed to create agent in Bland AI.")
+
+    async def update_agent(self, agent, request_data):
+        """
+        Update an existing agent in Bland AI.
+        """
+        if not agent.bland_ai_id:
+            logger.error("Agent does not have a valid bland_ai_id.")
+            raise ValueError("Agent must have a valid bland_ai_id to update.")
+
+        url = f"{self.base_url}/agents/{agent.bland_ai_id}"
+        payload = changed_fields(agent, self._prepare_agent_payload(agent, request_data))
+        if not payload:
+            logger.info(f"Agent '{agent.name}' has no changes for Bland AI. Skipping update.")
+            return None
+
+        try:
+            logger.info(f"Updating agent at URL: {url}")
+            response = await self._request('POST', url, json=payload, timeout=30, idempotent=True)
+            logger.info(f"Response Status Code: {response.status_code}")
+            response.raise_for_status()
+            await self._record_synced_fields(agent, payload)
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Error updating agent in Bland AI: {e}", exc_info=True)
+            raise
+
+    async def get_agent(self, bland_ai_id):
+        """
+        Retrieve an agent from Bland AI.
+        """
+        url = f"{self.base_url}/agents/{bland_ai_id}"
+
+        try:
+            logger.info(f"Retrieving agent from URL: {url}")
+            response = await self._request('GET', url, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Error retrieving agent from Bland AI: {e}", exc_info=True)
+            raise
+
+    async def delete_agent(self, bland_ai_id):
+        """
+        Delete an agent from Bland AI using the agent's Bland AI ID.
+        """
+        url = f"{self.base_url}/agents/{bland_ai_id}/delete"
+
+        try:
+            logger.info(f"Sending delete request to URL: {url}")
+            response = await self._request('POST', url, timeout=30, idempotent=True)
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Error deleting agent in Bland AI: {e}", exc_info=True)
+
+    async def create_conversational_pathway(self, pathway, request_data):
+        """
+        Create a conversational pathway in Bland AI.
+        """
+        url = f"{self.base_url}/convo_pathway/create"
+        payload = self._prepare_pathway_payload(pathway, request_data)
+
+        try:
+            logger.info(f"Creating conversational pathway at URL: {url}")
+            response = await self._request('POST', url, json=payload, timeout=30)
+            response_data = response.json()
+            if response.status_code == 200:
+                logger.info(f"Conversational Pathway Created in Bland Systems successfully")
+                await self._record_synced_fields(pathway, payload, persist=False)
+            return response_data.get("pathway_id")
+        except httpx.HTTPError as e:
+            logger.error(f"Error creating conversational pathway in Bland AI: {e}", exc_info=True)
+            raise
+
+    async def update_conversational_pathway(self, pathway, request_data):
+        """
+        Update a conversational pathway in Bland AI.
+        """
+        url = f"{self.base_url}/convo_pathway/{pathway.bland_ai_pathway_id}"
+        payload = changed_fields(pathway, self._prepare_pathway_payload(pathway, request_data))
+        if not payload:
+            logger.info(f"Conversational Pathway '{pathway.name}' has no changes for Bland AI. Skipping update.")
+            return None
+
+        try:
+            logger.info(f"Updating conversational pathway at URL: {url}")
+            response = await self._request('POST', url, json=payload, timeout=30, idempotent=True)
+            if response.status_code == 200:
+                logger.info(f"Conversational Pathway Updated in Bland Systems successfully")
+                await self._record_synced_fields(pathway, payload)
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Error updating conversational pathway in Bland AI: {e}", exc_info=True)
+            raise
+
+    async def get_conversational_pathway(self, bland_ai_pathway_id):
+        """
+        Retrieve a conversational pathway from Bland AI.
+        """
+        url = f"{self.base_url}/convo_pathway/{bland_ai_pathway_id}"
+
+        try:
+            logger.info(f"Retrieving conversational pathway from URL: {url}")
+            response = await self._request('GET', url, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Error retrieving conversational pathway from Bland AI: {e}", exc_info=True)
+            raise
+
+    async def delete_conversational_pathway(self, bland_ai_pathway_id):
+        """
+        Delete a conversational pathway in Bland AI.
+        """
+        url = f"{self.base_url}/convo_pathway/{bland_ai_pathway_id}"
+
+        try:
+            logger.info(f"Sending delete request for conversational pathway at URL: {url}")
+            response = await self._request('DELETE', url, timeout=30)
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Error deleting conversational pathway in Bland AI: {e}", exc_info=True)
+            raise
+
+
+def _never_reached_bland(response, error):
+    """
+    httpx counterpart of bland_client.never_reached_bland.
+    """
+    if response is not None:
+        return response.status_code == 429
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_bland_client():
+    """
+    Returns the AsyncBlandClient for the running event loop.
+    httpx connection pools are bound to the loop that opened them, so each loop gets its own client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncBlandClient()
+        _async_clients[loop] = client
+    return client
@@ -0,0 +1,257 @@
+# agents/async_views.py
+import json
+import logging
+from abc import ABC, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .async_bland_client import AsyncBlandClient, get_async_bland_client
+from .concurrency import ETAG_HEADER, PreconditionFailed, UpdateConflict, check_version, etag, expected_versions
+from .idempotency import arun_idempotent
+from .models import Agent, BlandSyncEvent, ConversationalPathway, SyncStatus, VersionConflict
+from .outbox import enqueue_sync, sync_via_outbox
+from .renderers import FastJSONRenderer
+from .serializers import AgentSerializer, ConversationalPathwaySerializer
+
+logger = logging.getLogger(__name__)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncBlandSyncView(ABC, View):
+    """
+    Async write endpoints (create, update, partial update, delete) for a model synchronized with Bland AI.
+    Database work runs through sync_to_async; Bland AI calls are awaited on the event loop, so a single
+    worker can keep many Bland round-trips in flight without holding a thread for each.
+    In outbox sync mode writes only queue their Bland AI call and answer 202, like OutboxSyncMixin, and
+    creates honour the `Idempotency-Key` header like IdempotencyMixin.
+    Subclasses set `model` and `serializer_class` and implement the sync_create/sync_update/sync_delete hooks.
+    """
+    model = None
+    serializer_class = None
+    http_method_names = ['post', 'put', 'patch', 'delete']
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except ValidationError as e:
+            return self.render(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except APIException as e:
+            return self.render({'detail': e.detail}, status=e.status_code)
+        except Http404:
+            return self.render({'detail': 'No %s matches the given query.' % self.model._meta.object_name},
+                               status=status.HTTP_404_NOT_FOUND)
+
+    def render(self, data, status=status.HTTP_200_OK):
+        if data is None:
+            return HttpResponse(status=status)
+        return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+    def parse(self, request):
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            raise ValidationError({'detail': 'JSON parse error.'})
+
+    async def get_object(self, pk):
+        try:
+            return await self.model.objects.aget(pk=pk)
+        except self.model.DoesNotExist:
+            raise Http404
+
+    async def post(self, request, pk=None):
+        if pk is not None:
+            return self.render({'detail': 'Method "POST" not allowed.'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        data = self.parse(request)
+        return await arun_idempotent(request, data, lambda: self.create(data), self.render)
+
+    async def create(self, data):
+        serializer = self.serializer_class(data=data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        if sync_via_outbox():
+            await sync_to_async(self.save_deferred)(serializer, BlandSyncEvent.Operation.CREATE, data)
+            return self.render(await sync_to_async(lambda: serializer.data)(), status=status.HTTP_202_ACCEPTED)
+
+        instance = await sync_to_async(serializer.save)()
+        try:
+            await self.sync_create(get_async_bland_client(), instance, data)
+        except Exception as e:
+            logger.error(f"Error during async creation of {instance}: {e}", exc_info=True)
+            await instance.adelete()
+            if isinstance(e, APIException):
+                raise
+            raise APIException(f"Failed to create {self.model._meta.verbose_name} in Bland AI.")
+
+        return self.render(await sync_to_async(lambda: self.serializer_class(instance).data)(),
+                           status=status.HTTP_201_CREATED)
+
+    async def put(self, request, pk=None, partial=False):
+        instance = await self.get_object(pk)
+        data = self.parse(request)
+        versions = expected_versions(request.headers, data)
+        check_version(instance, versions)
+        serializer = self.serializer_class(instance, data=data, partial=partial)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+
+        if sync_via_outbox():
+            instance = await self.save(serializer, versions, deferred=True)
+            response = self.render(await sync_to_async(lambda: serializer.data)(), status=status.HTTP_202_ACCEPTED)
+            response[ETAG_HEADER] = etag(instance.version)
+            return response
+
+        # Push the validated changes to Bland AI before saving, so a failed push leaves the local row untouched.
+        # Model validation and the version check run first, so Bland AI never gets a write the save then refuses.
+        for attr, value in serializer.validated_data.items():
+            setattr(instance, attr, value)
+        await sync_to_async(self.full_clean)(instance)
+        if not await self.model.objects.filter(pk=instance.pk, version=instance.version).aexists():
+            raise PreconditionFailed() if versions is not None else UpdateConflict()
+        try:
+            await self.sync_update(get_async_bland_client(), instance, data)
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"Error during async update of {instance}: {e}", exc_info=True)
+            raise APIException(f"Failed to update {self.model._meta.verbose_name} and synchronize with Bland AI.")
+
+        instance = await self.save(serializer, versions)
+        response = self.render(await sync_to_async(lambda: serializer.data)())
+        response[ETAG_HEADER] = etag(instance.version)
+        return response
+
+    async def patch(self, request, pk=None):
+        return await self.put(request, pk=pk, partial=True)
+
+    async def delete(self, request, pk=None):
+        instance = await self.get_object(pk)
+        if sync_via_outbox():
+            instance_id = instance.pk
+            await sync_to_async(self.delete_deferred)(instance)
+            return self.render({'id': instance_id, 'sync_status': SyncStatus.PENDING}, status=status.HTTP_202_ACCEPTED)
+
+        try:
+            await self.sync_delete(get_async_bland_client(), instance)
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"Error during async deletion of {instance}: {e}", exc_info=True)
+            raise APIException(f"Failed to delete {self.model._meta.verbose_name} from Bland AI and locally.")
+
+        await instance.adelete()
+        return self.render(None, status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def full_clean(instance):
+        try:
+            instance.full_clean()
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
+
+    async def save(self, serializer, versions, deferred=False):
+        """
+        Saves an update, mapping a lost version race to 412 (If-Match given) or 409. It is not retried:
+        inline, Bland AI already has this write, so the client decides.
+        """
+        try:
+            if deferred:
+                return await sync_to_async(self.save_deferred)(serializer, BlandSyncEvent.Operation.UPDATE,
+                                                               serializer.initial_data)
+            return await sync_to_async(serializer.save)()
+        except VersionConflict as e:
+            logger.warning(f"{e} Async update of {serializer.instance} not saved.")
+            raise PreconditionFailed() if versions is not None else UpdateConflict()
+
+    def save_deferred(self, serializer, operation, data):
+        with transaction.atomic():
+            instance = serializer.save()
+            enqueue_sync(instance, operation, data)
+        logger.info(f"{instance._meta.verbose_name} '{instance.name}' saved locally with ID {instance.id}, Bland AI sync queued.")
+        return instance
+
+    def delete_deferred(self, instance):
+        with transaction.atomic():
+            enqueue_sync(instance, BlandSyncEvent.Operation.DELETE)
+            instance.delete()
+        logger.info(f'{instance._meta.verbose_name} "{instance.name}" deleted locally, Bland AI deletion queued.')
+
+    @abstractmethod
+    async def sync_create(self, client, instance, data):
+        """
+        Creates the saved `instance` in Bland AI and stores its remote id; raising rolls the create back.
+        """
+
+    @abstractmethod
+    async def sync_update(self, client, instance, data):
+        """
+        Pushes the validated, not yet saved, changes on `instance` to Bland AI; raising leaves the row untouched.
+        """
+
+    @abstractmethod
+    async def sync_delete(self, client, instance):
+        """
+        Deletes `instance` from Bland AI before it is deleted locally.
+        """
+
+
+class AsyncAgentView(AsyncBlandSyncView):
+    """
+    Async create/update/delete for Agent instances.
+    """
+    model = Agent
+    serializer_class = AgentSerializer
+
+    async def sync_create(self, client: AsyncBlandClient, agent, data):
+        agent.bland_ai_id = await client.create_agent(agent, data)
+        agent.sync_status = SyncStatus.SYNCED
+        await agent.asave()
+        logger.info(f"Agent '{agent.name}' synchronized with Bland AI, bland_ai_id: {agent.bland_ai_id}.")
+
+    async def sync_update(self, client: AsyncBlandClient, agent, data):
+        if not agent.bland_ai_id:
+            logger.error("Agent does not have a valid bland_ai_id.")
+            raise APIException("Agent lacks a valid Bland AI ID.")
+        await client.update_agent(agent, data)
+        logger.info(f"Agent '{agent.name}' synchronized with Bland AI.")
+
+    async def sync_delete(self, client: AsyncBlandClient, agent):
+        if agent.bland_ai_id:
+            await client.delete_agent(agent.bland_ai_id)
+            logger.info(f'Agent "{agent.name}" successfully deleted from Bland AI.')
+        else:
+            logger.warning(f'Agent "{agent.name}" has no bland_ai_id. Skipping Bland AI deletion.')
+
+
+class AsyncConversationalPathwayView(AsyncBlandSyncView):
+    """
+    Async create/update/delete for ConversationalPathway instances.
+    """
+    model = ConversationalPathway
+    serializer_class = ConversationalPathwaySerializer
+
+    async def sync_create(self, client: AsyncBlandClient, pathway, data):
+        pathway.bland_ai_pathway_id = await client.create_conversational_pathway(pathway, data)
+        pathway.sync_status = SyncStatus.SYNCED
+        await pathway.asave()
+        logger.info(f"Conversational Pathway '{pathway.name}' synchronized with Bland AI, "
+                    f"bland_ai_pathway_id: {pathway.bland_ai_pathway_id}.")
+
+    async def sync_update(self, client: AsyncBlandClient, pathway, data):
+        if not pathway.bland_ai_pathway_id:
+            logger.error("Conversational Pathway does not have a valid bland_ai_pathway_id.")
+            raise APIException("Conversational Pathway lacks a valid Bland AI Pathway ID.")
+        await client.update_conversational_pathway(pathway, data)
+        logger.info(f"Conversational Pathway '{pathway.name}' synchronized with Bland AI.")
+
+    async def sync_delete(self, client: AsyncBlandClient, pathway):
+        if pathway.bland_ai_pathway_id:
+            await client.delete_conversational_pathway(pathway.bland_ai_pathway_id)
+            logger.info(f'Conversational Pathway "{pathway.name}" successfully deleted from Bland AI.')
+        else:
+            logger.warning(f'Conversational Pathway "{pathway.name}" has no bland_ai_pathway_id. Skipping Bland AI deletion.')
@@ -1,63 +1,290 @@
 # agents/bland_client.py
 import requests
+import hashlib
 import os
+import socket
+import threading
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from .serializers import AgentSerializer, ConversationalPathway, ConversationalPathwaySerializer
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import NewConnectionError
+from .circuit_breaker import get_bland_breaker
+from .rate_limiter import bucket_for, get_rate_limiters
+from .serializers import AgentSerializer, ConversationalPathway, ConversationalPathwaySerializer, get_row_mapper
 from rest_framework.exceptions import APIException
 import json
 
 logger = logging.getLogger(__name__)
 
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+def never_reached_bland(response, error):
+    """
+    True when a failed attempt certainly was not processed by Bland AI, so that even a create can be sent again:
+    it was rate limited, or the connection was never established.
+    """
+    if response is not None:
+        return response.status_code == 429
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def retry_delay(response, attempt, backoff_factor):
+    """
+    Exponential backoff for `attempt`, stretched to the Retry-After of a 429 when Bland AI sends one.
+    """
+    delay = backoff_factor * (2 ** (attempt - 1))
+    if response is not None and response.status_code == 429:
+        try:
+            delay = max(delay, float(response.headers.get('Retry-After', 0)))
+        except ValueError:
+            pass
+    return delay
+
+# Serializer fields that only mean something locally; a change to them alone never triggers a Bland AI update
+LOCAL_ONLY_FIELDS = {
+    'id', 'bland_ai_id', 'bland_ai_pathway_id', 'version', 'sync_status', 'created_at', 'updated_at',
+}
+
+
+def payload_field_hashes(payload):
+    """
+    Returns a short hash of every value in a Bland AI payload, keyed by field name.
+    """
+    return {
+        key: hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:32]
+        for key, value in payload.items()
+    }
+
+
+def changed_fields(instance, payload):
+    """
+    Drops the payload fields whose value is identical to the one last synced to Bland AI for `instance`,
+    along with local bookkeeping fields a client may echo back when re-saving a whole form.
+    """
+    synced = instance.bland_sync_state or {}
+    hashes = payload_field_hashes(payload)
+    return {
+        key: value for key, value in payload.items()
+        if key not in LOCAL_ONLY_FIELDS and synced.get(key) != hashes[key]
+    }
+
+
+def record_synced_fields(instance, payload, persist=True):
+    """
+    Stores the hashes of a payload Bland AI accepted, so the next update can skip unchanged fields.
+    Creates pass `persist=False`: their callers save the new remote id, and the state with it.
+    """
+    state = dict(instance.bland_sync_state or {})
+    state.update(payload_field_hashes(payload))
+    instance.bland_sync_state = state
+    if persist and instance.pk:
+        # Queryset update so recording the snapshot does not bump the version counter
+        type(instance).objects.filter(pk=instance.pk).update(bland_sync_state=state)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that turns on TCP keep-alive for the sockets in its connection pool,
+    so idle connections to Bland AI survive between requests.
+    """
+    def __init__(self, keepalive=True, **kwargs):
+        self.keepalive = keepalive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.keepalive:
+            kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
+    def pool_stats(self):
+        """
+        Returns connection counters summed over every host pool held by this adapter.
+        """
+        opened = 0
+        requests_sent = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+        return {
+            'pools': len(pools),
+            'connections_opened': opened,
+            'requests': requests_sent,
+            'connections_reused': max(requests_sent - opened, 0),
+        }
+
+
 class BlandClient:
     def __init__(self):
-        self.base_url = 'https://api.bland.ai/v1'
-        self.api_key = os.getenv('BLAND_AI_API_KEY')        
+        self.base_url = settings.BLAND_AI_BASE_URL.rstrip('/')
+        self.api_key = os.getenv('BLAND_AI_API_KEY')
+        self.pool_connections = settings.BLAND_AI_POOL_CONNECTIONS
+        self.pool_maxsize = settings.BLAND_AI_POOL_MAXSIZE
+        self.keepalive = settings.BLAND_AI_KEEPALIVE
+        self.max_retries = settings.BLAND_AI_MAX_RETRIES
+        self.backoff_factor = settings.BLAND_AI_BACKOFF_FACTOR
+        self.request_budget = settings.BLAND_AI_REQUEST_BUDGET
+        self.breaker = get_bland_breaker()
+        self.rate_limiters = get_rate_limiters(self.api_key)
         self.session = self._init_session()
 
     def _init_session(self):
         session = requests.Session()
-        retries = Retry(
-            total=5,
-            backoff_factor=1,
-            status_forcelist=[502, 503, 504],
-            allowed_methods=["HEAD", "GET", "PUT", "OPTIONS", "POST"]
+        # Retries are done by _request so they can be capped by the request budget
+        self.adapter = PooledHTTPAdapter(
+            keepalive=self.keepalive,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
         )
-        session.mount('https://', HTTPAdapter(max_retries=retries))
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
         session.headers.update({
             'Authorization': f'{self.api_key}',
             'Content-Type': 'application/json',
         })
         return session
 
+    def _request(self, method, url, timeout=30, idempotent=None, **kwargs):
+        """
+        Sends a request through the shared rate limiter and circuit breaker.
+
+        429/502/503/504 responses and connection errors are retried with exponential backoff, but every
+        attempt's timeout, every backoff sleep and every wait for a rate limit token must fit in the
+        `request_budget` deadline. A call that still fails when the retries or the budget run out
+        counts as one breaker failure.
+
+        Non-idempotent calls (POST unless `idempotent=True`) are only retried when the attempt never
+        reached Bland AI, so a retry can not create a second remote object.
+        """
+        if idempotent is None:
+            idempotent = method.upper() != 'POST'
+        limiter = self.rate_limiters[bucket_for(method)]
+        deadline = time.monotonic() + self.request_budget
+        self._wait_for_token(limiter, deadline)
+        self.breaker.before_call()
+        try:
+            response = self._send(method, url, timeout, idempotent, limiter, deadline, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release_call()  # Interrupted: no outcome, but a trial slot must be given back
+            raise
+        if response.status_code in RETRY_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _send(self, method, url, timeout, idempotent, limiter, deadline, **kwargs):
+        """
+        The retry loop of `_request`. Returns the last response or raises the last error; the caller
+        records the outcome with the breaker, whatever the exception.
+        """
+        attempt = 0
+        while True:
+            if attempt:
+                self._wait_for_token(limiter, deadline)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.exceptions.Timeout(f"Bland AI request budget of {self.request_budget}s exhausted.")
+
+            error = None
+            response = None
+            try:
+                response = self.session.request(method, url, timeout=min(timeout, remaining), **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+
+            attempt += 1
+            delay = retry_delay(response, attempt, self.backoff_factor)
+            retryable = idempotent or never_reached_bland(response, error)
+            if not retryable or attempt > self.max_retries or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return response
+
+            logger.warning(f"Retrying {method} {url} in {delay}s (attempt {attempt}/{self.max_retries}).")
+            time.sleep(delay)
+
+    def _wait_for_token(self, limiter, deadline):
+        """
+        Blocks until `limiter` lets this request through, or raises Timeout if that is past the deadline.
+        """
+        wait = limiter.reserve()
+        if not wait:
+            return
+        if time.monotonic() + wait >= deadline:
+            raise requests.exceptions.Timeout(
+                f"Bland AI rate limit wait of {wait:.2f}s does not fit the {self.request_budget}s request budget."
+            )
+        logger.info(f"Waiting {wait:.2f}s for Bland AI rate limiter '{limiter.name}'.")
+        time.sleep(wait)
+
+    def rate_limit_stats(self):
+        """
+        Returns the configured rate and current wait in seconds of the read and write buckets.
+        """
+        return {kind: limiter.stats() for kind, limiter in self.rate_limiters.items()}
+
+    def pool_stats(self):
+        """
+        Returns how many connections this client has opened and how many requests reused one.
+        """
+        return self.adapter.pool_stats()
+
+    def warm(self, connections):
+        """
+        Opens up to `connections` pooled connections to Bland AI ahead of the first real request.
+        Returns the number of warm-up requests that completed.
+        """
+        connections = min(connections, self.pool_maxsize)
+        if connections <= 0:
+            return 0
+
+        def _touch(_):
+            try:
+                self.session.head(self.base_url, timeout=5)
+                return True
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Failed to warm Bland AI connection: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            warmed = sum(executor.map(_touch, range(connections)))
+        logger.info(f"Warmed {warmed} Bland AI connection(s): {self.pool_stats()}")
+        return warmed
+
     def _prepare_agent_payload(self, agent, request_data):
         """
         Prepares the JSON payload for creating or updating an agent in Bland AI.
-        Only includes fields specified in the request data.
+        Only includes fields specified in the request data, represented as `AgentSerializer` would.
         """
-        serializer = AgentSerializer(agent)
-        data = serializer.data
-        
-        # Filter out fields that were not in the original request
-        cleaned_data = {key: data[key] for key in request_data if key in data}
-        
-        return cleaned_data
-    
-    def _prepare_pathway_payload(self, agent, request_data):
+        return get_row_mapper(AgentSerializer).map_instance(agent, request_data)
+
+    def _prepare_pathway_payload(self, pathway, request_data):
         """
-        Prepares the JSON payload for creating or updating an agent in Bland AI.
-        Only includes fields specified in the request data.
+        Prepares the JSON payload for creating or updating a pathway in Bland AI.
+        Only includes fields specified in the request data, represented as the pathway serializer would.
         """
-        serializer = ConversationalPathwaySerializer(agent)
-        data = serializer.data
-        
-        # Filter out fields that were not in the original request
-        cleaned_data = {key: data[key] for key in request_data if key in data}
-        
-        return cleaned_data
+        return get_row_mapper(ConversationalPathwaySerializer).map_instance(pathway, request_data)
 
-        
     def create_agent(self, agent, request_data):
         """
         Creates an agent in Bland AI using the script as the prompt.
@@ -71,7 +298,7 @@ class BlandClient:
             logger.info(f"Request Payload: {json.dumps(payload, indent=4)}")
             
             # Send the request
-            response = self.session.post(url, json=payload, timeout=60)
+            response = self._request('POST', url, json=payload, timeout=60)
 
             if response.status_code == 200:
                 logger.info(f"Agent Created in Bland Systems successfully")
@@ -84,8 +311,11 @@ class BlandClient:
             if not bland_ai_id:
                 logger.error("Response does not contain 'agent_id'")
                 raise APIException("Failed to retrieve bland_ai_id from Bland AI.")
-            
+
+            record_synced_fields(agent, payload, persist=False)
             return bland_ai_id
+        except APIException:
+            raise
         except requests.exceptions.Timeout:
             logger.error("Request to Bland AI timed out.", exc_info=True)
             raise APIException("Timed out while creating agent in Bland AI.")
@@ -108,14 +338,17 @@ class BlandClient:
             raise ValueError("Agent must have a valid bland_ai_id to update.")
         
         url = f"{self.base_url}/agents/{agent.bland_ai_id}"
-        payload = self._prepare_agent_payload(agent, request_data)
+        payload = changed_fields(agent, self._prepare_agent_payload(agent, request_data))
+        if not payload:
+            logger.info(f"Agent '{agent.name}' has no changes for Bland AI. Skipping update.")
+            return None
 
         try:
             logger.info(f"Updating agent at URL: {url}")
             logger.info(f"Request Payload: {payload}")
 
             # Make the POST request to Bland AI API with headers and timeout
-            response = self.session.post(url, json=payload, timeout=30)
+            response = self._request('POST', url, json=payload, timeout=30, idempotent=True)
                         
             logger.info(f"Response Status Code: {response.status_code}")
             logger.info(f"Response Text: {response.text}")
@@ -123,6 +356,7 @@ class BlandClient:
             # Raise an error if the response contains an HTTP error status code
             response.raise_for_status()
 
+            record_synced_fields(agent, payload)
             # Return the response data as JSON
             return response.json()
 
@@ -149,7 +383,7 @@ class BlandClient:
             logger.info(f"Sending delete request to URL: {url}")
 
             # Make the request to delete the agent from Bland AI
-            response = self.session.post(url, timeout=30)
+            response = self._request('POST', url, timeout=30, idempotent=True)
 
             # Return the parsed response data
             return response.json()
@@ -172,12 +406,13 @@ class BlandClient:
             logger.info(f"Request Payload: {json.dumps(payload, indent=4)}")
             
             # Send the request
-            response = self.session.post(url, json=payload, timeout=30)
+            response = self._request('POST', url, json=payload, timeout=30)
             response_data = response.json()
             
             if response.status_code == 200:
                 logger.info(f"Conversational Pathway Created in Bland Systems successfully")
                 logger.info(f"Pathway Data: {json.dumps(response_data, indent=4)}")
+                record_synced_fields(pathway, payload, persist=False)
                 
             return response_data.get("pathway_id")
         except requests.exceptions.RequestException as e:
@@ -189,7 +424,10 @@ class BlandClient:
         Update a conversational pathway in Bland AI with the correct structure.
         """
         url = f"{self.base_url}/convo_pathway/{pathway.bland_ai_pathway_id}"
-        payload = self._prepare_pathway_payload(pathway, request_data)
+        payload = changed_fields(pathway, self._prepare_pathway_payload(pathway, request_data))
+        if not payload:
+            logger.info(f"Conversational Pathway '{pathway.name}' has no changes for Bland AI. Skipping update.")
+            return None
         
         try:
             # Log the payload before sending the request for debugging
@@ -197,12 +435,13 @@ class BlandClient:
             logger.info(f"Payload: {json.dumps(payload, indent=4)}")
 
             # Send the update request to Bland AI
-            response = self.session.post(url, json=payload, timeout=30)
+            response = self._request('POST', url, json=payload, timeout=30, idempotent=True)
             
             if response.status_code == 200:
                 logger.info(f"Conversational Pathway Updated in Bland Systems successfully")
                 response_data = response.json()
                 logger.info(f"Updated Pathway Data: {json.dumps(response_data, indent=4)}")
+                record_synced_fields(pathway, payload)
 
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -222,7 +461,7 @@ class BlandClient:
         try:
             logger.info(f"Retrieving conversational pathway from URL: {url}")
 
-            response = self.session.get(url, timeout=30)
+            response = self._request('GET', url, timeout=30)
             logger.info(f"Response Status Code: {response.status_code}")
             logger.info(f"Response Text: {response.text}")
 
@@ -233,6 +472,26 @@ class BlandClient:
             logger.error(f"Error retrieving conversational pathway from Bland AI: {e}", exc_info=True)
             raise
         
+    def get_all_conversational_pathways(self):
+        """
+        Retrieve every conversational pathway from Bland AI.
+        """
+        url = f"{self.base_url}/convo_pathway"
+
+        try:
+            logger.info(f"Retrieving all conversational pathways from URL: {url}")
+
+            response = self._request('GET', url, timeout=30)
+            response.raise_for_status()
+
+            data = response.json()
+            if isinstance(data, dict):
+                data = data.get('pathways', [])
+            return data
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error retrieving conversational pathways from Bland AI: {e}", exc_info=True)
+            raise
+
     def delete_conversational_pathway(self, bland_ai_pathway_id):
         """
         Delete a conversational pathway in Bland AI.
@@ -243,11 +502,43 @@ class BlandClient:
             logger.info(f"Sending delete request for conversational pathway at URL: {url}")
 
             # Make the request to delete the pathway from Bland AI
-            response = self.session.delete(url, timeout=30)
+            response = self._request('DELETE', url, timeout=30)
             
             # Return the parsed response data
             return response.json()
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Error deleting conversational pathway in Bland AI: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+
+_shared_client = None
+_shared_client_pid = None
+_shared_client_lock = threading.Lock()
+
+
+def get_bland_client():
+    """
+    Returns the BlandClient shared by every thread of the current worker process.
+    The client is rebuilt after a fork so pooled sockets are never shared between processes.
+    """
+    global _shared_client, _shared_client_pid
+
+    pid = os.getpid()
+    if _shared_client is None or _shared_client_pid != pid:
+        with _shared_client_lock:
+            if _shared_client is None or _shared_client_pid != pid:
+                _shared_client = BlandClient()
+                _shared_client_pid = pid
+    return _shared_client
+
+
+def warm_bland_client():
+    """
+    Warms the shared client's connection pool when BLAND_AI_WARM_CONNECTIONS is set.
+    Called once per worker from the WSGI/ASGI entry points.
+    """
+    connections = settings.BLAND_AI_WARM_CONNECTIONS
+    if connections <= 0:
+        return 0
+    return get_bland_client().warm(connections)
@@ -0,0 +1,141 @@
+# agents/circuit_breaker.py
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+
+class BlandServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Bland AI is temporarily unavailable. Please retry later.'
+    default_code = 'bland_unavailable'
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker.
+
+    CLOSED: calls go through and their outcomes fill a sliding window. Once the window holds at least
+    `minimum_calls` outcomes and the failure rate reaches `failure_rate_threshold`, the breaker opens.
+    OPEN: calls fail immediately with BlandServiceUnavailable until `reset_timeout` seconds have passed.
+    HALF_OPEN: up to `half_open_max_calls` trial calls go through; a success closes the breaker,
+    a failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_rate_threshold=0.5, minimum_calls=10, window_size=20,
+                 reset_timeout=30, half_open_max_calls=1, clock=time.monotonic):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trial_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def before_call(self):
+        """
+        Raises BlandServiceUnavailable when the call must not be attempted.
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.OPEN:
+                raise BlandServiceUnavailable()
+            if self._state == self.HALF_OPEN:
+                if self._trial_calls >= self.half_open_max_calls:
+                    raise BlandServiceUnavailable()
+                self._trial_calls += 1
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.info(f"Circuit breaker '{self.name}' closed after a successful trial call.")
+                self._close()
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.warning(f"Circuit breaker '{self.name}' re-opened after a failed trial call.")
+                self._open()
+                return
+            self._outcomes.append(False)
+            if len(self._outcomes) >= self.minimum_calls and self.failure_rate() >= self.failure_rate_threshold:
+                logger.error(f"Circuit breaker '{self.name}' opened at a {self.failure_rate():.0%} failure rate.")
+                self._open()
+
+    def release_call(self):
+        """
+        Gives back a half-open trial slot taken by `before_call` for a call that ended without an outcome
+        (cancelled or interrupted), so the next call can be the trial.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._trial_calls:
+                self._trial_calls -= 1
+
+    def failure_rate(self):
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def reset(self):
+        with self._lock:
+            self._close()
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_calls = 0
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trial_calls = 0
+        self._outcomes.clear()
+
+
+_bland_breaker = None
+_bland_breaker_lock = threading.Lock()
+
+
+def get_bland_breaker():
+    """
+    Returns the circuit breaker shared by every Bland AI call made from this process.
+    """
+    global _bland_breaker
+    if _bland_breaker is None:
+        with _bland_breaker_lock:
+            if _bland_breaker is None:
+                _bland_breaker = CircuitBreaker(
+                    'bland_ai',
+                    failure_rate_threshold=getattr(settings, 'BLAND_AI_BREAKER_FAILURE_RATE', 0.5),
+                    minimum_calls=getattr(settings, 'BLAND_AI_BREAKER_MINIMUM_CALLS', 10),
+                    window_size=getattr(settings, 'BLAND_AI_BREAKER_WINDOW_SIZE', 20),
+                    reset_timeout=getattr(settings, 'BLAND_AI_BREAKER_RESET_TIMEOUT', 30),
+                    half_open_max_calls=getattr(settings, 'BLAND_AI_BREAKER_HALF_OPEN_CALLS', 1),
+                )
+    return _bland_breaker
@@ -0,0 +1,54 @@
+# agents/concurrency.py
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+ETAG_HEADER = 'ETag'
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The object was modified since the version given in If-Match. Fetch it again and retry.'
+    default_code = 'precondition_failed'
+
+
+class UpdateConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The object kept changing while it was being updated. Retry the request.'
+    default_code = 'update_conflict'
+
+
+def etag(version):
+    return f'"{version}"'
+
+
+def expected_versions(headers, data):
+    """
+    The versions a write accepts, from `If-Match: "<version>"[, ...]` or else a `version` field in the
+    body. None when the write is unconditional (neither is given, or `If-Match: *`).
+    """
+    if_match = headers.get('If-Match')
+    if if_match is not None:
+        tags = [tag.strip() for tag in if_match.split(',') if tag.strip()]
+        if '*' in tags:
+            return None
+        versions = set()
+        for tag in tags:
+            tag = tag[2:] if tag.startswith('W/') else tag
+            try:
+                versions.add(int(tag.strip('"')))
+            except ValueError:
+                continue  # Not one of our ETags, so it can never match
+        return versions
+
+    version = data.get('version') if hasattr(data, 'get') else None
+    if version is None:
+        return None
+    try:
+        return {int(version)}
+    except (TypeError, ValueError):
+        raise ValidationError({'version': ['A valid integer is required.']})
+
+
+def check_version(instance, versions):
+    if versions is not None and instance.version not in versions:
+        raise PreconditionFailed()
@@ -0,0 +1,70 @@
+# agents/db_connections.py
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class ConnectionCounter:
+    """
+    Counts, per process, the requests served and the database connections they opened. With persistent
+    connections or a pool most requests reuse a connection, so `connects` stays far below `requests`.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connects = {}
+
+    def request_started(self, **kwargs):
+        with self._lock:
+            self.requests += 1
+
+    def connection_created(self, connection, **kwargs):
+        # Fired for every new connection, and for every pool checkout in 'pool' mode
+        with self._lock:
+            self.connects[connection.alias] = self.connects.get(connection.alias, 0) + 1
+
+    def stats(self, alias=DEFAULT_DB_ALIAS):
+        with self._lock:
+            return {'requests': self.requests, 'connects': self.connects.get(alias, 0)}
+
+
+_counter = ConnectionCounter()
+
+
+def get_connection_counter():
+    """
+    Returns the connection counter of this process, fed by the signals connected in AgentsConfig.ready().
+    """
+    return _counter
+
+
+def pool_mode(alias=DEFAULT_DB_ALIAS):
+    settings_dict = connections[alias].settings_dict
+    if settings_dict.get('OPTIONS', {}).get('pool'):
+        return 'pool'
+    return 'persistent' if settings_dict['CONN_MAX_AGE'] != 0 else 'none'
+
+
+def database_pool_stats(alias=DEFAULT_DB_ALIAS):
+    """
+    Returns how this process reuses database connections: the mode and its settings, the request and
+    connect counters, and in 'pool' mode the statistics of psycopg's pool (connections open, idle,
+    waiting requests, ...).
+    """
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    stats = {
+        'alias': alias,
+        'vendor': connection.vendor,
+        'mode': pool_mode(alias),
+        'conn_max_age': settings_dict['CONN_MAX_AGE'],
+        'health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+        **_counter.stats(alias),
+    }
+    if stats['mode'] == 'pool':
+        stats['pool'] = connection.pool.get_stats()
+    return stats
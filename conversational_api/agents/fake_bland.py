@@ -0,0 +1,330 @@
+# agents/fake_bland.py
+"""
+A stand-in for the Bland AI API, for load and latency testing of the real HTTP path.
+
+It implements the endpoints BlandClient calls, keeps agents and pathways in memory, and can add latency,
+random errors and a rate limit to every response. Start it in-process with FakeBlandServer, or as a
+separate process with `python manage.py run_fake_bland`, then point BLAND_AI_BASE_URL at its `url`.
+"""
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class Latency:
+    """
+    Samples a response delay in seconds. Build one with `Latency.parse('lognormal:0.2,0.5')` or the
+    constructors below.
+    """
+    def __init__(self, sampler, description):
+        self._sampler = sampler
+        self.description = description
+
+    def sample(self, rng):
+        return max(self._sampler(rng), 0.0)
+
+    def __repr__(self):
+        return f"Latency({self.description})"
+
+    @classmethod
+    def constant(cls, seconds):
+        return cls(lambda rng: seconds, f"constant:{seconds}")
+
+    @classmethod
+    def uniform(cls, low, high):
+        return cls(lambda rng: rng.uniform(low, high), f"uniform:{low},{high}")
+
+    @classmethod
+    def exponential(cls, mean):
+        return cls(lambda rng: rng.expovariate(1 / mean) if mean else 0.0, f"exponential:{mean}")
+
+    @classmethod
+    def lognormal(cls, median, sigma):
+        # A long right tail, which is what real upstream latency tends to look like
+        return cls(lambda rng: rng.lognormvariate(math.log(median), sigma) if median else 0.0,
+                   f"lognormal:{median},{sigma}")
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Parses `kind:arg[,arg]`, e.g. `constant:0.05`, `uniform:0.01,0.2`, `exponential:0.1`, `lognormal:0.2,0.5`.
+        A bare number is a constant delay.
+        """
+        if isinstance(spec, Latency):
+            return spec
+        if spec is None or spec == '':
+            return cls.constant(0.0)
+        if isinstance(spec, (int, float)):
+            return cls.constant(float(spec))
+        kind, _, args = str(spec).partition(':')
+        if not args:
+            return cls.constant(float(kind))
+        values = [float(value) for value in args.split(',')]
+        constructors = {
+            'constant': cls.constant,
+            'uniform': cls.uniform,
+            'exponential': cls.exponential,
+            'lognormal': cls.lognormal,
+        }
+        if kind not in constructors:
+            raise ValueError(f"Unknown latency distribution '{kind}'.")
+        return constructors[kind](*values)
+
+
+class FakeBlandState:
+    """
+    In-memory agents and pathways plus the fault settings, shared by all request threads.
+    """
+    def __init__(self, latency=None, error_rate=0.0, error_status=503, rate_limit=None, rate_window=1.0, seed=None):
+        self.latency = Latency.parse(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.agents = {}
+        self.pathways = {}
+        self.requests = Counter()
+        self.responses = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def reset(self):
+        with self._lock:
+            self.agents.clear()
+            self.pathways.clear()
+            self.requests.clear()
+            self.responses.clear()
+            self._window_count = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'responses': dict(self.responses),
+                'agents': len(self.agents),
+                'pathways': len(self.pathways),
+            }
+
+    def delay(self):
+        with self._lock:
+            return self.latency.sample(self._rng)
+
+    def should_fail(self):
+        with self._lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def rate_limited(self):
+        """
+        Fixed-window limit of `rate_limit` requests per `rate_window` seconds.
+        Returns the seconds until the window resets when the request is over the limit, else None.
+        """
+        if not self.rate_limit:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.rate_window:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count > self.rate_limit:
+                return self.rate_window - (now - self._window_start)
+            return None
+
+
+class FakeBlandHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # (method, pattern, handler name); the base path (e.g. /v1) is stripped before matching
+    routes = [
+        ('POST', re.compile(r'^/agents$'), 'create_agent'),
+        ('POST', re.compile(r'^/agents/(?P<id>[^/]+)/delete$'), 'delete_agent'),
+        ('POST', re.compile(r'^/agents/(?P<id>[^/]+)$'), 'update_agent'),
+        ('GET', re.compile(r'^/agents/(?P<id>[^/]+)$'), 'get_agent'),
+        ('POST', re.compile(r'^/convo_pathway/create$'), 'create_pathway'),
+        ('GET', re.compile(r'^/convo_pathway$'), 'list_pathways'),
+        ('POST', re.compile(r'^/convo_pathway/(?P<id>[^/]+)$'), 'update_pathway'),
+        ('GET', re.compile(r'^/convo_pathway/(?P<id>[^/]+)$'), 'get_pathway'),
+        ('DELETE', re.compile(r'^/convo_pathway/(?P<id>[^/]+)$'), 'delete_pathway'),
+    ]
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def do_HEAD(self):
+        # Used by BlandClient.warm to open connections
+        self._respond(200, None)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Fake Bland AI: {format % args}")
+
+    def _dispatch(self, method):
+        path = self.path.split('?', 1)[0]
+        if path.startswith(self.server.base_path):
+            path = path[len(self.server.base_path):] or '/'
+        body = self._read_body()
+
+        for route_method, pattern, name in self.routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                break
+        else:
+            self._respond(404, {'status': 'error', 'message': f'No route for {method} {path}'})
+            return
+
+        with self.state._lock:
+            self.state.requests[name] += 1
+
+        time.sleep(self.state.delay())
+
+        retry_after = self.state.rate_limited()
+        if retry_after is not None:
+            self._respond(429, {'status': 'error', 'message': 'Rate limit exceeded'},
+                          headers={'Retry-After': str(max(math.ceil(retry_after), 1))})
+            return
+        if self.state.should_fail():
+            self._respond(self.state.error_status, {'status': 'error', 'message': 'Injected failure'})
+            return
+
+        status_code, payload = getattr(self, f'_{name}')(match.groupdict().get('id'), body)
+        self._respond(status_code, payload)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        raw = self.rfile.read(length)
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {}
+
+    def _respond(self, status_code, payload, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        with self.state._lock:
+            self.state.responses[status_code] += 1
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _create_agent(self, _, body):
+        agent_id = str(uuid.uuid4())
+        with self.state._lock:
+            self.state.agents[agent_id] = dict(body, agent_id=agent_id)
+        return 200, {'status': 'success', 'agent': {'agent_id': agent_id}}
+
+    def _update_agent(self, agent_id, body):
+        with self.state._lock:
+            if agent_id not in self.state.agents:
+                return 404, {'status': 'error', 'message': 'Agent not found'}
+            self.state.agents[agent_id].update(body)
+        return 200, {'status': 'success', 'message': 'Agent updated'}
+
+    def _get_agent(self, agent_id, _):
+        with self.state._lock:
+            agent = self.state.agents.get(agent_id)
+        if agent is None:
+            return 404, {'status': 'error', 'message': 'Agent not found'}
+        return 200, agent
+
+    def _delete_agent(self, agent_id, _):
+        with self.state._lock:
+            if self.state.agents.pop(agent_id, None) is None:
+                return 404, {'status': 'error', 'message': 'Agent not found'}
+        return 200, {'status': 'success', 'message': 'Agent deleted'}
+
+    def _create_pathway(self, _, body):
+        pathway_id = str(uuid.uuid4())
+        with self.state._lock:
+            self.state.pathways[pathway_id] = dict(body, pathway_id=pathway_id)
+        return 200, {'status': 'success', 'pathway_id': pathway_id}
+
+    def _list_pathways(self, _, __):
+        with self.state._lock:
+            return 200, list(self.state.pathways.values())
+
+    def _update_pathway(self, pathway_id, body):
+        with self.state._lock:
+            if pathway_id not in self.state.pathways:
+                return 404, {'status': 'error', 'message': 'Pathway not found'}
+            self.state.pathways[pathway_id].update(body)
+        return 200, {'status': 'success', 'message': 'Pathway updated'}
+
+    def _get_pathway(self, pathway_id, _):
+        with self.state._lock:
+            pathway = self.state.pathways.get(pathway_id)
+        if pathway is None:
+            return 404, {'status': 'error', 'message': 'Pathway not found'}
+        return 200, pathway
+
+    def _delete_pathway(self, pathway_id, _):
+        with self.state._lock:
+            if self.state.pathways.pop(pathway_id, None) is None:
+                return 404, {'status': 'error', 'message': 'Pathway not found'}
+        return 200, {'status': 'success', 'message': 'Pathway deleted'}
+
+
+class FakeBlandServer:
+    """
+    Runs the fake Bland AI API on a background thread.
+
+        with FakeBlandServer(latency='lognormal:0.05,0.5', error_rate=0.01) as fake:
+            settings.BLAND_AI_BASE_URL = fake.url
+    """
+    def __init__(self, host='127.0.0.1', port=0, base_path='/v1', **state_options):
+        self.state = FakeBlandState(**state_options)
+        self.httpd = ThreadingHTTPServer((host, port), FakeBlandHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.httpd.base_path = base_path.rstrip('/')
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{self.httpd.base_path}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-bland', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,124 @@
+# agents/filters.py
+import json
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import BooleanField, CharField, F, FloatField, Func, IntegerField, Q, Value
+from django.db.models.lookups import Exact, In
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+JSON_PATH_SEGMENT_RE = re.compile(r'^[A-Za-z0-9_\-]+$')
+JSON_SCALAR_FIELDS = {str: CharField, int: IntegerField, float: FloatField}
+
+
+class JSONArrayMember(Func):
+    """
+    True when the JSON array in the first expression has an element equal to the second, through SQLite's
+    `json_each`. Databases with JSON containment use `__contains` instead.
+    """
+    template = 'EXISTS (SELECT 1 FROM JSON_EACH(%(array)s) AS member WHERE member.value = %(value)s)'
+    output_field = BooleanField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        array, value = self.get_source_expressions()
+        array_sql, array_params = compiler.compile(array)
+        value_sql, value_params = compiler.compile(value)
+        return self.template % {'array': array_sql, 'value': value_sql}, (*array_params, *value_params)
+
+
+class AgentFilterBackend(BaseFilterBackend):
+    """
+    Filters agents by query parameters, each backed by an index:
+
+    - `model`, `language`, `voice`, `pathway_id`: exact match, or any of a comma-separated list.
+    - `keywords`: agents whose keywords include every one of a comma-separated list.
+    - `metadata.<key>[.<key>...]`, `dynamic_data.<key>[...]`: the value at that JSON path equals the
+      parameter. A parameter that reads as a JSON number, boolean or null also matches that value, so
+      `metadata.customer_id=42` finds both `42` and `"42"`.
+
+    On PostgreSQL, JSON filters are containment (`@>`) queries served by the GIN indexes of migration 0018.
+    Databases without JSON containment (SQLite) compare `JSON_EXTRACT` of the path instead. Only
+    `metadata.customer_id` has an expression index there; other paths and `keywords` scan the rows left
+    after the scalar filters.
+    """
+    scalar_fields = ('model', 'language', 'voice', 'pathway_id')
+    json_fields = ('metadata', 'dynamic_data')
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        supports_contains = connections[queryset.db].features.supports_json_field_contains
+
+        for field in self.scalar_fields:
+            values = self._split(params.get(field))
+            if values:
+                queryset = queryset.filter(**{f'{field}__in': values} if len(values) > 1 else {field: values[0]})
+
+        keywords = self._split(params.get('keywords'))
+        if keywords:
+            if supports_contains:
+                queryset = queryset.filter(keywords__contains=keywords)
+            else:
+                for keyword in keywords:
+                    queryset = queryset.filter(JSONArrayMember(F('keywords'), Value(keyword)))
+
+        for param, value in params.items():
+            field, dot, path = param.partition('.')
+            if field not in self.json_fields or not dot:
+                continue
+            keys = path.split('.')
+            if not all(JSON_PATH_SEGMENT_RE.match(key) for key in keys):
+                raise ValidationError({param: ['JSON paths are dot-separated keys of letters, digits, _ and -.']})
+            candidates = self._json_candidates(value)
+            if supports_contains:
+                queryset = queryset.filter(reduce(or_, (
+                    Q(**{f'{field}__contains': self._nest(keys, candidate)}) for candidate in candidates
+                )))
+            else:
+                queryset = queryset.filter(reduce(or_, (
+                    self._json_path_equals(field, keys, candidate) for candidate in candidates
+                )))
+        return queryset
+
+    @staticmethod
+    def _split(value):
+        return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+    @staticmethod
+    def _json_candidates(value):
+        candidates = [value]
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return candidates
+        if parsed is None or isinstance(parsed, (bool, int, float)):
+            candidates.append(parsed)
+        return candidates
+
+    @staticmethod
+    def _nest(keys, value):
+        for key in reversed(keys):
+            value = {key: value}
+        return value
+
+    @staticmethod
+    def _json_path_equals(field, keys, value):
+        """
+        `JSON_EXTRACT(<field>, '$."<key>"...') = value`, with the path written as a literal (keys are
+        validated) so the query matches expression indexes such as `agent_metadata_customer_id_idx`.
+
+        JSON_EXTRACT returns true and false as 1 and 0, so booleans are matched on JSON_TYPE instead, and
+        numbers only match JSON numbers, as containment does on PostgreSQL.
+        """
+        path = '$' + ''.join(f'."{key}"' for key in keys)
+        json_type = Func(F(field), function='JSON_TYPE', template=f"%(function)s(%(expressions)s, '{path}')",
+                         output_field=CharField())
+        if value is None or isinstance(value, bool):
+            return Q(Exact(json_type, json.dumps(value)))
+        extracted = Func(F(field), function='JSON_EXTRACT', template=f"%(function)s(%(expressions)s, '{path}')",
+                         output_field=JSON_SCALAR_FIELDS[type(value)]())
+        if isinstance(value, str):
+            return Q(Exact(extracted, value))
+        return Q(Exact(extracted, value)) & Q(In(json_type, ['integer', 'real']))
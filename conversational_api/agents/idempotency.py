@@ -0,0 +1,183 @@
+# agents/idempotency.py
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is still being processed. Please retry later.'
+    default_code = 'idempotency_in_progress'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used for a different request.'
+    default_code = 'idempotency_key_reused'
+
+
+def request_fingerprint(request, data=None):
+    data = request.data if data is None else data
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def request_scope(request):
+    """
+    Keys are only unique per endpoint and caller, so two clients can never see each other's responses.
+    """
+    user = request.user.pk if getattr(request, 'user', None) and request.user.is_authenticated else 'anonymous'
+    return f"{request.method} {request.path} {user}"
+
+
+def run_idempotent(request, handler):
+    """
+    Runs `handler` once per `Idempotency-Key`.
+
+    The first request claims the key and stores the response `handler` returns. A retry of it gets
+    that response back without running `handler`, so nothing is written locally or sent to Bland AI.
+    A duplicate arriving while the first is still running waits up to IDEMPOTENCY_WAIT_TIMEOUT seconds
+    for it to finish, then gets a 409. Requests without the header run as usual.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return handler()
+
+    record = _claim(key, request_scope(request), request_fingerprint(request))
+    if record.status == IdempotencyKey.Status.COMPLETED:
+        logger.info(f"Replaying stored response for Idempotency-Key '{key}'.")
+        return _replay(record)
+
+    try:
+        response = handler()
+    except Exception:
+        # Nothing is stored for failures, so the client can retry with the same key
+        record.delete()
+        raise
+
+    if response.status_code >= 500:
+        record.delete()
+        return response
+
+    IdempotencyKey.objects.filter(pk=record.pk).update(
+        status=IdempotencyKey.Status.COMPLETED,
+        response_status=response.status_code,
+        response_body=response.data,
+    )
+    return response
+
+
+async def arun_idempotent(request, data, handler, render):
+    """
+    `run_idempotent` for the async views: `request` is a plain Django request whose body parsed to `data`,
+    `handler` a coroutine function returning an HttpResponse of JSON, and `render(body, status)` builds
+    the replayed response. Database work runs through sync_to_async.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return await handler()
+
+    # request_scope reads request.user, which may query the session, so it runs off the event loop too
+    record = await sync_to_async(lambda: _claim(key, request_scope(request), request_fingerprint(request, data)))()
+    if record.status == IdempotencyKey.Status.COMPLETED:
+        logger.info(f"Replaying stored response for Idempotency-Key '{key}'.")
+        response = render(record.response_body, status=record.response_status)
+        response[REPLAYED_HEADER] = 'true'
+        return response
+
+    try:
+        response = await handler()
+    except BaseException:
+        await record.adelete()
+        raise
+
+    if response.status_code >= 500:
+        await record.adelete()
+        return response
+
+    await IdempotencyKey.objects.filter(pk=record.pk).aupdate(
+        status=IdempotencyKey.Status.COMPLETED,
+        response_status=response.status_code,
+        response_body=json.loads(response.content) if response.content else None,
+    )
+    return response
+
+
+def purge_expired():
+    """
+    Deletes keys past their TTL. Returns the number deleted.
+    """
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def _claim(key, scope, fingerprint):
+    """
+    Returns the key's record: a new in-progress one owned by this request, or the completed one to replay.
+    """
+    wait_timeout = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 10)
+    poll_interval = getattr(settings, 'IDEMPOTENCY_POLL_INTERVAL', 0.1)
+    deadline = time.monotonic() + wait_timeout
+
+    while True:
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(
+                    key=key, scope=scope, request_hash=fingerprint, locked_at=now,
+                    expires_at=now + timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400)),
+                )
+        except IntegrityError:
+            pass
+
+        record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+        if record is None:
+            continue  # Released by a failed first request in the meantime
+        if record.expires_at <= now:
+            IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=now).delete()
+            continue
+        if record.request_hash != fingerprint:
+            raise IdempotencyKeyReused()
+        if record.status == IdempotencyKey.Status.COMPLETED:
+            return record
+        if _take_over_abandoned(record, now):
+            return record
+        if time.monotonic() >= deadline:
+            raise IdempotencyConflict()
+        time.sleep(poll_interval)
+
+
+def _take_over_abandoned(record, now):
+    """
+    Claims an in-progress key whose owner has not finished within IDEMPOTENCY_LOCK_TIMEOUT,
+    e.g. because its worker was killed mid-request.
+    """
+    cutoff = now - timedelta(seconds=getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 120))
+    taken = IdempotencyKey.objects.filter(
+        pk=record.pk, status=IdempotencyKey.Status.IN_PROGRESS, locked_at__lt=cutoff
+    ).update(locked_at=now)
+    if taken:
+        logger.warning(f"Took over abandoned Idempotency-Key '{record.key}'.")
+    return bool(taken)
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.response_status)
+    response[REPLAYED_HEADER] = 'true'
+    return response
@@ -0,0 +1,77 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from agents.models import Agent
+from agents.utils import scripts_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the stored Agent.script from the prompt, e.g. after html_to_script changed. "
+        "With --check, only reports agents whose stored script is stale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Agents converted per task.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Worker processes converting prompts. 1 converts in this process.")
+        parser.add_argument('--check', action='store_true',
+                            help="Report stale scripts without writing, and exit non-zero if any are found.")
+
+    def handle(self, *args, **options):
+        stale_ids = []
+        checked = 0
+        for batch, converted in self._converted_batches(options['batch_size'], options['workers']):
+            stored = {pk: script for pk, _, script in batch}
+            stale = [(pk, script) for pk, script in converted if stored[pk] != script]
+            checked += len(batch)
+            stale_ids.extend(pk for pk, _ in stale)
+            if stale and not options['check']:
+                with transaction.atomic():
+                    # bulk_update skips Agent.save(), so a recomputed script does not bump the version
+                    Agent.objects.bulk_update([Agent(pk=pk, script=script) for pk, script in stale], ['script'])
+
+        if options['check']:
+            if stale_ids:
+                preview = ', '.join(str(pk) for pk in stale_ids[:20])
+                raise CommandError(f"{len(stale_ids)} of {checked} agent(s) have a stale script (ids: {preview}"
+                                   f"{', ...' if len(stale_ids) > 20 else ''}).")
+            self.stdout.write(f"All {checked} agent script(s) are up to date.")
+            return
+        self.stdout.write(f"Checked {checked} agent(s), updated {len(stale_ids)} stale script(s).")
+
+    def _batches(self, batch_size):
+        last_id = 0
+        while True:
+            batch = list(
+                Agent.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'prompt', 'script')[:batch_size]
+            )
+            if not batch:
+                return
+            last_id = batch[-1][0]
+            yield batch
+
+    def _converted_batches(self, batch_size, workers):
+        """
+        Yields `(batch, [(id, script), ...])` in id order. Conversion runs in a process pool, with at most
+        two batches per worker in flight so memory stays bounded on large tables.
+        """
+        if workers <= 1:
+            for batch in self._batches(batch_size):
+                yield batch, scripts_for([(pk, prompt) for pk, prompt, _ in batch])
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            for batch in self._batches(batch_size):
+                in_flight.append((batch, executor.submit(scripts_for, [(pk, prompt) for pk, prompt, _ in batch])))
+                if len(in_flight) >= workers * 2:
+                    batch, future = in_flight.popleft()
+                    yield batch, future.result()
+            while in_flight:
+                batch, future = in_flight.popleft()
+                yield batch, future.result()
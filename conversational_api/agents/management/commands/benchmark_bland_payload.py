@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.bland_client import BlandClient
+from agents.management.commands.benchmark_list_serialization import sample_agent, sample_pathway
+from agents.serializers import AgentSerializer, ConversationalPathwaySerializer
+
+
+def serializer_payload(serializer_class, instance, request_data):
+    """
+    The payload as it was built before: the whole serializer representation, filtered to the request.
+    """
+    data = serializer_class(instance).data
+    return {key: data[key] for key in request_data if key in data}
+
+
+class Command(BaseCommand):
+    help = (
+        "Times building Bland AI agent and pathway payloads from model attributes against filtering a full "
+        "serializer representation, and checks that both produce the same payload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=2000, help="Payloads built per timing.")
+
+    def handle(self, *args, **options):
+        client = BlandClient()
+        agent, pathway = sample_agent(1), sample_pathway(1)
+        agent.id, pathway.id = 1, 1
+        cases = [
+            ('agent', AgentSerializer, client._prepare_agent_payload, agent,
+             ['name', 'prompt', 'voice', 'tools', 'keywords', 'webhook', 'max_duration']),
+            ('pathway', ConversationalPathwaySerializer, client._prepare_pathway_payload, pathway,
+             ['name', 'description', 'nodes', 'edges']),
+        ]
+
+        self.stdout.write(f"{'payload':<10}{'serializer':>14}{'direct':>12}{'speedup':>10}")
+        for label, serializer_class, prepare, instance, request_data in cases:
+            if prepare(instance, request_data) != serializer_payload(serializer_class, instance, request_data):
+                raise CommandError(f"The {label} payloads differ.")
+            serializer_time = self._time(lambda: serializer_payload(serializer_class, instance, request_data),
+                                         options['number'])
+            direct_time = self._time(lambda: prepare(instance, request_data), options['number'])
+            self.stdout.write(
+                f"{label:<10}{serializer_time * 1e6:>12.1f}us{direct_time * 1e6:>10.1f}us"
+                f"{serializer_time / direct_time:>9.1f}x"
+            )
+
+    def _time(self, build, number):
+        """
+        Returns the seconds one payload takes, the best of three runs of `number` payloads.
+        """
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(number):
+                build()
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
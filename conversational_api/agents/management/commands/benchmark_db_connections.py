@@ -0,0 +1,103 @@
+import importlib.util
+import time
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+
+from agents.db_connections import database_pool_stats, get_connection_counter
+from agents.management.commands.benchmark_list_serialization import sample_agent
+from agents.models import Agent
+
+MODES = ('none', 'persistent', 'pool')
+SAMPLE_PREFIX = 'benchmark-agent-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Times requests per second against the default database with each connection mode: a new connection "
+        "per request, persistent connections, and psycopg's pool (PostgreSQL with psycopg[pool] only). "
+        "Requests go through the WSGI handler in-process, so connections are closed or kept exactly as in "
+        "a worker. Sample agents are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Requests per mode.")
+        parser.add_argument('--modes', default=','.join(MODES), help="Comma-separated modes to compare.")
+        parser.add_argument('--path', default='/api/v1/agents/?pagination=cursor&page_size=10', help="GET path to request.")
+        parser.add_argument('--agents', type=int, default=50, help="Sample agents created for the run.")
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}.")
+        if 'pool' in modes and (connection.vendor != 'postgresql' or not importlib.util.find_spec('psycopg_pool')):
+            self.stdout.write("Skipping 'pool': it needs PostgreSQL with psycopg[pool] installed.")
+            modes.remove('pool')
+
+        saved = connection.settings_dict.copy()
+        saved['OPTIONS'] = dict(saved.get('OPTIONS', {}))
+        Agent.objects.bulk_create([sample_agent(index) for index in range(options['agents'])])
+        try:
+            self.stdout.write(f"{connection.vendor} database, GET {options['path']} x {options['requests']}")
+            baseline = None
+            for mode in modes:
+                rate, stats = self._run(mode, options['path'], options['requests'])
+                baseline = baseline or rate
+                pool = f", pool {stats['pool']}" if 'pool' in stats else ''
+                self.stdout.write(
+                    f"{mode:>10}: {rate:8.0f} req/s ({rate / baseline:4.1f}x), "
+                    f"{stats['connects']} connect(s) for {stats['requests']} request(s){pool}"
+                )
+        finally:
+            self._configure(saved)
+            Agent.objects.filter(bland_ai_id__startswith=SAMPLE_PREFIX).delete()
+
+    def _run(self, mode, path, requests):
+        settings_dict = connection.settings_dict.copy()
+        settings_dict['OPTIONS'] = {
+            key: value for key, value in settings_dict.get('OPTIONS', {}).items() if key != 'pool'
+        }
+        settings_dict['CONN_MAX_AGE'] = (settings.DATABASE_CONN_MAX_AGE or 60) if mode == 'persistent' else 0
+        settings_dict['CONN_HEALTH_CHECKS'] = mode == 'persistent' and settings.DATABASE_CONN_HEALTH_CHECKS
+        if mode == 'pool':
+            settings_dict['OPTIONS']['pool'] = {
+                'min_size': settings.DATABASE_POOL_MIN_SIZE,
+                'max_size': settings.DATABASE_POOL_MAX_SIZE,
+                'timeout': settings.DATABASE_POOL_TIMEOUT,
+            }
+        self._configure(settings_dict)
+
+        handler = WSGIHandler()
+        self._get(handler, path)  # Warm-up: imports, URL resolution, the pool's first connections
+        get_connection_counter().reset()
+        started = time.perf_counter()
+        for _ in range(requests):
+            self._get(handler, path)
+        elapsed = time.perf_counter() - started
+        return requests / elapsed, database_pool_stats()
+
+    @staticmethod
+    def _get(handler, path):
+        url = urlsplit(path)
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': url.path, 'QUERY_STRING': url.query}
+        setup_testing_defaults(environ)
+        statuses = []
+        response = handler(environ, lambda status, headers: statuses.append(status))
+        for _ in response:
+            pass
+        response.close()  # Fires request_finished, which closes or keeps the connection
+        if not statuses[0].startswith('200'):
+            raise CommandError(f"GET {path} answered {statuses[0]}.")
+
+    @staticmethod
+    def _configure(settings_dict):
+        connection.close()
+        if getattr(connection, 'pool', None) is not None:
+            connection.close_pool()
+        connection.settings_dict.clear()
+        connection.settings_dict.update(settings_dict)
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agents import script_converter
+from agents.models import Agent
+from agents.utils import bleach_html_to_script
+
+# One section of a typical prompt; --sizes repeats it to build longer ones
+PROMPT_SECTION = (
+    '<h2>Greeting &amp; introduction</h2>'
+    '<p>Hello, this is <b>Ava</b> from <em>Acme&nbsp;Corp</em>. I&#39;m calling about your '
+    '<a href="https://example.com/account?id=1&ref=call">account</a>.</p>'
+    '<ul><li>Confirm the caller&#8217;s <strong>name</strong></li><li>Ask about their <i>budget</i>'
+    '<li>Offer a demo</ul>'
+    '<div>Escalate if the caller asks for a manager.<br>Never share pricing over the phone.</div>\n'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the single-pass html_parser converter against the bleach + BeautifulSoup pipeline, "
+        "and checks that both produce the same script."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,10,100',
+                            help="Comma-separated number of prompt sections per generated prompt.")
+        parser.add_argument('--number', type=int, default=0,
+                            help="Conversions per timing. By default enough for about 0.2 seconds of bleach time.")
+        parser.add_argument('--agents', action='store_true', help="Benchmark the prompts of the stored agents instead.")
+
+    def handle(self, *args, **options):
+        if options['agents']:
+            prompts = [('agents', [prompt or '' for prompt in Agent.objects.values_list('prompt', flat=True)])]
+            if not prompts[0][1]:
+                raise CommandError("There are no agents to benchmark.")
+        else:
+            try:
+                sizes = [int(size) for size in options['sizes'].split(',')]
+            except ValueError:
+                raise CommandError("--sizes must be a comma-separated list of integers.")
+            prompts = [(f'{size} section(s)', [PROMPT_SECTION * size]) for size in sizes]
+
+        self.stdout.write(f"{'input':<16}{'chars':>10}{'bleach':>12}{'html_parser':>14}{'speedup':>10}")
+        for label, batch in prompts:
+            mismatches = sum(
+                bleach_html_to_script(prompt) != script_converter.html_to_script(prompt) for prompt in batch
+            )
+            if mismatches:
+                raise CommandError(f"{label}: {mismatches} prompt(s) convert differently.")
+
+            number = options['number'] or self._calibrate(batch)
+            bleach_time = self._time(bleach_html_to_script, batch, number)
+            parser_time = self._time(script_converter.html_to_script, batch, number)
+            self.stdout.write(
+                f"{label:<16}{sum(map(len, batch)):>10}{bleach_time * 1000:>10.2f}ms{parser_time * 1000:>12.2f}ms"
+                f"{bleach_time / parser_time:>9.1f}x"
+            )
+
+    def _calibrate(self, batch):
+        elapsed = self._time(bleach_html_to_script, batch, 1)
+        return max(1, int(0.2 / max(elapsed, 1e-6)))
+
+    def _time(self, convert, batch, number):
+        """
+        Returns the seconds one pass over `batch` takes, the best of three runs of `number` passes.
+        """
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(number):
+                for prompt in batch:
+                    convert(prompt)
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
@@ -0,0 +1,100 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from agents.parsers import FastJSONParser
+from agents.renderers import FastJSONRenderer, orjson
+
+
+def sample_pathway(node_count):
+    """
+    Returns a pathway response body with `node_count` nodes chained by edges.
+    """
+    nodes = {
+        str(node): {
+            'id': str(node),
+            'type': 'Default',
+            'data': {
+                'name': f'Step {node}',
+                'prompt': f'Ask the caller about step {node} and confirm their answer – “politely”.',
+                'condition': 'The caller answered',
+                'temperature': 0.7,
+                'isStart': node == 0,
+                'position': {'x': node * 120.5, 'y': (node % 7) * 80},
+            },
+        }
+        for node in range(node_count)
+    }
+    edges = {
+        str(node): {'id': f'e{node}', 'source': str(node), 'target': str(node + 1), 'label': 'next'}
+        for node in range(node_count - 1)
+    }
+    now = timezone.now()
+    return {
+        'id': 1, 'name': 'Benchmark pathway', 'description': '', 'bland_ai_pathway_id': 'benchmark',
+        'nodes': nodes, 'edges': edges, 'created_at': now, 'updated_at': now, 'sync_status': 'synced',
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Times request parsing and response rendering of large pathway bodies with DRF's stdlib JSON "
+        "and with the orjson-backed parser and renderer, and checks that both agree."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', default='100,1000,10000', help="Comma-separated node counts.")
+        parser.add_argument('--number', type=int, default=0,
+                            help="Runs per timing. By default enough for about 0.2 seconds of stdlib time.")
+
+    def handle(self, *args, **options):
+        try:
+            node_counts = [int(count) for count in options['nodes'].split(',')]
+        except ValueError:
+            raise CommandError("--nodes must be a comma-separated list of integers.")
+        if orjson is None:
+            self.stderr.write("orjson is not installed; both columns time the stdlib.")
+
+        self.stdout.write(
+            f"{'nodes':>8}{'bytes':>12}{'parse stdlib':>15}{'parse fast':>13}{'render stdlib':>16}{'render fast':>14}"
+        )
+        for count in node_counts:
+            data = sample_pathway(count)
+            body = JSONRenderer().render(data)
+            if FastJSONRenderer().render(data) != body:
+                raise CommandError(f"{count} nodes: the fast renderer produces different JSON.")
+            if FastJSONParser().parse(io.BytesIO(body)) != JSONParser().parse(io.BytesIO(body)):
+                raise CommandError(f"{count} nodes: the fast parser produces different data.")
+
+            timings = [
+                self._time(lambda: parser.parse(io.BytesIO(body)), options['number'])
+                for parser in (JSONParser(), FastJSONParser())
+            ] + [
+                self._time(lambda: renderer.render(data), options['number'])
+                for renderer in (JSONRenderer(), FastJSONRenderer())
+            ]
+            self.stdout.write(
+                f"{count:>8}{len(body):>12}" + ''.join(
+                    f"{seconds * 1000:>{width - 2}.2f}ms" for seconds, width in zip(timings, (15, 13, 16, 14))
+                )
+            )
+
+    def _time(self, run, number):
+        """
+        Returns the seconds one run takes, the best of three batches of `number` runs.
+        """
+        if not number:
+            start = time.perf_counter()
+            run()
+            number = max(1, int(0.2 / max(time.perf_counter() - start, 1e-6)))
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(number):
+                run()
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
@@ -0,0 +1,114 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from agents.models import Agent, ConversationalPathway
+from agents.serializers import AgentSerializer, ConversationalPathwaySerializer, ValuesRowMapper
+
+RESOURCES = {
+    'agents': (Agent, AgentSerializer),
+    'pathways': (ConversationalPathway, ConversationalPathwaySerializer),
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def sample_agent(index):
+    return Agent(
+        name=f'Benchmark agent {index}',
+        bland_ai_id=f'benchmark-agent-{index}',
+        prompt='<p>Hello, this is <b>Ava</b>.</p>',
+        script='Hello, this is Ava.',
+        analysis_schema={'budget': 'number', 'interested': 'boolean'},
+        metadata={'campaign': 'spring', 'index': index},
+        pathway_id='',
+        first_sentence='Hi there!',
+        tools=[
+            {'tool_name': 'calendar', 'description': 'Books a demo', 'timeout': 30},
+            {'tool_name': 'crm', 'description': 'Looks up the caller', 'url': 'https://example.com/crm'},
+        ],
+        dynamic_data={'customer': {'tier': 'gold'}},
+        keywords=['demo', 'pricing'],
+        webhook='https://example.com/webhook',
+    )
+
+
+def sample_pathway(index):
+    nodes = {str(node): {'type': 'Default', 'prompt': f'Step {node}'} for node in range(10)}
+    edges = {str(node): {'source': str(node), 'target': str(node + 1)} for node in range(9)}
+    return ConversationalPathway(
+        name=f'Benchmark pathway {index}', description='Benchmark pathway',
+        bland_ai_pathway_id=f'benchmark-pathway-{index}', nodes=nodes, edges=edges,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Times list serialization through the DRF serializer against the .values() row mapper, in rows "
+        "per second, and checks that both render the same JSON. Sample rows are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', default='10,100,1000', help="Comma-separated page sizes.")
+        parser.add_argument('--resource', choices=sorted(RESOURCES), default='agents')
+        parser.add_argument('--number', type=int, default=0,
+                            help="Pages per timing. By default enough for about 0.2 seconds of serializer time.")
+
+    def handle(self, *args, **options):
+        try:
+            page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--page-sizes must be a comma-separated list of integers.")
+        model, serializer_class = RESOURCES[options['resource']]
+        sample = sample_agent if model is Agent else sample_pathway
+
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([sample(index) for index in range(max(page_sizes))])
+                self._report(model, serializer_class, page_sizes, options['number'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _report(self, model, serializer_class, page_sizes, number):
+        mapper = ValuesRowMapper(serializer_class)
+        renderer = JSONRenderer()
+
+        def serialize(size):
+            return serializer_class(model.objects.order_by('pk')[:size], many=True).data
+
+        def map_rows(size):
+            return mapper.map(model.objects.order_by('pk').values(*mapper.columns)[:size])
+
+        self.stdout.write(f"{'page size':<12}{'serializer':>16}{'values':>16}{'speedup':>10}")
+        for size in page_sizes:
+            if renderer.render(serialize(size)) != renderer.render(map_rows(size)):
+                raise CommandError(f"Page size {size}: the row mapper renders different JSON.")
+
+            pages = number or self._calibrate(serialize, size)
+            serializer_time = self._time(serialize, size, pages)
+            values_time = self._time(map_rows, size, pages)
+            self.stdout.write(
+                f"{size:<12}{size / serializer_time:>11.0f} rows/s{size / values_time:>11.0f} rows/s"
+                f"{serializer_time / values_time:>9.1f}x"
+            )
+
+    def _calibrate(self, page, size):
+        elapsed = self._time(page, size, 1)
+        return max(1, int(0.2 / max(elapsed, 1e-6)))
+
+    def _time(self, page, size, number):
+        """
+        Returns the seconds one page takes, including its query, the best of three runs of `number` pages.
+        """
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(number):
+                page(size)
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
@@ -0,0 +1,44 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from agents.outbox import debounce_stats, dispatch_pending, release_stale_events, retry_failed
+
+
+class Command(BaseCommand):
+    help = "Drains the Bland AI sync outbox. Run one or more of these alongside the web workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Events claimed per poll.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--worker-id', default=f"{socket.gethostname()}:{os.getpid()}",
+                            help="Name recorded on claimed events. Must be unique per dispatcher process.")
+        parser.add_argument('--once', action='store_true', help="Process a single batch and exit.")
+        parser.add_argument('--retry-failed', action='store_true', help="Re-queue failed events before starting.")
+        parser.add_argument('--stats', action='store_true', help="Print how many update calls debouncing saved and exit.")
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id']
+
+        if options['stats']:
+            stats = debounce_stats()
+            self.stdout.write(
+                f"{stats['update_requests']} update request(s) became {stats['remote_updates']} Bland AI update(s); "
+                f"{stats['remote_calls_saved']} call(s) saved."
+            )
+            return
+
+        if options['retry_failed']:
+            self.stdout.write(f"Re-queued {retry_failed()} failed event(s).")
+
+        self.stdout.write(f"Outbox dispatcher {worker_id} started.")
+        while True:
+            release_stale_events()
+            processed = dispatch_pending(worker_id, batch_size=options['batch_size'])
+            if options['once']:
+                self.stdout.write(f"Processed {processed} event(s).")
+                return
+            if not processed:
+                time.sleep(options['poll_interval'])
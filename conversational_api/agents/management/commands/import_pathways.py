@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.models import PathwayImport
+from agents.pathway_import import import_pathways
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports pathways from an NDJSON file (one pathway per line, e.g. from /api/v1/pathways/export/), "
+        "reading it incrementally. Re-running an interrupted import resumes after the last committed batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="NDJSON file to import, or - for standard input.")
+        parser.add_argument('--key', help="Resume key. Defaults to the file's absolute path; required for stdin.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Lines per transaction.")
+        parser.add_argument('--queue-sync', action='store_true',
+                            help="Queue a Bland AI create in the outbox for every imported pathway.")
+        parser.add_argument('--restart', action='store_true',
+                            help="Forget the progress recorded under the key and import from the first line.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        key = options['key'] or (None if path == '-' else f'file:{os.path.abspath(path)}')
+        if key is None:
+            raise CommandError("--key is required when importing from standard input.")
+        if options['restart']:
+            PathwayImport.objects.filter(key=key).delete()
+
+        try:
+            stream = nullcontext(sys.stdin.buffer) if path == '-' else open(path, 'rb')
+        except OSError as e:
+            raise CommandError(f"Cannot open {path}: {e}")
+        with stream as lines:
+            summary = import_pathways(lines, key=key, batch_size=options['batch_size'],
+                                      queue_sync=options['queue_sync'])
+
+        for error in summary['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['error'])}")
+        resumed = f", resumed after line {summary['resumed_after_line']}" if summary['resumed_after_line'] else ''
+        self.stdout.write(
+            f"Imported {summary['created']} pathway(s), rejected {summary['failed']}, "
+            f"up to line {summary['committed_line']}{resumed}."
+        )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from agents.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Deletes Idempotency-Key records past their TTL. Run it periodically, e.g. from cron."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Purged {purge_expired()} expired idempotency key(s).")
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from agents.reconcile import reconcile_pathways
+
+
+class Command(BaseCommand):
+    help = "Pulls conversational pathways from Bland AI and applies only the differences locally."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows per bulk_create query.")
+        parser.add_argument('--prune', action='store_true', help="Delete local pathways that no longer exist in Bland AI.")
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Repeat every N seconds instead of running once (for use as a periodic job).")
+
+    def handle(self, *args, **options):
+        while True:
+            stats = reconcile_pathways(batch_size=options['batch_size'], prune=options['prune'])
+            self.stdout.write(
+                f"{stats['remote']} remote pathway(s): {stats['created']} created, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged, {stats['deleted']} deleted, {stats['skipped']} skipped with local "
+                f"changes not yet pushed, {stats['conflicts']} changed locally during the run."
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
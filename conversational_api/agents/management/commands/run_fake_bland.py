@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from agents.fake_bland import FakeBlandServer
+
+
+class Command(BaseCommand):
+    help = "Runs a local stand-in for the Bland AI API. Point BLAND_AI_BASE_URL at the printed URL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', default='0',
+                            help="Response delay: seconds, or constant:S, uniform:LOW,HIGH, exponential:MEAN, lognormal:MEDIAN,SIGMA.")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with --error-status.")
+        parser.add_argument('--error-status', type=int, default=503)
+        parser.add_argument('--rate-limit', type=int, default=None, help="Requests allowed per --rate-window before 429s.")
+        parser.add_argument('--rate-window', type=float, default=1.0, help="Rate limit window in seconds.")
+        parser.add_argument('--seed', type=int, default=None, help="Seed for latency and error sampling.")
+
+    def handle(self, *args, **options):
+        server = FakeBlandServer(
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'],
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            rate_limit=options['rate_limit'],
+            rate_window=options['rate_window'],
+            seed=options['seed'],
+        )
+        self.stdout.write(f"Fake Bland AI listening on {server.url} (latency {server.state.latency.description}, "
+                          f"error rate {options['error_rate']}, rate limit {options['rate_limit'] or 'off'}).")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+            self.stdout.write(f"Stopped. {server.state.stats()}")
@@ -0,0 +1,30 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.models import ConversationalPathway
+from agents.pathway_graph import delete_orphaned_graphs, graph_tables_enabled, sync_pathway_graphs
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the PathwayNode/PathwayEdge tables from the nodes and edges documents of every pathway, "
+        "and deletes the rows of pathways that no longer exist. "
+        "Run it once after setting PATHWAY_GRAPH_TABLES = True; later writes keep the tables in sync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help="Pathways per transaction.")
+
+    def handle(self, *args, **options):
+        if not graph_tables_enabled():
+            raise CommandError("PATHWAY_GRAPH_TABLES is off, so the tables would not be read or kept in sync.")
+
+        pathways = ConversationalPathway.objects.only('id', 'nodes', 'edges').order_by('id').iterator(
+            chunk_size=options['batch_size'])
+        synced = 0
+        while batch := list(islice(pathways, options['batch_size'])):
+            sync_pathway_graphs(batch)
+            synced += len(batch)
+        orphaned = delete_orphaned_graphs()
+        self.stdout.write(f"Synced the nodes and edges of {synced} pathway(s), deleted {orphaned} orphaned row(s).")
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_rows_synced(apps, schema_editor):
+    # Rows created before the outbox existed were synchronized inline with Bland AI
+    apps.get_model('agents', 'Agent').objects.update(sync_status='synced')
+    apps.get_model('agents', 'ConversationalPathway').objects.update(sync_status='synced')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0010_alter_conversationalpathway_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agent',
+            name='sync_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('synced', 'Synced'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='conversationalpathway',
+            name='sync_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('synced', 'Synced'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_rows_synced, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='BlandSyncEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(choices=[('agent', 'Agent'), ('pathway', 'Conversational Pathway')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('operation', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=255, null=True)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='bland_outbox_ready_idx'), models.Index(fields=['object_type', 'object_id', 'id'], name='bland_outbox_object_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+from agents.utils import pathway_content_hash
+
+
+def backfill_content_hash(apps, schema_editor):
+    ConversationalPathway = apps.get_model('agents', 'ConversationalPathway')
+    batch = []
+    for pathway in ConversationalPathway.objects.only('id', 'name', 'description', 'nodes', 'edges').iterator(chunk_size=500):
+        pathway.content_hash = pathway_content_hash(pathway.name, pathway.description, pathway.nodes, pathway.edges)
+        batch.append(pathway)
+        if len(batch) >= 500:
+            ConversationalPathway.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    ConversationalPathway.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0011_bland_sync_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationalpathway',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0012_conversationalpathway_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agent',
+            name='bland_sync_state',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversationalpathway',
+            name='bland_sync_state',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0013_bland_sync_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blandsyncevent',
+            name='coalesced_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0016_pathwayimport'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agent',
+            index=models.Index(fields=['created_at', 'id'], name='agent_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversationalpathway',
+            index=models.Index(fields=['created_at', 'id'], name='pathway_created_id_idx'),
+        ),
+    ]
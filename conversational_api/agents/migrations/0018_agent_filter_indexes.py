@@ -0,0 +1,56 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:00
+
+from django.db import migrations, models
+
+# GIN indexes serve the containment (@>) queries agents.filters sends to PostgreSQL
+POSTGRESQL_INDEXES = [
+    ('agent_metadata_gin_idx', 'USING gin ("metadata" jsonb_path_ops)'),
+    ('agent_dynamic_data_gin_idx', 'USING gin ("dynamic_data" jsonb_path_ops)'),
+    ('agent_keywords_gin_idx', 'USING gin ("keywords" jsonb_path_ops)'),
+]
+# Other databases only get an expression index on the path filtered most (other paths and keywords scan);
+# the expression must match the query's
+FALLBACK_INDEXES = [
+    ('agent_metadata_customer_id_idx', """(JSON_EXTRACT("metadata", '$."customer_id"'))"""),
+]
+
+
+def indexes_for(connection):
+    return POSTGRESQL_INDEXES if connection.vendor == 'postgresql' else FALLBACK_INDEXES
+
+
+def create_json_indexes(apps, schema_editor):
+    for name, definition in indexes_for(schema_editor.connection):
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "agents_agent" {definition}')
+
+
+def drop_json_indexes(apps, schema_editor):
+    for name, _ in indexes_for(schema_editor.connection):
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0017_created_at_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agent',
+            index=models.Index(fields=['model', 'language'], name='agent_model_language_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agent',
+            index=models.Index(fields=['language'], name='agent_language_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agent',
+            index=models.Index(fields=['voice'], name='agent_voice_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agent',
+            index=models.Index(fields=['pathway_id'], name='agent_pathway_id_idx'),
+        ),
+        migrations.RunPython(create_json_indexes, drop_json_indexes),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0018_agent_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PathwayEdge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('edge_id', models.CharField(max_length=255)),
+                ('source', models.CharField(blank=True, max_length=255, null=True)),
+                ('target', models.CharField(blank=True, max_length=255, null=True)),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('pathway', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='graph_edges', to='agents.conversationalpathway')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['pathway', 'source'], name='pathway_edge_source_idx'), models.Index(fields=['pathway', 'target'], name='pathway_edge_target_idx')],
+                'constraints': [models.UniqueConstraint(fields=('pathway', 'edge_id'), name='pathway_edge_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PathwayNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_id', models.CharField(max_length=255)),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('pathway', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='graph_nodes', to='agents.conversationalpathway')),
+            ],
+            options={
+                'ordering': ['id'],
+                'constraints': [models.UniqueConstraint(fields=('pathway', 'node_id'), name='pathway_node_unique')],
+            },
+        ),
+    ]
@@ -1,8 +1,45 @@
 #agents/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from .utils import pathway_content_hash
 
-class Agent(models.Model):
+
+class SyncStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    SYNCED = 'synced', 'Synced'
+    FAILED = 'failed', 'Failed'
+
+
+class VersionConflict(Exception):
+    """
+    Raised by save() when the row was updated since the instance read its version.
+    """
+
+
+class VersionedModel:
+    """
+    Optimistic concurrency on the `version` counter. Saving an existing row runs
+    `UPDATE ... SET ..., version = version + 1 WHERE id = %s AND version = %s` with the version the
+    instance holds, so of two writers that read the same version only the first one lands: the second
+    gets VersionConflict instead of overwriting it, and no increment is lost.
+    """
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected = self.version
+        version_field = self._meta.get_field('version')
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, F('version') + 1))
+        if super()._do_update(base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update):
+            self.version = expected + 1
+            return True
+        if base_qs.filter(pk=pk_val).exists():
+            raise VersionConflict(f"{self._meta.verbose_name} {pk_val} is no longer at version {expected}.")
+        return False  # Deleted meanwhile: save() inserts it again, as it always has
+
+
+class Agent(VersionedModel, models.Model):
     name = models.CharField(max_length=255)
     bland_ai_id = models.CharField(max_length=255, unique=True, null=True, blank=True)  # Allow null and blank initially
     prompt = models.TextField()
@@ -23,13 +60,30 @@ class Agent(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     version = models.IntegerField(default=0)
-    
-    def save(self, *args, **kwargs):
-        if self.pk:  # Check if it's an update
-            self.version += 1
-        super().save(*args, **kwargs)
+    sync_status = models.CharField(max_length=10, choices=SyncStatus.choices, default=SyncStatus.PENDING)
+    bland_sync_state = models.JSONField(null=True, blank=True)  # Field -> hash of the value last synced to Bland AI
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='agent_created_id_idx'),  # Cursor pagination
+            # Filters (agents.filters.AgentFilterBackend); the JSON indexes are created by migration 0018
+            models.Index(fields=['model', 'language'], name='agent_model_language_idx'),
+            models.Index(fields=['language'], name='agent_language_idx'),
+            models.Index(fields=['voice'], name='agent_voice_idx'),
+            models.Index(fields=['pathway_id'], name='agent_pathway_id_idx'),
+        ]
+
+
+class ConversationalPathwayQuerySet(models.QuerySet):
+    def delete(self):
+        from .pathway_graph import delete_pathway_graphs  # Imports this module
 
-class ConversationalPathway(models.Model):
+        with transaction.atomic(using=self.db):
+            delete_pathway_graphs(self.values('pk'))
+            return super().delete()
+
+
+class ConversationalPathway(VersionedModel, models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
     bland_ai_pathway_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
@@ -38,11 +92,168 @@ class ConversationalPathway(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     version = models.IntegerField(default=0)
+    sync_status = models.CharField(max_length=10, choices=SyncStatus.choices, default=SyncStatus.PENDING)
+    content_hash = models.CharField(max_length=64, null=True, blank=True)  # See utils.pathway_content_hash
+    bland_sync_state = models.JSONField(null=True, blank=True)  # Field -> hash of the value last synced to Bland AI
+
+    objects = ConversationalPathwayQuerySet.as_manager()
 
     class Meta:
         ordering = ['created_at'] 
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='pathway_created_id_idx'),  # Ordering and cursor pagination
+        ]
         
     def save(self, *args, **kwargs):
-        if self.pk:  # Check if it's an update
-            self.version += 1
-        super().save(*args, **kwargs)
\ No newline at end of file
+        from .pathway_graph import graph_tables_enabled, sync_pathway_graphs  # Imports this module
+
+        content_hash = pathway_content_hash(self.name, self.description, self.nodes, self.edges)
+        graph_changed = self._state.adding or content_hash != self.content_hash
+        self.content_hash = content_hash
+        if not (graph_changed and graph_tables_enabled()):
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            sync_pathway_graphs([self])
+
+    def delete(self, *args, **kwargs):
+        from .pathway_graph import delete_pathway_graphs  # Imports this module
+
+        with transaction.atomic(using=kwargs.get('using')):
+            delete_pathway_graphs([self.pk])
+            return super().delete(*args, **kwargs)
+
+
+class PathwayNode(models.Model):
+    """
+    One node of a pathway's `nodes` document, kept in sync with it when PATHWAY_GRAPH_TABLES is on
+    (see agents.pathway_graph), so a single node is read without loading the whole graph.
+    """
+    # Deleted with the pathway by ConversationalPathway.delete(); no ORM cascade, which would load the
+    # whole pathway rows (nodes and edges included) before every delete
+    pathway = models.ForeignKey(ConversationalPathway, on_delete=models.DO_NOTHING, db_constraint=False,
+                                related_name='graph_nodes')
+    node_id = models.CharField(max_length=255)
+    data = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['pathway', 'node_id'], name='pathway_node_unique'),  # Node lookups
+        ]
+
+
+class PathwayEdge(models.Model):
+    """
+    One edge of a pathway's `edges` document, with its endpoints in indexed columns.
+    """
+    # Deleted with the pathway by ConversationalPathway.delete(); no ORM cascade, which would load the
+    # whole pathway rows (nodes and edges included) before every delete
+    pathway = models.ForeignKey(ConversationalPathway, on_delete=models.DO_NOTHING, db_constraint=False,
+                                related_name='graph_edges')
+    edge_id = models.CharField(max_length=255)
+    source = models.CharField(max_length=255, null=True, blank=True)
+    target = models.CharField(max_length=255, null=True, blank=True)
+    data = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['pathway', 'edge_id'], name='pathway_edge_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['pathway', 'source'], name='pathway_edge_source_idx'),  # Edges of a node
+            models.Index(fields=['pathway', 'target'], name='pathway_edge_target_idx'),
+        ]
+
+
+class BlandSyncEvent(models.Model):
+    """
+    Outbox entry for a Bland AI call that still has to be made for a local agent or pathway.
+    Written in the same transaction as the local save and drained by the `dispatch_bland_outbox` command.
+    """
+    class ObjectType(models.TextChoices):
+        AGENT = 'agent', 'Agent'
+        PATHWAY = 'pathway', 'Conversational Pathway'
+
+    class Operation(models.TextChoices):
+        CREATE = 'create', 'Create'
+        UPDATE = 'update', 'Update'
+        DELETE = 'delete', 'Delete'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PROCESSING = 'processing', 'Processing'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    object_type = models.CharField(max_length=10, choices=ObjectType.choices)
+    object_id = models.BigIntegerField()  # Not a foreign key: delete events outlive the row they refer to
+    operation = models.CharField(max_length=10, choices=Operation.choices)
+    payload = models.JSONField(default=dict, blank=True)  # Request fields to push, or the remote id for deletes
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.IntegerField(default=0)
+    coalesced_count = models.IntegerField(default=0)  # Later saves folded into this event by debounced sync
+    last_error = models.TextField(null=True, blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='bland_outbox_ready_idx'),
+            models.Index(fields=['object_type', 'object_id', 'id'], name='bland_outbox_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.operation} {self.object_type} #{self.object_id} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The outcome of a create request sent with an `Idempotency-Key` header, replayed to retries of the
+    same request until `expires_at`.
+    """
+    class Status(models.TextChoices):
+        IN_PROGRESS = 'in_progress', 'In progress'
+        COMPLETED = 'completed', 'Completed'
+
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=255)  # Method, path and caller the key was used for
+    request_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.IN_PROGRESS)
+    response_status = models.IntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    locked_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotency_scope_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
+
+
+class PathwayImport(models.Model):
+    """
+    Progress of an NDJSON pathway import run under `key`. `committed_line` moves forward in the same
+    transaction as each batch it covers, so an interrupted import resumes after the last written batch.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    committed_line = models.IntegerField(default=0)  # Lines 1..committed_line are imported or rejected
+    created_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} (line {self.committed_line})"
@@ -0,0 +1,330 @@
+# agents/outbox.py
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Sum
+from django.utils import timezone
+
+from .bland_client import get_bland_client
+from .models import Agent, BlandSyncEvent, ConversationalPathway, SyncStatus
+
+logger = logging.getLogger(__name__)
+
+MODELS = {
+    BlandSyncEvent.ObjectType.AGENT: Agent,
+    BlandSyncEvent.ObjectType.PATHWAY: ConversationalPathway,
+}
+
+# Events that keep later events for the same object waiting, so each object is synced in order
+BLOCKING_STATUSES = [BlandSyncEvent.Status.PENDING, BlandSyncEvent.Status.PROCESSING, BlandSyncEvent.Status.FAILED]
+
+
+def sync_via_outbox():
+    """
+    True when writes should queue their Bland AI call instead of making it inside the request.
+    """
+    return getattr(settings, 'BLAND_AI_SYNC_MODE', 'inline') in ('outbox', 'debounced')
+
+
+def debounce_window():
+    """
+    Seconds an update waits in the outbox for later saves of the same object, or 0 when not debouncing.
+    """
+    if getattr(settings, 'BLAND_AI_SYNC_MODE', 'inline') != 'debounced':
+        return 0
+    return getattr(settings, 'BLAND_AI_SYNC_DEBOUNCE_SECONDS', 10)
+
+
+def object_type_for(instance):
+    if isinstance(instance, Agent):
+        return BlandSyncEvent.ObjectType.AGENT
+    return BlandSyncEvent.ObjectType.PATHWAY
+
+
+def enqueue_sync(instance, operation, request_data=None):
+    """
+    Records a Bland AI call for `instance` in the outbox and marks the instance as pending.
+    Must be called inside the transaction that saves (or deletes) the instance.
+    """
+    payload = {'fields': list(request_data.keys()) if request_data else []}
+    if operation == BlandSyncEvent.Operation.DELETE:
+        payload['bland_id'] = remote_id(instance)
+
+    event = None
+    if operation == BlandSyncEvent.Operation.UPDATE and debounce_window():
+        event = _coalesce_update(instance, payload)
+    if event is None:
+        event = BlandSyncEvent.objects.create(
+            object_type=object_type_for(instance),
+            object_id=instance.pk,
+            operation=operation,
+            payload=payload,
+            available_at=_debounced_until(timezone.now()) if operation == BlandSyncEvent.Operation.UPDATE else timezone.now(),
+        )
+
+    if operation != BlandSyncEvent.Operation.DELETE:
+        # Queryset update so the version counter is not bumped a second time
+        type(instance).objects.filter(pk=instance.pk).update(sync_status=SyncStatus.PENDING)
+        instance.sync_status = SyncStatus.PENDING
+    logger.info(f"Queued Bland AI sync: {event}.")
+    return event
+
+
+def _debounced_until(first_queued_at):
+    """
+    When a debounced update becomes ready: `BLAND_AI_SYNC_DEBOUNCE_SECONDS` after the latest save, but never
+    later than `BLAND_AI_SYNC_DEBOUNCE_MAX_WAIT` after the first one, so constant autosaves still get pushed.
+    """
+    window = debounce_window()
+    if not window:
+        return timezone.now()
+    max_wait = getattr(settings, 'BLAND_AI_SYNC_DEBOUNCE_MAX_WAIT', 60)
+    return min(timezone.now() + timedelta(seconds=window), first_queued_at + timedelta(seconds=max_wait))
+
+
+def _coalesce_update(instance, payload):
+    """
+    Folds this save into the object's queued update, if that update is still the last thing queued for the
+    object and no dispatcher has claimed it. The dispatcher reads the row when it sends, so the pushed
+    payload is always the latest version. Returns the event, or None when a new one is needed.
+    """
+    latest = (
+        BlandSyncEvent.objects
+        .filter(object_type=object_type_for(instance), object_id=instance.pk)
+        .order_by('-id')
+        .first()
+    )
+    if latest is None or latest.operation != BlandSyncEvent.Operation.UPDATE or latest.status != BlandSyncEvent.Status.PENDING:
+        return None
+
+    fields = list(dict.fromkeys(latest.payload.get('fields', []) + payload['fields']))
+    merged = dict(latest.payload, fields=fields, version=instance.version)
+    # Conditional on the pending status, so an event a dispatcher claimed in the meantime is left alone
+    coalesced = BlandSyncEvent.objects.filter(pk=latest.pk, status=BlandSyncEvent.Status.PENDING).update(
+        payload=merged,
+        available_at=_debounced_until(latest.created_at),
+        coalesced_count=F('coalesced_count') + 1,
+    )
+    if not coalesced:
+        return None
+    latest.refresh_from_db()
+    return latest
+
+
+def debounce_stats():
+    """
+    Counts update requests against the remote update calls they turned into.
+    """
+    totals = BlandSyncEvent.objects.filter(operation=BlandSyncEvent.Operation.UPDATE).aggregate(
+        events=Count('id'), coalesced=Sum('coalesced_count')
+    )
+    saved = totals['coalesced'] or 0
+    return {
+        'update_requests': totals['events'] + saved,
+        'remote_updates': totals['events'],
+        'remote_calls_saved': saved,
+    }
+
+
+def enqueue_bulk_create(instances, request_items):
+    """
+    Queues a create event for each freshly bulk-inserted instance with two queries in total.
+    Must be called inside the transaction that inserted the instances.
+    """
+    if not instances:
+        return []
+    events = BlandSyncEvent.objects.bulk_create([
+        BlandSyncEvent(
+            object_type=object_type_for(instance),
+            object_id=instance.pk,
+            operation=BlandSyncEvent.Operation.CREATE,
+            payload={'fields': list(item.keys())},
+        )
+        for instance, item in zip(instances, request_items)
+    ])
+    type(instances[0]).objects.filter(pk__in=[instance.pk for instance in instances]).update(
+        sync_status=SyncStatus.PENDING
+    )
+    for instance in instances:
+        instance.sync_status = SyncStatus.PENDING
+    logger.info(f"Queued {len(events)} Bland AI create event(s).")
+    return events
+
+
+def remote_id(instance):
+    if isinstance(instance, Agent):
+        return instance.bland_ai_id
+    return instance.bland_ai_pathway_id
+
+
+def release_stale_events(lock_timeout=None):
+    """
+    Returns events whose worker died mid-call to the pending state.
+    """
+    lock_timeout = lock_timeout or getattr(settings, 'BLAND_OUTBOX_LOCK_TIMEOUT', 300)
+    cutoff = timezone.now() - timedelta(seconds=lock_timeout)
+    released = BlandSyncEvent.objects.filter(
+        status=BlandSyncEvent.Status.PROCESSING, locked_at__lt=cutoff
+    ).update(status=BlandSyncEvent.Status.PENDING, locked_by=None, locked_at=None)
+    if released:
+        logger.warning(f"Released {released} stale outbox event(s).")
+    return released
+
+
+def claim_events(worker_id, batch_size=50):
+    """
+    Claims up to `batch_size` ready events for this worker.
+
+    Only the oldest unfinished event of each object is eligible, and each claim is a conditional
+    UPDATE on the pending status, so any number of dispatcher processes can run side by side
+    without two of them working on the same object at once.
+    """
+    now = timezone.now()
+    earlier_unfinished = BlandSyncEvent.objects.filter(
+        object_type=OuterRef('object_type'),
+        object_id=OuterRef('object_id'),
+        id__lt=OuterRef('id'),
+        status__in=BLOCKING_STATUSES,
+    )
+    candidates = list(
+        BlandSyncEvent.objects
+        .filter(status=BlandSyncEvent.Status.PENDING, available_at__lte=now)
+        .filter(~Exists(earlier_unfinished))
+        .order_by('id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+
+    claimed = []
+    for event_id in candidates:
+        won = BlandSyncEvent.objects.filter(id=event_id, status=BlandSyncEvent.Status.PENDING).update(
+            status=BlandSyncEvent.Status.PROCESSING, locked_by=worker_id, locked_at=now
+        )
+        if won:
+            claimed.append(event_id)
+    return list(BlandSyncEvent.objects.filter(id__in=claimed).order_by('id'))
+
+
+def dispatch_event(event, client=None):
+    """
+    Makes the Bland AI call recorded in `event` and records the outcome.
+    Returns True when the call succeeded.
+    """
+    client = client or get_bland_client()
+    try:
+        _send(event, client)
+    except Exception as e:
+        _record_failure(event, e)
+        return False
+
+    with transaction.atomic():
+        BlandSyncEvent.objects.filter(pk=event.pk).update(
+            status=BlandSyncEvent.Status.DONE, attempts=event.attempts + 1,
+            last_error=None, locked_by=None, locked_at=None, payload=event.payload,
+        )
+        _refresh_sync_status(event)
+    logger.info(f"Dispatched Bland AI sync: {event}.")
+    return True
+
+
+def dispatch_pending(worker_id, batch_size=50, client=None):
+    """
+    Claims and dispatches one batch of events. Returns the number of events processed.
+    """
+    events = claim_events(worker_id, batch_size)
+    for event in events:
+        dispatch_event(event, client=client)
+    return len(events)
+
+
+def retry_failed():
+    """
+    Puts permanently failed events back in the queue.
+    """
+    return BlandSyncEvent.objects.filter(status=BlandSyncEvent.Status.FAILED).update(
+        status=BlandSyncEvent.Status.PENDING, attempts=0, available_at=timezone.now()
+    )
+
+
+def _send(event, client):
+    model = MODELS[event.object_type]
+    fields = event.payload.get('fields', [])
+
+    if event.operation == BlandSyncEvent.Operation.DELETE:
+        bland_id = event.payload.get('bland_id') or _created_remote_id(event)
+        if not bland_id:
+            logger.warning(f"{event} has no Bland AI id. Skipping Bland AI deletion.")
+            return
+        if model is Agent:
+            client.delete_agent(bland_id)
+        else:
+            client.delete_conversational_pathway(bland_id)
+        return
+
+    instance = model.objects.filter(pk=event.object_id).first()
+    if instance is None:
+        logger.warning(f"{event} refers to a deleted object. Skipping.")
+        return
+
+    if event.operation == BlandSyncEvent.Operation.CREATE:
+        if model is Agent:
+            bland_id = client.create_agent(instance, fields)
+            Agent.objects.filter(pk=instance.pk).update(bland_ai_id=bland_id, bland_sync_state=instance.bland_sync_state)
+        else:
+            bland_id = client.create_conversational_pathway(instance, fields)
+            ConversationalPathway.objects.filter(pk=instance.pk).update(
+                bland_ai_pathway_id=bland_id, bland_sync_state=instance.bland_sync_state
+            )
+        # Kept on the event so a delete queued before this call finished can still find the remote object
+        event.payload['bland_id'] = bland_id
+        return
+
+    if not remote_id(instance):
+        raise ValueError(f"{model._meta.verbose_name} #{instance.pk} has no Bland AI id to update.")
+    if model is Agent:
+        client.update_agent(instance, fields)
+    else:
+        client.update_conversational_pathway(instance, fields)
+
+
+def _created_remote_id(event):
+    create = (
+        BlandSyncEvent.objects
+        .filter(object_type=event.object_type, object_id=event.object_id,
+                operation=BlandSyncEvent.Operation.CREATE, status=BlandSyncEvent.Status.DONE)
+        .order_by('-id')
+        .first()
+    )
+    return create.payload.get('bland_id') if create else None
+
+
+def _record_failure(event, error):
+    attempts = event.attempts + 1
+    max_attempts = getattr(settings, 'BLAND_OUTBOX_MAX_ATTEMPTS', 5)
+    logger.error(f"Bland AI sync failed for {event} (attempt {attempts}/{max_attempts}): {error}", exc_info=True)
+
+    if attempts >= max_attempts:
+        BlandSyncEvent.objects.filter(pk=event.pk).update(
+            status=BlandSyncEvent.Status.FAILED, attempts=attempts, last_error=str(error),
+            locked_by=None, locked_at=None,
+        )
+        if event.operation != BlandSyncEvent.Operation.DELETE:
+            MODELS[event.object_type].objects.filter(pk=event.object_id).update(sync_status=SyncStatus.FAILED)
+        return
+
+    backoff = getattr(settings, 'BLAND_OUTBOX_RETRY_BACKOFF', 5) * (2 ** (attempts - 1))
+    BlandSyncEvent.objects.filter(pk=event.pk).update(
+        status=BlandSyncEvent.Status.PENDING, attempts=attempts, last_error=str(error),
+        available_at=timezone.now() + timedelta(seconds=backoff), locked_by=None, locked_at=None,
+    )
+
+
+def _refresh_sync_status(event):
+    if event.operation == BlandSyncEvent.Operation.DELETE:
+        return
+    outstanding = BlandSyncEvent.objects.filter(
+        object_type=event.object_type, object_id=event.object_id, status__in=BLOCKING_STATUSES
+    ).exists()
+    if not outstanding:
+        MODELS[event.object_type].objects.filter(pk=event.object_id).update(sync_status=SyncStatus.SYNCED)
@@ -0,0 +1,65 @@
+# agents/pagination.py
+from django.conf import settings
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+
+
+class MaxPageSizeMixin:
+    """
+    Lets clients pick `?page_size=`, capped at PAGINATION_MAX_PAGE_SIZE.
+    """
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 100)
+
+
+class CreatedAtCursorPagination(MaxPageSizeMixin, CursorPagination):
+    """
+    Keyset pagination in `(created_at, id)` order. Each page is a range scan on the `(created_at, id)`
+    index of the model, with no COUNT(*) and no OFFSET, so deep pages cost the same as the first.
+    """
+    ordering = ('created_at', 'id')
+
+
+class LimitedPageNumberPagination(MaxPageSizeMixin, PageNumberPagination):
+    pass
+
+
+class CursorOrPageNumberPagination(BasePagination):
+    """
+    Cursor pagination, with page numbers kept for existing clients while they migrate.
+
+    Requests with `?page=` get the page-number format (`count`, `next`, `previous`, `results`); requests with
+    `?cursor=` or `?pagination=cursor` get cursor pages (`next`, `previous`, `results`). Other requests get
+    LIST_PAGINATION_DEFAULT ('page' until every client follows `next` links, then 'cursor').
+    """
+    ordering = CreatedAtCursorPagination.ordering  # Read from each row by the cursor
+
+    def __init__(self):
+        self.paginator = None
+
+    def uses_cursor(self, request):
+        params = request.query_params
+        if 'cursor' in params or params.get('pagination') == 'cursor':
+            return True
+        if 'page' in params or params.get('pagination') == 'page':
+            return False
+        return getattr(settings, 'LIST_PAGINATION_DEFAULT', 'page') == 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = CreatedAtCursorPagination() if self.uses_cursor(request) else LimitedPageNumberPagination()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return LimitedPageNumberPagination().get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
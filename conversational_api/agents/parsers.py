@@ -0,0 +1,45 @@
+# agents/parsers.py
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import json
+
+from .renderers import FastJSONRenderer, orjson
+
+
+def loads(body, encoding='utf-8', strict=True):
+    """
+    Parses a JSON document from bytes with orjson, or with the stdlib when orjson is missing or rejects
+    it, so the documents accepted are the stdlib's. Raises ValueError for invalid ones.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+    parse_constant = json.strict_constant if strict else None
+    return json.loads(body.decode(encoding), parse_constant=parse_constant)
+
+
+class FastJSONParser(JSONParser):
+    """
+    `JSONParser` backed by orjson when it is installed.
+
+    Bodies orjson rejects are parsed again by the stdlib, so the documents accepted and the error
+    raised for invalid ones are the same as with `JSONParser` (orjson is stricter about lone surrogates
+    and integers over 64 bits). Bodies in a charset other than UTF-8 are left to `JSONParser`.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return loads(stream.read(), encoding, self.strict)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,178 @@
+# agents/pathway_graph.py
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import CharField, Func, JSONField
+
+from .models import ConversationalPathway, PathwayEdge, PathwayNode
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BATCH_SIZE = 1000
+# Node and edge ids and edge endpoints are stored in columns of this length
+GRAPH_ID_MAX_LENGTH = PathwayNode._meta.get_field('node_id').max_length
+
+
+class JSONKey(Func):
+    """
+    `document -> key`, reading `key` as an object key even when it looks like a number (KeyTransform
+    reads `'1'` as an array index).
+    """
+    output_field = JSONField()
+
+    def __init__(self, expression, key):
+        super().__init__(expression)
+        self.key = key
+
+    def as_sql(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f'JSON_EXTRACT({sql}, %s)', [*params, '$.' + json.dumps(self.key)]
+
+    def as_postgresql(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f'({sql} -> %s)', [*params, self.key]
+
+
+class JSONType(Func):
+    """
+    The JSON type of a document: 'object', 'array', ...
+    """
+    function = 'JSON_TYPE'
+    output_field = CharField()
+
+    def as_postgresql(self, compiler, connection):
+        return super().as_sql(compiler, connection, function='JSONB_TYPEOF')
+
+
+def graph_tables_enabled():
+    return getattr(settings, 'PATHWAY_GRAPH_TABLES', False)
+
+
+def graph_entries(document):
+    """
+    Returns `(id, value)` for each node or edge of a `nodes`/`edges` document: the items of a dict keyed by
+    id, or the objects of a list carrying an `id` (Bland AI's own format). Ids repeated in a list keep their
+    last object, as they would in a dict.
+    """
+    if isinstance(document, dict):
+        return [(str(key), value) for key, value in document.items()]
+    entries = {}
+    if isinstance(document, list):
+        for value in document:
+            if isinstance(value, dict) and value.get('id') is not None:
+                entries[str(value['id'])] = value
+    return list(entries.items())
+
+
+def _fits(*ids):
+    return all(graph_id is None or len(graph_id) <= GRAPH_ID_MAX_LENGTH for graph_id in ids)
+
+
+def _endpoint(edge, key):
+    value = edge.get(key) if isinstance(edge, dict) else None
+    return None if value is None else str(value)
+
+
+def sync_pathway_graphs(pathways):
+    """
+    Rewrites the PathwayNode and PathwayEdge rows of saved `pathways` from their JSON documents, in one
+    transaction. Does nothing unless PATHWAY_GRAPH_TABLES is on.
+    """
+    if not graph_tables_enabled() or not pathways:
+        return
+    pks = [pathway.pk for pathway in pathways]
+    nodes, edges, skipped = [], [], 0
+    for pathway in pathways:
+        for node_id, data in graph_entries(pathway.nodes):
+            if not _fits(node_id):
+                skipped += 1
+                continue
+            nodes.append(PathwayNode(pathway_id=pathway.pk, node_id=node_id, data=data))
+        for edge_id, data in graph_entries(pathway.edges):
+            source, target = _endpoint(data, 'source'), _endpoint(data, 'target')
+            if not _fits(edge_id, source, target):
+                skipped += 1
+                continue
+            edges.append(PathwayEdge(pathway_id=pathway.pk, edge_id=edge_id, data=data, source=source, target=target))
+    if skipped:
+        # The serializer rejects such ids; documents pulled from Bland AI are stored as they are
+        logger.warning(f"Left {skipped} node(s)/edge(s) with ids over {GRAPH_ID_MAX_LENGTH} characters out of the tables.")
+    with transaction.atomic():
+        PathwayNode.objects.filter(pathway_id__in=pks).delete()
+        PathwayEdge.objects.filter(pathway_id__in=pks).delete()
+        PathwayNode.objects.bulk_create(nodes, batch_size=GRAPH_BATCH_SIZE)
+        PathwayEdge.objects.bulk_create(edges, batch_size=GRAPH_BATCH_SIZE)
+
+
+def delete_pathway_graphs(pathway_ids):
+    """
+    Deletes the PathwayNode and PathwayEdge rows of the given pathways (ids, or a queryset of them).
+    Does nothing unless PATHWAY_GRAPH_TABLES is on; the `sync_pathway_graphs` command removes rows left behind.
+    """
+    if not graph_tables_enabled():
+        return
+    PathwayNode.objects.filter(pathway_id__in=pathway_ids).delete()
+    PathwayEdge.objects.filter(pathway_id__in=pathway_ids).delete()
+
+
+def delete_orphaned_graphs():
+    """
+    Deletes the rows of pathways that were deleted while PATHWAY_GRAPH_TABLES was off.
+    """
+    pathways = ConversationalPathway.objects.values('pk')
+    return (PathwayNode.objects.exclude(pathway_id__in=pathways).delete()[0] +
+            PathwayEdge.objects.exclude(pathway_id__in=pathways).delete()[0])
+
+
+def get_node(pathway_id, node_id):
+    """
+    Returns `{'id', 'data'}` for one node of a pathway, or None. Reads the node's row, or with the tables
+    off just that key of a dict `nodes` document, extracted by the database. Only a list document (or an id
+    a JSON path can not quote) is read whole, to match ids the way `graph_entries` does.
+    """
+    if graph_tables_enabled():
+        row = PathwayNode.objects.filter(pathway_id=pathway_id, node_id=node_id).values_list('data').first()
+        return None if row is None else {'id': node_id, 'data': row[0]}
+
+    pathway = ConversationalPathway.objects.filter(pk=pathway_id)
+    if '"' not in node_id:
+        row = pathway.values_list(JSONKey('nodes', node_id), JSONType('nodes')).first()
+        if row is None:
+            return None
+        if row[1] != 'array':
+            return None if row[0] is None else {'id': node_id, 'data': row[0]}
+
+    document = pathway.values_list('nodes', flat=True).first()
+    for entry_id, data in graph_entries(document):
+        if entry_id == node_id:
+            return {'id': node_id, 'data': data}
+    return None
+
+
+def get_node_edges(pathway_id, node_id, direction='both'):
+    """
+    Returns the edges leaving (`out`), entering (`in`) or touching (`both`) a node, as
+    `{'id', 'source', 'target', 'data'}`. With the tables off only the `edges` document is read.
+    """
+    if graph_tables_enabled():
+        edges = PathwayEdge.objects.filter(pathway_id=pathway_id)
+        if direction == 'out':
+            edges = edges.filter(source=node_id)
+        elif direction == 'in':
+            edges = edges.filter(target=node_id)
+        else:
+            edges = edges.filter(source=node_id) | edges.filter(target=node_id)
+        return [
+            {'id': edge_id, 'source': source, 'target': target, 'data': data}
+            for edge_id, source, target, data in edges.values_list('edge_id', 'source', 'target', 'data')
+        ]
+
+    document = ConversationalPathway.objects.filter(pk=pathway_id).values_list('edges', flat=True).first()
+    result = []
+    for edge_id, data in graph_entries(document):
+        source, target = _endpoint(data, 'source'), _endpoint(data, 'target')
+        if (direction != 'in' and source == node_id) or (direction != 'out' and target == node_id):
+            result.append({'id': edge_id, 'source': source, 'target': target, 'data': data})
+    return result
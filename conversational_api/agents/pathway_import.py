@@ -0,0 +1,137 @@
+# agents/pathway_import.py
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import F
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import ConversationalPathway, PathwayImport
+from .outbox import enqueue_bulk_create
+from .parsers import loads
+from .pathway_graph import sync_pathway_graphs
+from .serializers import ConversationalPathwaySerializer
+from .utils import pathway_content_hash
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Another import with this key committed lines in the meantime. Retry to resume after them.'
+    default_code = 'import_conflict'
+
+
+def import_pathways(lines, key=None, batch_size=None, queue_sync=False):
+    """
+    Imports pathways from an iterable of NDJSON lines (a file opened in binary mode, a request), one
+    pathway per line, reading it incrementally.
+
+    Each record is validated with `ConversationalPathwaySerializer`; invalid ones are reported and skipped.
+    Valid ones are written with `bulk_create` in batches of `batch_size` lines, one transaction per batch.
+    With `queue_sync` a Bland AI create is queued in the outbox for every pathway, in the same transaction.
+
+    With a `key`, the last line of every committed batch is recorded in `PathwayImport`, and importing the
+    same input again under that key skips the lines already committed, so an interrupted import resumes
+    where it stopped. Returns a summary of this run.
+    """
+    batch_size = batch_size or getattr(settings, 'IMPORT_BATCH_SIZE', 500)
+    checkpoint = PathwayImport.objects.get_or_create(key=key)[0] if key else None
+    start_line = checkpoint.committed_line if checkpoint else 0
+    summary = {'key': key, 'resumed_after_line': start_line, 'created': 0, 'failed': 0, 'errors': []}
+
+    batch = _Batch(checkpoint, start_line, queue_sync)
+    for line_number, line in enumerate(lines, start=1):
+        if line_number <= start_line:
+            continue
+        batch.line_number = line_number
+        if isinstance(line, str):
+            line = line.encode('utf-8')
+        if line.strip():
+            pathway, item, error = _build_pathway(line)
+            if error is None:
+                batch.add(pathway, item)
+            else:
+                batch.failed += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'line': line_number, 'error': error})
+        if batch.line_number - batch.committed_line >= batch_size:
+            batch.commit(summary)
+    batch.commit(summary)
+
+    logger.info(
+        f"Imported {summary['created']} pathway(s), rejected {summary['failed']}, up to line {batch.committed_line}"
+        f"{f' of import {key!r}' if key else ''}."
+    )
+    summary['committed_line'] = batch.committed_line
+    return summary
+
+
+class _Batch:
+    """
+    The pathways read since the last commit, and the line that commit reached.
+    """
+    def __init__(self, checkpoint, committed_line, queue_sync):
+        self.checkpoint = checkpoint
+        self.committed_line = self.line_number = committed_line
+        self.queue_sync = queue_sync
+        self.pathways = []
+        self.items = []
+        self.failed = 0
+
+    def add(self, pathway, item):
+        self.pathways.append(pathway)
+        self.items.append(item)
+
+    def commit(self, summary):
+        if self.line_number == self.committed_line:
+            return
+        with transaction.atomic():
+            if self.checkpoint is not None:
+                # Row lock: two runs of the same import must not both write the lines after the checkpoint
+                committed_line = PathwayImport.objects.select_for_update().values_list(
+                    'committed_line', flat=True).get(pk=self.checkpoint.pk)
+                if committed_line != self.committed_line:
+                    raise ImportConflict()
+            pathways = ConversationalPathway.objects.bulk_create(self.pathways)
+            sync_pathway_graphs(pathways)
+            if self.queue_sync:
+                enqueue_bulk_create(pathways, self.items)
+            if self.checkpoint is not None:
+                PathwayImport.objects.filter(pk=self.checkpoint.pk).update(
+                    committed_line=self.line_number,
+                    created_count=F('created_count') + len(pathways),
+                    failed_count=F('failed_count') + self.failed,
+                )
+        summary['created'] += len(pathways)
+        summary['failed'] += self.failed
+        self.committed_line = self.line_number
+        self.pathways, self.items, self.failed = [], [], 0
+
+
+def _build_pathway(line):
+    """
+    Returns `(pathway, validated_data, None)` for a valid record, or `(None, None, error)`.
+    """
+    try:
+        item = loads(line)
+    except ValueError as e:
+        return None, None, f'Invalid JSON: {e}'
+    if not isinstance(item, dict):
+        return None, None, 'Expected a JSON object.'
+
+    serializer = ConversationalPathwaySerializer(data=item)
+    if not serializer.is_valid():
+        return None, None, serializer.errors
+    pathway = ConversationalPathway(**serializer.validated_data)
+    try:
+        pathway.full_clean()
+    except DjangoValidationError as e:
+        return None, None, e.message_dict
+    # bulk_create skips save(), which fills the hash reconciliation compares against
+    pathway.content_hash = pathway_content_hash(pathway.name, pathway.description, pathway.nodes, pathway.edges)
+    return pathway, dict(serializer.validated_data), None
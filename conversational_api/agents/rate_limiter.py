@@ -0,0 +1,124 @@
+# agents/rate_limiter.py
+import hashlib
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every process that uses the same cache.
+
+    Time is cut into windows of `per` seconds holding `rate` tokens each. Taking a token is an atomic
+    `incr` of the window's counter; token n of a window is released (n - 1) * per / rate seconds after
+    the window opens, so calls are spread evenly instead of bursting at the start of each window.
+    When a window is full the next one is tried, and the caller is told how long to wait for its token.
+    Processes only share buckets when the cache is shared (Redis, Memcached); with the default
+    local-memory cache each process has its own.
+    """
+    def __init__(self, name, rate, per=1.0, cache_alias='default', max_wait=60, clock=time.time):
+        self.name = name
+        self.rate = rate
+        self.per = per
+        self.cache = caches[cache_alias]
+        self.max_wait = max_wait
+        self.clock = clock
+
+    @property
+    def enabled(self):
+        return bool(self.rate)
+
+    def reserve(self):
+        """
+        Takes the next free token and returns the seconds to wait before using it (0 when one is free now).
+        Gives up after looking `max_wait` seconds ahead and returns that horizon instead.
+        """
+        if not self.enabled:
+            return 0.0
+        now = self.clock()
+        window = int(now // self.per)
+        for ahead in range(self._windows_ahead()):
+            count = self._take(window + ahead)
+            if count <= self.rate:
+                return self._slot_wait(window + ahead, count, now)
+        logger.warning(f"Rate limiter '{self.name}' has no token within {self.max_wait}s.")
+        return float(self.max_wait)
+
+    def wait_time(self):
+        """
+        Seconds a call would have to wait for a token right now, without taking one.
+        """
+        if not self.enabled:
+            return 0.0
+        now = self.clock()
+        window = int(now // self.per)
+        for ahead in range(self._windows_ahead()):
+            count = self.cache.get(self._key(window + ahead), 0)
+            if count < self.rate:
+                return self._slot_wait(window + ahead, count + 1, now)
+        return float(self.max_wait)
+
+    def stats(self):
+        return {'rate': self.rate, 'per': self.per, 'wait': self.wait_time()}
+
+    def _take(self, window):
+        key = self._key(window)
+        # Counters outlive the look-ahead horizon, then expire on their own
+        self.cache.add(key, 0, timeout=self.max_wait + 2 * self.per)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            self.cache.add(key, 1, timeout=self.max_wait + 2 * self.per)
+            return 1
+
+    def _slot_wait(self, window, count, now):
+        slot = window * self.per + (count - 1) * self.per / self.rate
+        return max(slot - now, 0.0)
+
+    def _windows_ahead(self):
+        return math.ceil(self.max_wait / self.per) + 1
+
+    def _key(self, window):
+        return f"bland_rate:{self.name}:{window}"
+
+
+def _limits_for(api_key):
+    """
+    The read and write rates for `api_key`: an entry in BLAND_AI_RATE_LIMITS, else the defaults.
+    """
+    limits = {
+        'read': getattr(settings, 'BLAND_AI_READ_RATE_LIMIT', 0),
+        'write': getattr(settings, 'BLAND_AI_WRITE_RATE_LIMIT', 0),
+    }
+    limits.update(getattr(settings, 'BLAND_AI_RATE_LIMITS', {}).get(api_key or '', {}))
+    return limits
+
+
+def get_rate_limiters(api_key):
+    """
+    Returns the read and write RateLimiter for `api_key`. Buckets are named after a hash of the key,
+    so every process using the same key shares them and the key itself never lands in the cache.
+    """
+    limits = _limits_for(api_key)
+    key_id = hashlib.sha256((api_key or '').encode()).hexdigest()[:12]
+    options = {
+        'per': getattr(settings, 'BLAND_AI_RATE_LIMIT_PERIOD', 1.0),
+        'cache_alias': getattr(settings, 'BLAND_AI_RATE_LIMIT_CACHE', 'default'),
+        'max_wait': getattr(settings, 'BLAND_AI_REQUEST_BUDGET', 15),
+    }
+    return {
+        kind: RateLimiter(f"{key_id}:{kind}", limits[kind], **options)
+        for kind in ('read', 'write')
+    }
+
+
+def bucket_for(method):
+    return 'read' if method.upper() in READ_METHODS else 'write'
@@ -0,0 +1,117 @@
+# agents/reconcile.py
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .bland_client import get_bland_client, payload_field_hashes
+from .models import BlandSyncEvent, ConversationalPathway, SyncStatus
+from .outbox import BLOCKING_STATUSES
+from .pathway_graph import sync_pathway_graphs
+from .utils import pathway_content_hash
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_pathways(client=None, batch_size=500, prune=False):
+    """
+    Brings local pathways in line with Bland AI.
+
+    Remote pathways are matched to local rows by `bland_ai_pathway_id` and compared by content hash,
+    so only new or changed pathways are written. New ones are inserted with `bulk_create`; changed ones
+    are updated only if they still have the version that was read, so a concurrent local write is
+    never overwritten and counts as a conflict instead.
+    Rows with local changes not yet pushed (not `synced`, or with unfinished outbox events) are skipped.
+    With `prune`, local pathways whose remote copy no longer exists are deleted, unless they are skipped.
+    Returns a dict of counts.
+    """
+    client = client or get_bland_client()
+    remote_pathways = client.get_all_conversational_pathways()
+
+    # Only ids, hashes and versions are read from the database, never the nodes/edges documents
+    local = {
+        bland_id: (pk, content_hash, version, sync_status)
+        for bland_id, pk, content_hash, version, sync_status in ConversationalPathway.objects
+        .filter(bland_ai_pathway_id__isnull=False)
+        .values_list('bland_ai_pathway_id', 'id', 'content_hash', 'version', 'sync_status')
+    }
+    unsynced = set(unsynced_pathway_ids())
+
+    now = timezone.now()
+    to_create, to_update, seen, skipped = [], [], set(), 0
+    for remote in remote_pathways:
+        bland_id = remote.get('id') or remote.get('pathway_id')
+        if not bland_id or bland_id in seen:
+            continue
+        seen.add(bland_id)
+
+        fields = {
+            'name': remote.get('name', ''),
+            'description': remote.get('description', ''),
+            'nodes': remote.get('nodes', {}),
+            'edges': remote.get('edges', {}),
+        }
+        content_hash = pathway_content_hash(**fields)
+        # The pulled values are what Bland AI holds now, so a later local edit back to an old value is pushed
+        sync_state = payload_field_hashes(fields)
+
+        if bland_id not in local:
+            to_create.append(ConversationalPathway(
+                bland_ai_pathway_id=bland_id, content_hash=content_hash, sync_status=SyncStatus.SYNCED,
+                bland_sync_state=sync_state, **fields
+            ))
+            continue
+
+        pk, local_hash, version, sync_status = local[bland_id]
+        if local_hash == content_hash:
+            continue
+        if sync_status != SyncStatus.SYNCED or pk in unsynced:
+            skipped += 1
+            continue
+        to_update.append((pk, version, dict(fields, content_hash=content_hash, bland_sync_state=sync_state)))
+
+    stale = [
+        pk for bland_id, (pk, _, _, sync_status) in local.items()
+        if bland_id not in seen and sync_status == SyncStatus.SYNCED and pk not in unsynced
+    ] if prune else []
+
+    updated, deleted = [], 0
+    with transaction.atomic():
+        created = ConversationalPathway.objects.bulk_create(to_create, batch_size=batch_size)
+        for pk, version, values in to_update:
+            # Conditional on the version read above, like VersionedModel.save(): a lost race is a conflict
+            if ConversationalPathway.objects.filter(pk=pk, version=version, sync_status=SyncStatus.SYNCED).update(
+                sync_status=SyncStatus.SYNCED, updated_at=now, version=F('version') + 1, **values
+            ):
+                updated.append(ConversationalPathway(pk=pk, nodes=values['nodes'], edges=values['edges']))
+        sync_pathway_graphs(created + updated)
+        if stale:
+            # Re-checked in the query, so a pathway edited since it was read is kept
+            deleted, _ = (
+                ConversationalPathway.objects.filter(pk__in=stale, sync_status=SyncStatus.SYNCED)
+                .exclude(pk__in=unsynced_pathway_ids()).delete()
+            )
+
+    stats = {
+        'remote': len(seen),
+        'created': len(created),
+        'updated': len(updated),
+        'unchanged': len(seen) - len(created) - len(to_update) - skipped,
+        'skipped': skipped,
+        'conflicts': len(to_update) - len(updated),
+        'deleted': deleted,
+    }
+    logger.info(f"Reconciled pathways with Bland AI: {stats}")
+    return stats
+
+
+def unsynced_pathway_ids():
+    """
+    Ids of pathways with outbox events still to be sent (pending, processing or failed), as a queryset.
+    """
+    return (
+        BlandSyncEvent.objects
+        .filter(object_type=BlandSyncEvent.ObjectType.PATHWAY, status__in=BLOCKING_STATUSES)
+        .values_list('object_id', flat=True)
+    )
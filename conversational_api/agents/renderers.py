@@ -0,0 +1,77 @@
+# agents/renderers.py
+import math
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it responses are rendered by the stdlib encoder
+    orjson = None
+
+# Datetimes and dataclasses are passed to DRF's encoder, which renders them differently from orjson.
+# Non-string dict keys are turned into strings, as the stdlib encoder does.
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` backed by orjson when it is installed.
+
+    Types orjson has no native rendering for (datetimes, decimals, lazy strings, ...) go through DRF's
+    encoder, so they come out as they always have: datetimes in ISO 8601 with a `Z` suffix for UTC and
+    decimals as numbers. Anything orjson cannot render (integers over 64 bits, very deep nesting, an
+    encoder error) is rendered by `JSONRenderer` itself, as are indented, ASCII-only and non-compact
+    output. orjson renders a NaN or infinite float as `null`, so output containing `null` is checked for
+    those and handed to `JSONRenderer`, which raises on them (or writes `NaN` when not strict).
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'null' in ret and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, so the output stays a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+def has_non_finite_float(data):
+    """
+    Whether a NaN or infinite float is anywhere in `data`'s dicts, lists and tuples.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders a list as newline-delimited JSON, one compact object per line. Anything else (an error
+    response, for instance) is rendered as a single line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        json_renderer = FastJSONRenderer()
+        items = data if isinstance(data, list) else [data]
+        return b''.join(json_renderer.render(item) + b'\n' for item in items)
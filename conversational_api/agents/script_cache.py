@@ -0,0 +1,127 @@
+# agents/script_cache.py
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Bump when the HTML-to-script rules change, so the shared tier stops serving scripts made by the old ones
+CACHE_KEY_PREFIX = 'html_to_script:v1'
+
+
+class ScriptCache:
+    """
+    Memoizes HTML-to-script conversion by a SHA-256 of the prompt.
+
+    The first tier is an LRU of at most `max_entries` scripts in this process. With `shared_cache_alias`
+    set, misses then look in that Django cache, so processes share the scripts they convert. Prompts
+    longer than `max_prompt_length` characters are converted every time and never stored.
+    """
+    def __init__(self, max_entries=1024, max_prompt_length=65536, shared_cache_alias=None, shared_timeout=86400):
+        self.max_entries = max_entries
+        self.max_prompt_length = max_prompt_length
+        self.shared_cache = caches[shared_cache_alias] if shared_cache_alias else None
+        self.shared_timeout = shared_timeout
+        self._scripts = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'skipped': 0}
+
+    @property
+    def enabled(self):
+        return bool(self.max_entries) or self.shared_cache is not None
+
+    def get_or_convert(self, html_input, convert):
+        """
+        Returns the script for `html_input`, calling `convert(html_input)` only when no tier has it.
+        """
+        if not self.enabled or len(html_input) > self.max_prompt_length:
+            self._count('skipped')
+            return convert(html_input)
+
+        key = hashlib.sha256(html_input.encode('utf-8', 'surrogatepass')).hexdigest()
+        with self._lock:
+            script = self._scripts.get(key)
+            if script is not None:
+                self._scripts.move_to_end(key)
+                self._counts['hits'] += 1
+                return script
+
+        script = self._get_shared(key)
+        if script is not None:
+            self._count('shared_hits')
+        else:
+            self._count('misses')
+            script = convert(html_input)
+            self._set_shared(key, script)
+        self._remember(key, script)
+        return script
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counts['hits'] + self._counts['shared_hits'] + self._counts['misses']
+            hit_rate = (self._counts['hits'] + self._counts['shared_hits']) / lookups if lookups else 0.0
+            return {**self._counts, 'entries': len(self._scripts), 'hit_rate': hit_rate}
+
+    def clear(self):
+        """
+        Empties the in-process tier and resets the counters. The shared tier is left to expire on its own.
+        """
+        with self._lock:
+            self._scripts.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _remember(self, key, script):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._scripts[key] = script
+            self._scripts.move_to_end(key)
+            while len(self._scripts) > self.max_entries:
+                self._scripts.popitem(last=False)
+
+    def _get_shared(self, key):
+        if self.shared_cache is None:
+            return None
+        try:
+            return self.shared_cache.get(f'{CACHE_KEY_PREFIX}:{key}')
+        except Exception as e:
+            # The cache only saves work; a broken backend must not break conversion
+            logger.warning(f"Shared script cache lookup failed: {e}")
+            return None
+
+    def _set_shared(self, key, script):
+        if self.shared_cache is None:
+            return
+        try:
+            self.shared_cache.set(f'{CACHE_KEY_PREFIX}:{key}', script, timeout=self.shared_timeout)
+        except Exception as e:
+            logger.warning(f"Shared script cache update failed: {e}")
+
+
+_script_cache = None
+_script_cache_lock = threading.Lock()
+
+
+def get_script_cache():
+    """
+    Returns the script cache shared by every conversion made in this process.
+    """
+    global _script_cache
+    if _script_cache is None:
+        with _script_cache_lock:
+            if _script_cache is None:
+                _script_cache = ScriptCache(
+                    max_entries=getattr(settings, 'HTML_TO_SCRIPT_CACHE_SIZE', 1024),
+                    max_prompt_length=getattr(settings, 'HTML_TO_SCRIPT_CACHE_MAX_PROMPT_LENGTH', 65536),
+                    shared_cache_alias=getattr(settings, 'HTML_TO_SCRIPT_SHARED_CACHE', None) or None,
+                    shared_timeout=getattr(settings, 'HTML_TO_SCRIPT_SHARED_CACHE_TIMEOUT', 86400),
+                )
+    return _script_cache
@@ -0,0 +1,560 @@
+# agents/script_converter.py
+"""
+Single-pass HTML-to-script conversion on the standard library's `html.parser`.
+
+`agents.utils.bleach_html_to_script` sanitizes a prompt with bleach (an html5lib parse and re-serialization)
+and then parses the result again with BeautifulSoup to collect its text. `html_to_script` produces the same
+script in one streaming pass: it keeps just enough of the html5lib tree-construction state (the stack of open
+elements and the list of active formatting elements, for the allowed tags only) to know where BeautifulSoup
+would see separate text nodes, and decodes character references the way the two-step pipeline does.
+"""
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+
+# The tags bleach keeps. Text is split into separate lines wherever one of them opens or closes.
+ALLOWED_TAGS = frozenset(['p', 'b', 'i', 'u', 'strong', 'em', 'h1', 'h2', 'h3', 'ul', 'ol', 'li'])
+FORMATTING_TAGS = frozenset(['b', 'i', 'u', 'strong', 'em'])
+SPECIAL_TAGS = frozenset(['p', 'ul', 'ol', 'li', 'h1', 'h2', 'h3'])
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3'])
+IMPLIED_END_TAGS = frozenset(['p', 'li'])
+
+# Stripped block-level start tags leave a newline behind in bleach (bleach.html5lib_shim.HTML_TAGS_BLOCK_LEVEL)
+BLOCK_LEVEL_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'dd', 'details', 'dialog', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hgroup', 'hr',
+    'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'ul',
+])
+
+ASCII_WHITESPACE = ' \t\n\x0c\r'
+ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+ASCII_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+TAG_NAME_RE = re.compile(r'[^ \t\n\x0c\r/>]+')
+# A well-formed tag (after `<` or `</`), where html5lib and a regular expression agree on the attributes
+SIMPLE_TAG_RE = re.compile(
+    r'''([^ \t\n\x0c\r/>]+)'''
+    r'''((?:[ \t\n\x0c\r]+[^ \t\n\x0c\r/>="'<]+'''
+    r'''(?:[ \t\n\x0c\r]*=[ \t\n\x0c\r]*(?:"[^"]*"|'[^']*'|[^ \t\n\x0c\r>"'][^ \t\n\x0c\r>]*))?)*)'''
+    r'''[ \t\n\x0c\r]*/?>'''
+)
+
+# Control characters bleach replaces with '?' in text; NUL is dropped by html5lib before that.
+# The form feed is whitespace to html5lib, so it is only replaced inside a text node (see `_clean_form_feeds`).
+INVISIBLE_CHARACTERS_RE = re.compile('[\x01-\x08\x0b\x0e-\x1f]')
+
+# An '&' that does not start a reference bleach keeps (`&name;` with a known name prefix, or `&#digits;`).
+# bleach also reads `&#digits` followed by one stray character and ';' as `&#digits;`, dropping that character.
+AMPERSAND_RE = re.compile(r'&(?:(#[xX][0-9a-fA-F]*|#[0-9]*)([^<&=; \t\n\r\x0b\x0c]?)|([^<&=;\s]*))(;?)')
+
+_entity_prefixes = None
+
+
+def _is_entity_prefix(name):
+    global _entity_prefixes
+    if _entity_prefixes is None:
+        _entity_prefixes = {
+            key[:end] for key in html5 for end in range(1, len(key) + 1) if ';' not in key[:end]
+        }
+    return name in _entity_prefixes
+
+
+def _escape_ampersand(match):
+    number, stray, name, semicolon = match.groups()
+    if semicolon and number is not None:
+        return f'&{number};;' if stray else match.group(0)
+    if semicolon and name and _is_entity_prefix(name):
+        return match.group(0)
+    return '&amp;' + match.group(0)[1:]
+
+
+def _decode_charref(name):
+    """
+    Decodes `&#<name>;` the way BeautifulSoup does, including its windows-1252 reading of values below 256.
+    """
+    try:
+        codepoint = int(name[1:], 16) if name[:1] in ('x', 'X') else int(name)
+    except ValueError:
+        return f'&#{name};'
+    data = None
+    if codepoint < 256:
+        try:
+            data = bytes([codepoint]).decode('windows-1252')
+        except UnicodeDecodeError:
+            pass
+    if not data:
+        try:
+            data = chr(codepoint)
+        except (ValueError, OverflowError):
+            pass
+    return data or '\N{REPLACEMENT CHARACTER}'
+
+
+def _unescape_input(data):
+    return data.replace('&amp;', '&')
+
+
+def _clean_data(data):
+    return INVISIBLE_CHARACTERS_RE.sub('?', data.replace('\x00', ''))
+
+
+def _clean_form_feeds(text):
+    """
+    Replaces the form feeds of a text node with '?', except in the whitespace it starts or ends with:
+    html5lib's tree walker hands that whitespace to bleach as SpaceCharacters tokens, which it leaves alone.
+    """
+    middle = text.strip(ASCII_WHITESPACE)
+    if '\x0c' not in middle:
+        return text
+    start = len(text) - len(text.lstrip(ASCII_WHITESPACE))
+    return text[:start] + middle.replace('\x0c', '?') + text[start + len(middle):]
+
+
+# html5lib tokenizer states inside a tag, reduced to what can happen before a '>'
+_TAG_NAME, _BEFORE_NAME, _NAME, _AFTER_NAME, _BEFORE_VALUE, _VALUE, _QUOTED, _AFTER_QUOTED, _SOLIDUS = range(9)
+
+
+def _scan_tag(data, start):
+    """
+    Runs the html5lib tag states over `data` from `start`, just after `<` or `</` (with '&' still escaped).
+
+    Returns the index of the `>` that closes the tag (or -1), the attributes, and whether bleach keeps an
+    unterminated tag as text: it does when the input ends in the tag name, an attribute name that is not
+    a duplicate, or an unquoted attribute value.
+    """
+    state, quote, attributes = _TAG_NAME, None, []
+    for index in range(start, len(data)):
+        char = data[index]
+        if char == '>' and state != _QUOTED:
+            break
+        space = char in ASCII_WHITESPACE
+        if state == _TAG_NAME:
+            state = _BEFORE_NAME if space else _SOLIDUS if char == '/' else _TAG_NAME
+        elif state in (_BEFORE_NAME, _SOLIDUS, _AFTER_QUOTED):
+            state = _BEFORE_NAME if space else _SOLIDUS if char == '/' else _NAME
+            if state == _NAME:
+                attributes.append([char, ''])
+        elif state == _NAME:
+            state = _AFTER_NAME if space else _SOLIDUS if char == '/' else _BEFORE_VALUE if char == '=' else _NAME
+            if state == _NAME:
+                attributes[-1][0] += char
+        elif state == _AFTER_NAME:
+            if not space:
+                state = _SOLIDUS if char == '/' else _BEFORE_VALUE if char == '=' else _NAME
+                if state == _NAME:
+                    attributes.append([char, ''])
+        elif state == _BEFORE_VALUE:
+            if char in ('"', "'"):
+                state, quote = _QUOTED, char
+            elif not space:
+                state = _VALUE
+                attributes[-1][1] += char
+        elif state == _VALUE:
+            if space:
+                state = _BEFORE_NAME
+            else:
+                attributes[-1][1] += char
+        elif char == quote:
+            state = _AFTER_QUOTED
+        else:
+            attributes[-1][1] += char
+    else:
+        if state == _NAME:
+            # A repeated attribute name reports one more parse error after the end of input one
+            names = [name.translate(ASCII_LOWER) for name, _ in attributes]
+            return -1, None, names[-1] not in names[:-1]
+        return -1, None, state in (_TAG_NAME, _VALUE)
+
+    attrs = {}
+    for name, value in attributes:
+        # The first of several attributes with the same name wins
+        attrs.setdefault(_unescape_input(name).translate(ASCII_LOWER), _unescape_input(value))
+    return index, attrs, False
+
+
+_START, _START_DASH, _COMMENT, _END_DASH, _END, _END_BANG = range(6)
+
+
+def _comment_end(data, start):
+    """
+    Runs the html5lib comment states from `start`, just after `<!--`, and returns the index after the `>`
+    that closes the comment, or -1.
+    """
+    state, index, length = _START, start, len(data)
+    while index < length:
+        char = data[index]
+        if state == _COMMENT:
+            index = data.find('-', index)
+            if index < 0:
+                return -1
+            state = _END_DASH
+        elif char == '>' and state in (_START, _START_DASH, _END, _END_BANG):
+            return index + 1
+        elif char == '-':
+            state = _START_DASH if state == _START else _END_DASH if state == _END_BANG else _END
+        elif char == '\x00' and state in (_START, _START_DASH):
+            pass  # html5lib stays in the comment start states on NUL
+        elif char == '!' and state == _END:
+            state = _END_BANG
+        else:
+            state = _COMMENT
+        index += 1
+    return -1
+
+
+def _decode_text(text):
+    """
+    Escapes a text node the way bleach serializes it, then decodes it the way BeautifulSoup reads it back.
+    """
+    if '&' not in text:
+        return text
+    decoder = _TextDecoder()
+    decoder.feed(AMPERSAND_RE.sub(_escape_ampersand, text).replace('<', '&lt;'))
+    decoder.close()
+    return ''.join(decoder.parts)
+
+
+class _TextDecoder(HTMLParser):
+    """
+    Decodes the character references in a run of text.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def handle_entityref(self, name):
+        self.parts.append(html5.get(name + ';', '&' + name))
+
+    def handle_charref(self, name):
+        self.parts.append(_decode_charref(name))
+
+
+class _Element:
+    __slots__ = ('tag', 'attrs')
+
+    def __init__(self, tag, attrs):
+        self.tag = tag
+        self.attrs = attrs
+
+
+class ScriptExtractor(HTMLParser):
+    """
+    Collects the text runs of an HTML fragment, split where the html5lib tree would have an element boundary.
+    """
+    # Script and style content is tokenized like any other text, as bleach does for stripped tags
+    CDATA_CONTENT_ELEMENTS = ()
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self._text = []
+        self._cleaned = []  # Text before a dropped comment, which ends a text node of the html5lib tree
+        self._open = []  # Stack of open allowed elements
+        self._formatting = []  # List of active formatting elements
+        self._seen_tag = False
+        self._closing = False
+
+    def text(self):
+        self._flush()
+        return '\n'.join(self.parts)
+
+    def close(self):
+        self._closing = True
+        super().close()
+
+    # Markup html5lib reads differently from `html.parser`
+
+    def parse_starttag(self, i):
+        # html5lib and `html.parser` disagree on where some malformed start tags end
+        end, tag, attrs = self._read_tag(i + 1)
+        if end < 0:
+            return self._unterminated_tag(i) if self._closing else -1
+        self.handle_starttag(tag, attrs)
+        return end
+
+    def parse_comment(self, i, report=1):
+        # Comments are dropped, but html5lib closes them in places `html.parser` does not
+        end = _comment_end(self.rawdata, i + 4)
+        if end >= 0:
+            self._end_text_node()
+        return end if end >= 0 else self._unterminated_markup()
+
+    def parse_html_declaration(self, i):
+        # Doctypes, CDATA sections and other `<!` markup outside a comment run to the next '>' and are dropped
+        end = self.rawdata.find('>', i + 2)
+        if end >= 0 and self.rawdata[i + 2:i + 9].translate(ASCII_LOWER) != 'doctype':
+            self._end_text_node()  # Bogus comments are comment nodes; a doctype in a fragment is ignored
+        return end + 1 if end >= 0 else self._unterminated_markup()
+
+    parse_pi = parse_html_declaration
+
+    def parse_endtag(self, i):
+        rawdata = self.rawdata
+        if len(rawdata) < i + 3 or rawdata[i + 2] == '>':
+            return super().parse_endtag(i)
+        if rawdata[i + 2] in ASCII_LETTERS:
+            # html5lib reads attributes on end tags too, so a quoted '>' does not close one
+            end, tag, _ = self._read_tag(i + 2)
+            if end < 0:
+                return self._unterminated_tag(i) if self._closing else -1
+            self.handle_endtag(tag)
+            return end
+        # `</` not followed by a letter starts a bogus comment, which bleach turns back into text
+        # unless it reads as an allowed tag name
+        end = rawdata.find('>', i + 2)
+        if end < 0:
+            if not self._closing:
+                return -1
+            end = len(rawdata) - 1
+        text = _unescape_input(rawdata[i:end + 1])
+        if text[2:-1 if text.endswith('>') else None].lower().strip() not in ALLOWED_TAGS:
+            self._raw_text(text)
+        return end + 1
+
+    def _unterminated_tag(self, i):
+        # bleach keeps a tag cut off by the end of the input as text if it ends inside the tag name, an
+        # attribute name or an unquoted attribute value, and drops it otherwise
+        rawdata = self.rawdata
+        if _scan_tag(rawdata, i + 2 if rawdata[i + 1] == '/' else i + 1)[2]:
+            self._raw_text(_unescape_input(rawdata[i:]))
+        return len(self.rawdata)
+
+    def _raw_text(self, text):
+        # bleach takes these from the raw input, where html5lib has not dropped NUL characters
+        self.handle_data(text.replace('\x00', '?'))
+
+    def _read_tag(self, start):
+        """
+        Returns the index after the tag whose name starts at `start` (or -1), its name and its attributes.
+        """
+        rawdata = self.rawdata
+        match = SIMPLE_TAG_RE.match(rawdata, start)
+        if match:
+            tag = _unescape_input(match.group(1)).translate(ASCII_LOWER)
+            # Only the allowed tags need their attributes, to tell identical formatting elements apart
+            attrs = _scan_tag(rawdata, start)[1] if match.group(2) and tag in ALLOWED_TAGS else {}
+            return match.end(), tag, attrs
+        end, attrs, _ = _scan_tag(rawdata, start)
+        if end < 0:
+            return -1, None, None
+        tag = _unescape_input(TAG_NAME_RE.match(rawdata, start).group()).translate(ASCII_LOWER)
+        return end + 1, tag, attrs
+
+    def _unterminated_markup(self):
+        # html5lib drops a comment cut off by the end of the input, where `html.parser` keeps it as text
+        return len(self.rawdata) if self._closing else -1
+
+    # Tokenizer callbacks
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in ALLOWED_TAGS:
+            self._characters('\n' if self._seen_tag and tag in BLOCK_LEVEL_TAGS else '')
+        elif tag in FORMATTING_TAGS:
+            self._start_formatting(tag, attrs)
+        elif tag == 'li':
+            self._start_list_item(attrs)
+        else:
+            self._close_p_in_scope()
+            if tag in HEADING_TAGS and self._open and self._open[-1].tag in HEADING_TAGS:
+                self._pop()
+            self._push(_Element(tag, attrs))
+        self._seen_tag = True
+
+    def handle_endtag(self, tag):
+        if tag not in ALLOWED_TAGS:
+            self._characters('')
+        elif tag in FORMATTING_TAGS:
+            self._end_formatting(tag)
+        elif tag == 'p':
+            if not self._in_scope('p'):
+                self._push(_Element('p', {}))
+            self._close_p()
+        elif tag == 'li':
+            if self._in_scope('li', list_item=True):
+                self._generate_implied_end_tags(exclude='li')
+                self._pop_until('li')
+        elif tag in HEADING_TAGS:
+            if any(element.tag in HEADING_TAGS for element in self._open):
+                self._generate_implied_end_tags()
+                while self._pop().tag not in HEADING_TAGS:
+                    pass
+        elif self._in_scope(tag):
+            self._generate_implied_end_tags()
+            self._pop_until(tag)
+        self._seen_tag = True
+
+    def handle_data(self, data):
+        data = _clean_data(data)
+        if data:
+            self._characters(data)
+
+    def handle_entityref(self, name):
+        # Every '&' in the input arrives as `&amp;`, so text reaches `_flush` with its references undecoded
+        self._characters('&')
+
+    # Tree construction, reduced to the allowed tags
+
+    def _characters(self, data):
+        self._reconstruct_formatting()
+        if data:
+            self._text.append(data)
+
+    def _end_text_node(self):
+        # A dropped comment joins the text around it for BeautifulSoup, but not for bleach's form feed handling
+        if self._text:
+            self._cleaned.append(_clean_form_feeds(''.join(self._text)))
+            self._text = []
+
+    def _flush(self):
+        self._end_text_node()
+        if self._cleaned:
+            text = _decode_text(''.join(self._cleaned))
+            if not text.strip(ASCII_WHITESPACE):
+                # BeautifulSoup collapses whitespace-only strings
+                text = '\n' if '\n' in text else ' '
+            self.parts.append(text)
+            self._cleaned = []
+
+    def _push(self, element):
+        self._flush()
+        self._open.append(element)
+
+    def _pop(self):
+        self._flush()
+        return self._open.pop()
+
+    def _pop_until(self, tag):
+        while self._pop().tag != tag:
+            pass
+
+    def _remove(self, element):
+        self._flush()
+        self._open.remove(element)
+
+    def _in_scope(self, tag, list_item=False):
+        for element in reversed(self._open):
+            if element.tag == tag:
+                return True
+            if list_item and element.tag in ('ul', 'ol'):
+                return False
+        return False
+
+    def _generate_implied_end_tags(self, exclude=None):
+        while self._open and self._open[-1].tag in IMPLIED_END_TAGS and self._open[-1].tag != exclude:
+            self._pop()
+
+    def _close_p(self):
+        self._generate_implied_end_tags(exclude='p')
+        self._pop_until('p')
+
+    def _close_p_in_scope(self):
+        if self._in_scope('p'):
+            self._close_p()
+
+    def _start_list_item(self, attrs):
+        for element in reversed(self._open):
+            if element.tag == 'li':
+                self._generate_implied_end_tags(exclude='li')
+                self._pop_until('li')
+                break
+            if element.tag in SPECIAL_TAGS and element.tag != 'p':
+                break
+        self._close_p_in_scope()
+        self._push(_Element('li', attrs))
+
+    def _start_formatting(self, tag, attrs):
+        self._reconstruct_formatting()
+        element = _Element(tag, attrs)
+        self._push(element)
+        # "Noah's Ark": at most three identical formatting elements stay active
+        matching = [entry for entry in reversed(self._formatting) if entry.tag == tag and entry.attrs == attrs]
+        if len(matching) == 3:
+            self._formatting.remove(matching[-1])
+        self._formatting.append(element)
+
+    def _reconstruct_formatting(self):
+        if not self._formatting or self._formatting[-1] in self._open:
+            return
+        index = len(self._formatting) - 1
+        while index > 0 and self._formatting[index - 1] not in self._open:
+            index -= 1
+        for position in range(index, len(self._formatting)):
+            entry = self._formatting[position]
+            clone = _Element(entry.tag, entry.attrs)
+            self._push(clone)
+            self._formatting[position] = clone
+
+    def _end_other(self, tag):
+        for element in reversed(self._open):
+            if element.tag == tag:
+                self._generate_implied_end_tags(exclude=tag)
+                while self._pop() is not element:
+                    pass
+                return
+            if element.tag in SPECIAL_TAGS:
+                return
+
+    def _end_formatting(self, tag):
+        """
+        The adoption agency algorithm, as html5lib implements it, applied to the open element stack and
+        the active formatting list. Only the bookkeeping matters here: every change to the stack is a
+        text boundary.
+        """
+        for _ in range(8):
+            formatting = next((entry for entry in reversed(self._formatting) if entry.tag == tag), None)
+            if formatting is None:
+                self._end_other(tag)
+                return
+            if formatting not in self._open:
+                self._formatting.remove(formatting)
+                return
+
+            position = self._open.index(formatting)
+            furthest_block = next(
+                (element for element in self._open[position:] if element.tag in SPECIAL_TAGS), None
+            )
+            if furthest_block is None:
+                while self._pop() is not formatting:
+                    pass
+                self._formatting.remove(formatting)
+                return
+
+            bookmark = self._formatting.index(formatting)
+            last_node = node = furthest_block
+            index = self._open.index(node)
+            for _ in range(3):
+                index -= 1
+                node = self._open[index]
+                if node not in self._formatting:
+                    self._remove(node)
+                    continue
+                if node is formatting:
+                    break
+                if last_node is furthest_block:
+                    bookmark = self._formatting.index(node) + 1
+                clone = _Element(node.tag, node.attrs)
+                self._formatting[self._formatting.index(node)] = clone
+                self._open[self._open.index(node)] = clone
+                self._flush()
+                node = last_node = clone
+
+            clone = _Element(formatting.tag, formatting.attrs)
+            self._formatting.remove(formatting)
+            self._formatting.insert(bookmark, clone)
+            self._remove(formatting)
+            self._open.insert(self._open.index(furthest_block) + 1, clone)
+
+
+def html_to_script(html_input):
+    """
+    Converts HTML to the plain-text script, with the same output as `agents.utils.bleach_html_to_script`.
+    """
+    html_input = html_input.replace('\r\n', '\n').replace('\r', '\n')
+    extractor = ScriptExtractor()
+    # bleach resolves character references per text node, after stripped tags have been removed
+    extractor.feed(html_input.replace('&', '&amp;'))
+    extractor.close()
+    return extractor.text().strip()
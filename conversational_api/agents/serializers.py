@@ -1,18 +1,33 @@
 #agents/serialisers.py
 from rest_framework import serializers
 from .models import Agent, ConversationalPathway
+from .pathway_graph import GRAPH_ID_MAX_LENGTH
 from .utils import html_to_script
 import logging
-from django.core.exceptions import ValidationError as DjangoValidationError
+from functools import lru_cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
 
 logger = logging.getLogger(__name__)
 
-class AgentSerializer(serializers.ModelSerializer):
+
+class SparseFieldsetMixin:
+    """
+    Accepts a `fields` argument naming the only fields to keep, in the serializer's own order.
+    Used by the list and detail views for `?fields=` / `?exclude=`.
+    """
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class AgentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     
-    name = serializers.CharField(required=True, allow_blank=False)
+    name = serializers.CharField(required=True, allow_blank=False, max_length=255)
     bland_ai_id = serializers.CharField(read_only=True) # Exclude bland_ai_id from writable fields since it's managed by the system
     prompt = serializers.CharField(required=True, allow_blank=False)
-    script = serializers.SerializerMethodField(read_only=True)  # Script becomes the prompt
+    script = serializers.CharField(read_only=True)  # Stored by create/update; recompute with `manage.py backfill_agent_scripts`
     voice = serializers.CharField(required=False, allow_blank=True)
     analysis_schema = serializers.JSONField(required=False, default=dict)
     metadata = serializers.JSONField(required=False, default=dict)
@@ -32,6 +47,7 @@ class AgentSerializer(serializers.ModelSerializer):
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
     version = serializers.IntegerField(read_only=True)
+    sync_status = serializers.CharField(read_only=True)
     webhook = serializers.URLField(required=False, allow_null=True, allow_blank=True, default=None)  # Changed default to None
 
 
@@ -41,16 +57,13 @@ class AgentSerializer(serializers.ModelSerializer):
             'id', 'name', 'bland_ai_id', 'prompt', 'script', 'voice',
             'analysis_schema','metadata', 'pathway_id', 'language',
             'model', 'first_sentence', 'tools', 'dynamic_data', 'interruption_threshold','keywords',
-            'max_duration', 'created_at', 'updated_at' ,'version', 'webhook'
+            'max_duration', 'created_at', 'updated_at' ,'version', 'webhook', 'sync_status'
         ]
         read_only_fields = [
             'id', 'script', 'bland_ai_id', 'version', 
-            'created_at', 'updated_at'
+            'created_at', 'updated_at', 'sync_status'
         ]
     
-    def get_script(self, obj):
-        return html_to_script(obj.prompt)
-    
     def validate_prompt(self, value):
         """
         Ensure that the prompt is not empty or only whitespace.
@@ -125,24 +138,33 @@ class AgentSerializer(serializers.ModelSerializer):
         except DjangoValidationError as e:
             raise serializers.ValidationError(e.message_dict)
     
-class ConversationalPathwaySerializer(serializers.ModelSerializer):
+def _check_graph_ids(label, ids):
+    too_long = [graph_id for graph_id in ids if len(str(graph_id)) > GRAPH_ID_MAX_LENGTH]
+    if too_long:
+        raise serializers.ValidationError(
+            f"{label} ids must be at most {GRAPH_ID_MAX_LENGTH} characters: {str(too_long[0])[:40]}..."
+        )
+
+
+class ConversationalPathwaySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     
-    name = serializers.CharField(required=True, allow_blank=False)
+    name = serializers.CharField(required=True, allow_blank=False, max_length=255)
     description = serializers.CharField(required=False, allow_blank=True)
     bland_ai_pathway_id = serializers.CharField(read_only=True)
     nodes = serializers.JSONField(required=False, default=dict)
     edges = serializers.JSONField(required=False, default=dict)
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
+    sync_status = serializers.CharField(read_only=True)
 
     class Meta:
         model = ConversationalPathway
         fields = [
             'id', 'name', 'description', 'bland_ai_pathway_id',
-            'nodes', 'edges', 'created_at', 'updated_at'
+            'nodes', 'edges', 'created_at', 'updated_at', 'version', 'sync_status'
         ]
         
-        read_only_fields = ['id', 'bland_ai_pathway_id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'bland_ai_pathway_id', 'created_at', 'updated_at', 'version', 'sync_status']
     
     def validate_name(self, value):
         """
@@ -154,20 +176,26 @@ class ConversationalPathwaySerializer(serializers.ModelSerializer):
     
     def validate_nodes(self, value):
         """
-        Validates that the 'nodes' field is a dictionary.
-        Raises a ValidationError if 'nodes' is not a dictionary.
+        Validates that the 'nodes' field is a dictionary whose ids fit the PathwayNode table.
+        Raises a ValidationError otherwise.
         """
         if not isinstance(value, dict):
             raise serializers.ValidationError("Nodes must be a dictionary.")
+        _check_graph_ids("Node", value)
         return value
 
     def validate_edges(self, value):
         """
-        Validates that the 'edges' field is a dictionary.
-        Raises a ValidationError if 'edges' is not a dictionary.
+        Validates that the 'edges' field is a dictionary whose ids and endpoints fit the PathwayEdge table.
+        Raises a ValidationError otherwise.
         """
         if not isinstance(value, dict):
             raise serializers.ValidationError("Edges must be a dictionary.")
+        _check_graph_ids("Edge", value)
+        _check_graph_ids("Edge endpoint", [
+            edge[key] for edge in value.values() if isinstance(edge, dict)
+            for key in ('source', 'target') if edge.get(key) is not None
+        ])
         return value
     
     def create(self, validated_data):
@@ -192,4 +220,83 @@ class ConversationalPathwaySerializer(serializers.ModelSerializer):
         instance.edges = validated_data.get('edges', instance.edges)
         
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+
+class ValuesRowMapper:
+    """
+    Builds the representation of a read-only serializer from `.values()` rows.
+
+    The serializer's fields are inspected once and turned into one converter per column, so a list
+    page is mapped without building model instances or walking DRF fields for every row. The output
+    is the same as `serializer_class(queryset, many=True).data`. `fields` narrows it to a sparse fieldset,
+    like the serializer's own `fields` argument.
+    """
+    def __init__(self, serializer_class, fields=None):
+        fields = (serializer_class(fields=fields) if fields is not None else serializer_class()).fields
+        self.columns = []
+        self.converters = []
+        for field_name, field in fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or '.' in field.source:
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{field_name} cannot be read from a .values() row."
+                )
+            self.columns.append(field.source)
+            self.converters.append((field_name, field.source, self._converter(field)))
+        self._by_name = {field_name: (column, convert) for field_name, column, convert in self.converters}
+
+    def map(self, rows):
+        converters = self.converters
+        return [
+            {
+                field_name: None if row[column] is None else convert(row[column])
+                for field_name, column, convert in converters
+            }
+            for row in rows
+        ]
+
+    def map_instance(self, instance, field_names):
+        """
+        Returns the representation of `instance` restricted to `field_names`, in their order, read
+        straight off its attributes. Names that are not fields are skipped.
+        """
+        data = {}
+        for field_name in field_names:
+            field = self._by_name.get(field_name)
+            if field is not None:
+                value = getattr(instance, field[0])
+                data[field_name] = None if value is None else field[1](value)
+        return data
+
+    @classmethod
+    def _converter(cls, field):
+        """
+        Returns a callable equivalent to `field.to_representation` for non-null values.
+        """
+        if isinstance(field, serializers.IntegerField):
+            return int
+        if type(field) in (serializers.CharField, serializers.URLField):
+            return str
+        if isinstance(field, serializers.JSONField) and not field.binary:
+            return _identity
+        if isinstance(field, serializers.ListField):
+            child = cls._converter(field.child)
+            return lambda data: [child(item) if item is not None else None for item in data]
+        if isinstance(field, serializers.DictField):
+            child = cls._converter(field.child)
+            return lambda value: {str(key): child(val) if val is not None else None for key, val in value.items()}
+        return field.to_representation
+
+
+def _identity(value):
+    return value
+
+
+@lru_cache(maxsize=128)
+def get_row_mapper(serializer_class, fields=None):
+    """
+    Returns the `ValuesRowMapper` for a serializer and sparse fieldset, compiled once per process.
+    """
+    return ValuesRowMapper(serializer_class, fields)
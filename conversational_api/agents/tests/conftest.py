@@ -1,5 +1,19 @@
 import pytest
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.test import APIClient
+from agents.circuit_breaker import get_bland_breaker
+from agents.script_cache import get_script_cache
+
+# A file-backed SQLite test database takes concurrent writers (test_concurrency.py); in-memory SQLite
+# fails the second one with "table is locked". IMMEDIATE transactions wait for the write lock up front
+# instead of failing to upgrade a read lock with "database is locked".
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix, tmp_path_factory):
+    database = settings.DATABASES['default']
+    if database['ENGINE'] == 'django.db.backends.sqlite3' and not database['TEST'].get('NAME'):
+        database['TEST']['NAME'] = str(tmp_path_factory.mktemp('db') / 'test.sqlite3')
+        database.setdefault('OPTIONS', {}).update(transaction_mode='IMMEDIATE', timeout=30)
 
 @pytest.fixture
 def sample_agent_data():
@@ -24,3 +38,23 @@ def sample_pathway_data():
 def api_client():
     return APIClient()
 
+# Keep the process-wide circuit breaker from leaking state between tests
+@pytest.fixture(autouse=True)
+def reset_bland_breaker():
+    get_bland_breaker().reset()
+    yield
+    get_bland_breaker().reset()
+
+# Rate limiter buckets live in the cache
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+# Memoized scripts would hide conversions from tests that patch the converters
+@pytest.fixture(autouse=True)
+def clear_script_cache():
+    get_script_cache().clear()
+    yield
+    get_script_cache().clear()
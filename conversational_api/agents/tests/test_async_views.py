@@ -0,0 +1,199 @@
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from unittest.mock import AsyncMock, patch
+from agents.async_bland_client import AsyncBlandClient
+from agents.async_views import AsyncBlandSyncView
+from agents.models import Agent, BlandSyncEvent, ConversationalPathway, SyncStatus
+
+
+@pytest.fixture
+def async_client():
+    return AsyncClient()
+
+
+@pytest.mark.django_db
+def test_async_create_agent(async_client, sample_agent_data):
+    url = reverse('async-agent-list')
+
+    with patch('agents.async_views.AsyncBlandClient.create_agent', new_callable=AsyncMock) as mock_create_agent:
+        mock_create_agent.return_value = 'bland_ai_id_123'
+
+        response = async_to_sync(async_client.post)(url, sample_agent_data, content_type='application/json')
+
+    assert response.status_code == 201
+    assert response.json()['bland_ai_id'] == 'bland_ai_id_123'
+    assert Agent.objects.get(name=sample_agent_data['name']).bland_ai_id == 'bland_ai_id_123'
+
+
+@pytest.mark.django_db
+def test_async_create_agent_rolls_back_on_bland_ai_failure(async_client, sample_agent_data):
+    url = reverse('async-agent-list')
+
+    with patch('agents.async_views.AsyncBlandClient.create_agent', new_callable=AsyncMock) as mock_create_agent:
+        mock_create_agent.side_effect = Exception("Bland AI creation failed")
+
+        response = async_to_sync(async_client.post)(url, sample_agent_data, content_type='application/json')
+
+    assert response.status_code == 500
+    assert 'detail' in response.json()
+    assert Agent.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_async_retried_create_replays_stored_response(async_client, sample_pathway_data):
+    url = reverse('async-conversationalpathway-list')
+    post = async_to_sync(async_client.post)
+    key = {'Idempotency-Key': 'key-1'}
+
+    with patch('agents.async_views.AsyncBlandClient.create_conversational_pathway', new_callable=AsyncMock) as mock_create:
+        mock_create.return_value = 'pathway_456'
+        first = post(url, sample_pathway_data, content_type='application/json', headers=key)
+        second = post(url, sample_pathway_data, content_type='application/json', headers=key)
+        reused = post(url, dict(sample_pathway_data, name='Other'), content_type='application/json', headers=key)
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert second['Idempotent-Replayed'] == 'true'
+    assert reused.status_code == 422
+    assert mock_create.await_count == 1
+    assert ConversationalPathway.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_async_failed_create_releases_key(async_client, sample_agent_data):
+    url = reverse('async-agent-list')
+    post = async_to_sync(async_client.post)
+    key = {'Idempotency-Key': 'key-1'}
+
+    with patch('agents.async_views.AsyncBlandClient.create_agent', new_callable=AsyncMock) as mock_create_agent:
+        mock_create_agent.side_effect = Exception("Bland AI creation failed")
+        assert post(url, sample_agent_data, content_type='application/json', headers=key).status_code == 500
+        mock_create_agent.side_effect = None
+        mock_create_agent.return_value = 'bland_ai_id_123'
+        assert post(url, sample_agent_data, content_type='application/json', headers=key).status_code == 201
+
+    assert Agent.objects.get().bland_ai_id == 'bland_ai_id_123'
+
+
+@pytest.mark.django_db
+def test_async_create_agent_invalid_data(async_client):
+    url = reverse('async-agent-list')
+
+    response = async_to_sync(async_client.post)(url, {'name': 'No prompt'}, content_type='application/json')
+
+    assert response.status_code == 400
+    assert 'prompt' in response.json()
+
+
+@pytest.mark.django_db
+def test_async_update_agent_keeps_local_row_when_push_fails(async_client, sample_agent_data):
+    agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+    url = reverse('async-agent-detail', args=[agent.id])
+
+    with patch('agents.async_views.AsyncBlandClient.update_agent', new_callable=AsyncMock) as mock_update_agent:
+        mock_update_agent.side_effect = Exception("Bland AI update failed")
+
+        response = async_to_sync(async_client.patch)(url, {'name': 'Renamed'}, content_type='application/json')
+
+    assert response.status_code == 500
+    agent.refresh_from_db()
+    assert agent.name == sample_agent_data['name']
+
+
+@pytest.mark.django_db
+def test_async_update_and_delete_pathway(async_client, sample_pathway_data):
+    pathway = ConversationalPathway.objects.create(bland_ai_pathway_id='pathway_456', **sample_pathway_data)
+    url = reverse('async-conversationalpathway-detail', args=[pathway.id])
+
+    with patch('agents.async_views.AsyncBlandClient.update_conversational_pathway', new_callable=AsyncMock) as mock_update:
+        response = async_to_sync(async_client.patch)(url, {'name': 'Renamed Pathway'}, content_type='application/json')
+
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Renamed Pathway'
+    assert mock_update.await_count == 1
+
+    with patch('agents.async_views.AsyncBlandClient.delete_conversational_pathway', new_callable=AsyncMock) as mock_delete:
+        response = async_to_sync(async_client.delete)(url)
+
+    assert response.status_code == 204
+    mock_delete.assert_awaited_once_with('pathway_456')
+    assert not ConversationalPathway.objects.filter(id=pathway.id).exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('changes', [{'name': 'x' * 256}, {'voice': 'v' * 101}], ids=['serializer', 'model'])
+def test_async_update_rejected_locally_is_never_pushed(async_client, sample_agent_data, changes):
+    agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+    url = reverse('async-agent-detail', args=[agent.id])
+
+    with patch('agents.async_views.AsyncBlandClient.update_agent', new_callable=AsyncMock) as mock_update_agent:
+        response = async_to_sync(async_client.patch)(url, changes, content_type='application/json')
+
+    assert response.status_code == 400
+    assert set(response.json()) == set(changes)
+    mock_update_agent.assert_not_awaited()
+
+
+@pytest.mark.django_db
+def test_async_update_of_a_stale_version_is_never_pushed(async_client, sample_agent_data):
+    agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+    url = reverse('async-agent-detail', args=[agent.id])
+    stale = Agent.objects.get(pk=agent.pk)
+    Agent.objects.filter(pk=agent.pk).update(version=1)  # Saved by someone else after the view read the row
+
+    with patch('agents.async_views.AsyncBlandClient.update_agent', new_callable=AsyncMock) as mock_update_agent, \
+            patch('agents.async_views.AsyncBlandSyncView.get_object', new_callable=AsyncMock, return_value=stale):
+        response = async_to_sync(async_client.patch)(url, {'name': 'Renamed'}, content_type='application/json')
+
+    assert response.status_code == 409
+    mock_update_agent.assert_not_awaited()
+
+
+@pytest.mark.django_db
+def test_async_writes_are_queued_in_outbox_mode(async_client, settings, sample_pathway_data):
+    settings.BLAND_AI_SYNC_MODE = 'outbox'
+
+    with patch('agents.async_views.get_async_bland_client') as mock_client:
+        created = async_to_sync(async_client.post)(reverse('async-conversationalpathway-list'), sample_pathway_data,
+                                                   content_type='application/json')
+        url = reverse('async-conversationalpathway-detail', args=[created.json()['id']])
+        updated = async_to_sync(async_client.patch)(url, {'name': 'Renamed'}, content_type='application/json')
+        deleted = async_to_sync(async_client.delete)(url)
+
+    assert created.status_code == updated.status_code == deleted.status_code == 202
+    assert created.json()['sync_status'] == updated.json()['sync_status'] == SyncStatus.PENDING
+    assert updated.json()['name'] == 'Renamed'
+    assert deleted.json() == {'id': created.json()['id'], 'sync_status': SyncStatus.PENDING}
+    assert list(BlandSyncEvent.objects.order_by('id').values_list('operation', flat=True)) == [
+        BlandSyncEvent.Operation.CREATE, BlandSyncEvent.Operation.UPDATE, BlandSyncEvent.Operation.DELETE,
+    ]
+    mock_client.assert_not_called()
+
+
+def test_async_view_without_sync_hooks_cannot_be_built():
+    class PartialView(AsyncBlandSyncView):
+        model = Agent
+
+        async def sync_create(self, client, instance, data):
+            pass
+
+    with pytest.raises(TypeError, match='sync_delete'):
+        PartialView.as_view()(None)
+
+
+def test_async_client_retries_gateway_errors():
+    responses = iter([httpx.Response(503), httpx.Response(200, json={'pathway_id': 'p1'})])
+
+    async def fetch():
+        client = AsyncBlandClient()
+        client.backoff_factor = 0
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses)))
+        try:
+            return await client.get_conversational_pathway('p1')
+        finally:
+            await client.aclose()
+
+    assert async_to_sync(fetch)() == {'pathway_id': 'p1'}
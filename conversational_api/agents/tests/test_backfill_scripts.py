@@ -0,0 +1,39 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from unittest.mock import patch
+from agents.models import Agent
+from agents.utils import html_to_script
+
+
+@pytest.mark.django_db
+def test_list_serves_stored_script(api_client, sample_agent_data):
+    Agent.objects.create(script='Stored script', **sample_agent_data)
+
+    with patch('agents.serializers.html_to_script') as mock_convert:
+        response = api_client.get(reverse('agent-list'))
+
+    mock_convert.assert_not_called()
+    # A fresh conversion of the prompt would differ, so the listed value can only come from the column
+    assert html_to_script(sample_agent_data['prompt']) != 'Stored script'
+    assert response.data['results'][0]['script'] == 'Stored script'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('workers', [1, 2])
+def test_backfill_recomputes_stale_scripts(sample_agent_data, workers):
+    Agent.objects.create(script='Hello', **sample_agent_data)
+    for _ in range(3):
+        Agent.objects.create(script='old rules', **sample_agent_data)
+    Agent.objects.create(**sample_agent_data)  # Never had a script stored
+
+    with pytest.raises(CommandError, match='4 of 5 agent'):
+        call_command('backfill_agent_scripts', '--check', '--workers', '1')
+
+    call_command('backfill_agent_scripts', '--batch-size', '2', '--workers', str(workers))
+
+    assert set(Agent.objects.values_list('script', flat=True)) == {'Hello'}
+    # Recomputing a derived column is not a user edit
+    assert set(Agent.objects.values_list('version', flat=True)) == {0}
+    call_command('backfill_agent_scripts', '--check', '--workers', '1')
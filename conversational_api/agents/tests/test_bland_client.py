@@ -0,0 +1,115 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from unittest.mock import patch
+from agents.bland_client import BlandClient, get_bland_client
+from agents.models import Agent, ConversationalPathway
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'pathway_id': self.path.rsplit('/', 1)[-1]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':  # A body after HEAD headers would corrupt the kept-alive connection
+            self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_reuses_pooled_connection(local_server):
+    client = BlandClient()
+    client.base_url = local_server
+
+    for i in range(5):
+        assert client.get_conversational_pathway(f'pathway-{i}') == {'pathway_id': f'pathway-{i}'}
+
+    stats = client.pool_stats()
+    assert stats['requests'] == 5
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 4
+
+
+def test_client_warm_opens_connections_up_front(local_server, settings):
+    settings.BLAND_AI_POOL_MAXSIZE = 4
+    client = BlandClient()
+    client.base_url = local_server
+
+    assert client.warm(4) == 4
+    assert 1 <= client.pool_stats()['connections_opened'] <= 4
+
+    client.get_conversational_pathway('after-warm')
+    stats = client.pool_stats()
+    assert stats['connections_reused'] >= 1
+
+
+def test_shared_client_is_one_instance_per_process():
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(get_bland_client())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(client) for client in clients}) == 1
+    assert clients[0] is get_bland_client()
+
+
+def ok_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(body).encode()
+    return response
+
+
+@pytest.mark.django_db
+def test_update_agent_sends_only_changed_fields(sample_agent_data):
+    agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+    client = BlandClient()
+    form = dict(sample_agent_data, version=0, updated_at='2024-10-03T09:16:00Z')
+
+    with patch.object(client, '_request', return_value=ok_response({'status': 'success'})) as mock_request:
+        client.update_agent(agent, form)
+        assert set(mock_request.call_args.kwargs['json']) == {'name', 'prompt', 'voice', 'max_duration'}
+
+        # Re-saving the same form is not sent again, even though bookkeeping fields differ
+        agent.refresh_from_db()
+        assert client.update_agent(agent, dict(form, version=1, updated_at='2024-10-03T09:17:00Z')) is None
+        assert mock_request.call_count == 1
+
+        agent.voice = 'maya'
+        client.update_agent(agent, form)
+        assert mock_request.call_args.kwargs['json'] == {'voice': 'maya'}
+
+
+@pytest.mark.django_db
+def test_pathway_create_snapshot_skips_identical_update(sample_pathway_data):
+    pathway = ConversationalPathway.objects.create(**sample_pathway_data)
+    client = BlandClient()
+
+    with patch.object(client, '_request', return_value=ok_response({'pathway_id': 'pathway_456'})) as mock_request:
+        pathway.bland_ai_pathway_id = client.create_conversational_pathway(pathway, sample_pathway_data)
+        pathway.save()
+        assert client.update_conversational_pathway(pathway, sample_pathway_data) is None
+
+    assert mock_request.call_count == 1
@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+
+from agents.bland_client import BlandClient
+from agents.management.commands.benchmark_bland_payload import serializer_payload
+from agents.models import Agent, ConversationalPathway
+from agents.serializers import AgentSerializer, ConversationalPathwaySerializer
+
+AGENT_FIELDS = [field for field in AgentSerializer().fields] + ['unknown', 'bland_sync_state']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('attrs', [
+    {'name': 'Minimal', 'prompt': '<h1>Hello</h1>'},
+    {
+        'name': 'Full', 'prompt': '<p>Hi</p>', 'script': 'Hi', 'voice': 'maya', 'pathway_id': 'p-1',
+        'analysis_schema': {'budget': 'number'}, 'metadata': {'nested': [1, None, 2.5]}, 'language': 'ENG',
+        'model': 'turbo', 'first_sentence': '', 'dynamic_data': [], 'interruption_threshold': 50,
+        'keywords': ['demo'], 'max_duration': 12, 'webhook': 'https://example.com/hook',
+        # CharField children: the serializer sends numbers and booleans in tools as strings
+        'tools': [{'tool_name': 'crm', 'description': 'd', 'timeout': 30, 'retry': None, 'on': True}],
+    },
+])
+def test_agent_payload_matches_serializer_payload(attrs):
+    agent = Agent.objects.create(**attrs)
+    client = BlandClient()
+
+    for request_data in (AGENT_FIELDS, ['prompt', 'name'], {'tools': [], 'max_duration': 5, 'id': 1}, []):
+        assert client._prepare_agent_payload(agent, request_data) == \
+            serializer_payload(AgentSerializer, agent, request_data)
+
+
+def test_payload_of_unsaved_agent_matches_serializer_payload():
+    agent = Agent(name='Unsaved', prompt='<p>x</p>', updated_at=datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc))
+
+    assert BlandClient()._prepare_agent_payload(agent, AGENT_FIELDS) == \
+        serializer_payload(AgentSerializer, agent, AGENT_FIELDS)
+
+
+@pytest.mark.django_db
+def test_pathway_payload_matches_serializer_payload():
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes={'1': {'type': 'Default'}}, edges={})
+    request_data = ['name', 'description', 'nodes', 'edges', 'created_at', 'sync_status', 'version']
+
+    assert BlandClient()._prepare_pathway_payload(pathway, request_data) == \
+        serializer_payload(ConversationalPathwaySerializer, pathway, request_data)
+
+
+def test_benchmark_command_checks_and_times_both_payloads(capsys):
+    call_command('benchmark_bland_payload', '--number', '1')
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ['agent', 'pathway']
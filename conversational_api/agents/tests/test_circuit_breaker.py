@@ -0,0 +1,139 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from unittest.mock import patch
+from agents.async_bland_client import AsyncBlandClient
+from agents.bland_client import BlandClient
+from agents.circuit_breaker import BlandServiceUnavailable, CircuitBreaker, get_bland_breaker
+from agents.models import Agent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_at_failure_rate_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker('test', failure_rate_threshold=0.5, minimum_calls=4, window_size=4,
+                             reset_timeout=10, clock=clock)
+
+    for outcome in (True, False, True):
+        breaker.before_call()
+        breaker.record_success() if outcome else breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()  # 2 failures out of 4 calls
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(BlandServiceUnavailable):
+        breaker.before_call()
+
+    clock.now = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(BlandServiceUnavailable):
+        breaker.before_call()  # Only one trial call at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_reopens_when_trial_call_fails():
+    clock = FakeClock()
+    breaker = CircuitBreaker('test', minimum_calls=1, window_size=1, reset_timeout=5, clock=clock)
+    breaker.record_failure()
+    clock.now = 5
+
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def half_open_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker('test', minimum_calls=1, window_size=1, reset_timeout=5, clock=clock)
+    breaker.record_failure()
+    clock.now = 5
+    return breaker, clock
+
+
+def test_unexpected_error_during_trial_call_reopens_breaker():
+    breaker, clock = half_open_breaker()
+    client = BlandClient()
+    client.breaker = breaker
+
+    with patch.object(client.session, 'request', side_effect=requests.exceptions.ChunkedEncodingError):
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            client._request('GET', 'https://bland.invalid/v1/agents', timeout=30)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 10
+    breaker.before_call()  # The trial slot was not leaked
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+@pytest.mark.parametrize('error, state', [
+    (httpx.ReadError('reset'), CircuitBreaker.OPEN),
+    (asyncio.CancelledError(), CircuitBreaker.HALF_OPEN),
+])
+def test_async_trial_call_always_gives_its_slot_back(error, state):
+    breaker, _ = half_open_breaker()
+
+    def fail(request):
+        raise error
+
+    async def fetch():
+        client = AsyncBlandClient()
+        client.breaker = breaker
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(fail))
+        try:
+            await client._request('GET', 'https://bland.invalid/v1/agents', timeout=30)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(type(error)):
+        async_to_sync(fetch)()
+
+    assert breaker.state == state
+    if state == CircuitBreaker.HALF_OPEN:
+        breaker.before_call()  # A cancelled call is not an outcome, but its slot is free again
+
+
+def test_request_budget_caps_retries(settings):
+    settings.BLAND_AI_REQUEST_BUDGET = 0.5
+    settings.BLAND_AI_BACKOFF_FACTOR = 0.2
+    settings.BLAND_AI_MAX_RETRIES = 10
+    client = BlandClient()
+    gateway_error = requests.Response()
+    gateway_error.status_code = 503
+
+    with patch.object(client.session, 'request', return_value=gateway_error) as mock_request:
+        response = client._request('GET', 'https://bland.invalid/v1/agents', timeout=30)
+
+    assert response.status_code == 503
+    # 0.2s + 0.4s of backoff would overrun the 0.5s budget, so only two attempts are made
+    assert mock_request.call_count == 2
+    assert mock_request.call_args_list[0].kwargs['timeout'] <= 0.5
+
+
+@pytest.mark.django_db
+def test_open_breaker_fails_agent_create_fast_with_503(api_client, sample_agent_data):
+    breaker = get_bland_breaker()
+    for _ in range(breaker.minimum_calls):
+        breaker.record_failure()
+
+    with patch('agents.bland_client.requests.Session.request') as mock_request:
+        response = api_client.post(reverse('agent-list'), sample_agent_data, format='json')
+
+    assert response.status_code == 503
+    assert response.data['detail'] == BlandServiceUnavailable.default_detail
+    mock_request.assert_not_called()
+    assert Agent.objects.count() == 0
@@ -0,0 +1,160 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from django.db import connection, transaction
+from django.urls import reverse
+from rest_framework.generics import GenericAPIView
+from rest_framework.test import APIClient
+
+from agents.models import Agent, ConversationalPathway, VersionConflict
+
+THREADS = 8
+WRITES_PER_THREAD = 10
+
+
+@pytest.fixture
+def concurrent_db(transactional_db):
+    # conftest.py gives SQLite a file-backed test database; an in-memory one set through TEST NAME fails
+    # a second writer with "table is locked" instead of waiting
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        pytest.skip("Needs a test database that takes concurrent writers, such as PostgreSQL.")
+
+
+def hammer(work):
+    """
+    Runs `work(thread_index)` on THREADS threads released at the same moment, each on its own connection.
+    """
+    barrier = threading.Barrier(THREADS)
+
+    def run(index):
+        barrier.wait()
+        try:
+            return work(index)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        return list(executor.map(run, range(THREADS)))
+
+
+@pytest.mark.django_db
+def test_save_of_stale_instance_raises_conflict():
+    agent = Agent.objects.create(name='Agent', prompt='<p>Hi</p>')
+    first, second = Agent.objects.get(pk=agent.pk), Agent.objects.get(pk=agent.pk)
+
+    first.name = 'First'
+    first.save()
+    second.name = 'Second'
+    with pytest.raises(VersionConflict), transaction.atomic():
+        second.save()
+
+    agent.refresh_from_db()
+    assert (agent.name, agent.version) == ('First', 1)
+    assert first.version == 1
+
+
+def test_concurrent_read_modify_write_loses_no_increment(concurrent_db):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes={'count': 0})
+
+    def increment(index):
+        conflicts = 0
+        for _ in range(WRITES_PER_THREAD):
+            while True:
+                current = ConversationalPathway.objects.get(pk=pathway.pk)
+                current.nodes = {'count': current.nodes['count'] + 1}
+                try:
+                    current.save()
+                    break
+                except VersionConflict:
+                    conflicts += 1
+        return conflicts
+
+    hammer(increment)
+
+    pathway.refresh_from_db()
+    assert pathway.nodes == {'count': THREADS * WRITES_PER_THREAD}
+    assert pathway.version == THREADS * WRITES_PER_THREAD
+
+
+def test_concurrent_puts_without_if_match_all_land(concurrent_db, settings, sample_agent_data):
+    settings.VERSION_CONFLICT_RETRIES = THREADS * WRITES_PER_THREAD  # Every PUT must eventually win
+    agent = Agent.objects.create(bland_ai_id='bland-1', **sample_agent_data)
+    url = reverse('agent-detail', args=[agent.pk])
+
+    def put(index):
+        client = APIClient()
+        return [client.put(url, dict(sample_agent_data, name=f'Agent {index}-{write}'), format='json').status_code
+                for write in range(WRITES_PER_THREAD)]
+
+    with patch('agents.views.BlandClient.update_agent', return_value=None):
+        statuses = hammer(put)
+
+    assert {code for codes in statuses for code in codes} == {200}
+    agent.refresh_from_db()
+    assert agent.version == THREADS * WRITES_PER_THREAD
+
+
+def test_concurrent_puts_with_same_if_match_have_one_winner(concurrent_db, sample_agent_data):
+    agent = Agent.objects.create(bland_ai_id='bland-1', **sample_agent_data)
+    url = reverse('agent-detail', args=[agent.pk])
+
+    def put(index):
+        return APIClient().put(url, dict(sample_agent_data, name=f'Agent {index}'), format='json',
+                               HTTP_IF_MATCH='"0"').status_code
+
+    with patch('agents.views.BlandClient.update_agent', return_value=None):
+        statuses = hammer(put)
+
+    assert sorted(statuses) == [200] + [412] * (THREADS - 1)
+    agent.refresh_from_db()
+    assert agent.version == 1
+
+
+@pytest.mark.django_db
+def test_if_match_and_etag(api_client, sample_agent_data):
+    agent = Agent.objects.create(bland_ai_id='bland-1', **sample_agent_data)
+    url = reverse('agent-detail', args=[agent.pk])
+
+    assert api_client.get(url)['ETag'] == '"0"'
+    with patch('agents.views.BlandClient.update_agent', return_value=None) as mock_update:
+        updated = api_client.put(url, dict(sample_agent_data, name='New'), format='json', HTTP_IF_MATCH='"0"')
+        stale = api_client.put(url, dict(sample_agent_data, name='Stale'), format='json', HTTP_IF_MATCH='"0"')
+        by_body = api_client.patch(url, {'name': 'Body', 'version': 1}, format='json')
+
+    assert updated.status_code == 200
+    assert updated['ETag'] == '"1"'
+    assert updated.json()['version'] == 1
+    assert stale.status_code == 412
+    assert by_body.status_code == 200
+    assert by_body['ETag'] == '"2"'
+    assert mock_update.call_count == 2  # The rejected write never reached Bland AI
+    agent.refresh_from_db()
+    assert (agent.name, agent.version) == ('Body', 2)
+
+
+@pytest.mark.django_db
+def test_update_without_if_match_is_retried_after_a_conflict(api_client, sample_agent_data):
+    agent = Agent.objects.create(bland_ai_id='bland-1', **sample_agent_data)
+    Agent.objects.filter(pk=agent.pk).update(version=5)
+    url = reverse('agent-detail', args=[agent.pk])
+    get_object = GenericAPIView.get_object
+    reads = []
+
+    def read_before_concurrent_write(view):
+        instance = get_object(view)
+        if not reads:
+            instance.version = 0  # Read before another writer moved the row to version 5
+        reads.append(instance.version)
+        return instance
+
+    with patch('agents.views.BlandClient.update_agent', return_value=None), \
+            patch.object(GenericAPIView, 'get_object', read_before_concurrent_write):
+        response = api_client.patch(url, {'name': 'Retried'}, format='json')
+
+    assert response.status_code == 200
+    assert reads == [0, 5]
+    assert response['ETag'] == '"6"'
+    agent.refresh_from_db()
+    assert (agent.name, agent.version) == ('Retried', 6)
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+
+from agents.db_connections import database_pool_stats, get_connection_counter
+
+connection = connections['default']
+
+
+@pytest.fixture
+def counter():
+    counter = get_connection_counter()
+    counter.reset()
+    yield counter
+    counter.reset()
+
+
+@pytest.mark.django_db
+def test_counter_is_fed_by_request_and_connection_signals(counter):
+    request_started.send(sender=None, environ={})
+    request_started.send(sender=None, environ={})
+    connection_created.send(sender=connection.__class__, connection=connection)
+
+    assert counter.stats() == {'requests': 2, 'connects': 1}
+    assert counter.stats('other') == {'requests': 2, 'connects': 0}
+
+
+@pytest.mark.parametrize('conn_max_age, mode', [(0, 'none'), (60, 'persistent'), (None, 'persistent')])
+def test_stats_report_mode_from_connection_settings(monkeypatch, counter, conn_max_age, mode):
+    monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', conn_max_age)
+    monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS', True)
+
+    stats = database_pool_stats()
+
+    assert stats == {
+        'alias': 'default', 'vendor': connection.vendor, 'mode': mode, 'conn_max_age': conn_max_age,
+        'health_checks': True, 'requests': 0, 'connects': 0,
+    }
+
+
+def test_pool_mode_includes_driver_pool_stats(monkeypatch, counter):
+    monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', 0)
+    monkeypatch.setitem(connection.settings_dict, 'OPTIONS', {'pool': {'max_size': 4}})
+    pool = MagicMock()
+    pool.get_stats.return_value = {'pool_size': 2, 'pool_available': 1, 'requests_waiting': 0}
+    monkeypatch.setattr(type(connection), 'pool', pool, raising=False)
+
+    stats = database_pool_stats()
+
+    assert stats['mode'] == 'pool'
+    assert stats['pool'] == {'pool_size': 2, 'pool_available': 1, 'requests_waiting': 0}
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_is_staff_only(api_client, counter):
+    url = reverse('database-stats')
+    assert api_client.get(url).status_code in (401, 403)
+
+    api_client.force_authenticate(User.objects.create_user('ops', is_staff=True))
+    response = api_client.get(url)
+
+    assert response.status_code == 200
+    assert response.json()['requests'] == 2  # Both requests, the refused one included
+    assert response.json()['mode'] == database_pool_stats()['mode']
@@ -0,0 +1,58 @@
+import gzip
+import json
+
+import pytest
+from django.urls import reverse
+
+from agents.models import Agent, ConversationalPathway
+
+
+def streamed(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_export_streams_every_agent_as_ndjson(api_client, settings):
+    settings.EXPORT_CHUNK_SIZE = 2  # Several chunks
+    agents = [Agent.objects.create(name=f'Agent {index}', prompt='<p>Hi</p>') for index in range(5)]
+
+    response = api_client.get(reverse('agent-export'))
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'application/x-ndjson'
+    lines = streamed(response).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [agent.id for agent in agents]
+    # Each line is the object as the list endpoint shows it
+    listed = api_client.get(reverse('agent-list')).json()['results']
+    assert sorted((json.loads(line) for line in lines), key=lambda agent: agent['id']) == \
+        sorted(listed, key=lambda agent: agent['id'])
+
+
+@pytest.mark.django_db
+def test_export_is_gzipped_when_accepted(api_client):
+    ConversationalPathway.objects.create(name='Graph', nodes={'1': {'type': 'Default'}})
+
+    response = api_client.get(reverse('conversationalpathway-export'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    assert 'conversational_pathways.ndjson' in response['Content-Disposition']
+    assert json.loads(gzip.decompress(streamed(response)))['nodes'] == {'1': {'type': 'Default'}}
+
+
+@pytest.mark.django_db
+def test_export_honours_sparse_fields(api_client):
+    ConversationalPathway.objects.create(name='Graph', nodes={'1': {'type': 'Default'}})
+
+    response = api_client.get(reverse('conversationalpathway-export'), {'fields': 'id,name'})
+
+    assert list(json.loads(streamed(response))) == ['id', 'name']
+
+
+@pytest.mark.django_db
+def test_export_of_empty_table_is_empty(api_client):
+    response = api_client.get(reverse('agent-export'), HTTP_ACCEPT='application/x-ndjson')
+
+    assert response.status_code == 200
+    assert streamed(response) == b''
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+import requests
+from agents.bland_client import BlandClient
+from agents.fake_bland import FakeBlandServer, Latency
+from agents.models import Agent, ConversationalPathway
+
+
+@pytest.fixture
+def fake_bland(settings):
+    with FakeBlandServer(seed=1) as server:
+        settings.BLAND_AI_BASE_URL = server.url
+        settings.BLAND_AI_BACKOFF_FACTOR = 0
+        yield server
+
+
+@pytest.mark.django_db
+def test_client_round_trip_against_fake_server(fake_bland, sample_agent_data, sample_pathway_data):
+    client = BlandClient()
+    assert client.base_url == fake_bland.url
+
+    agent = Agent.objects.create(**sample_agent_data)
+    agent.bland_ai_id = client.create_agent(agent, sample_agent_data)
+    agent.save()
+    assert fake_bland.state.agents[agent.bland_ai_id]['name'] == sample_agent_data['name']
+
+    agent.voice = 'maya'
+    client.update_agent(agent, sample_agent_data)
+    assert client.delete_agent(agent.bland_ai_id)['status'] == 'success'
+    assert fake_bland.state.agents == {}
+
+    pathway = ConversationalPathway.objects.create(**sample_pathway_data)
+    pathway_id = client.create_conversational_pathway(pathway, sample_pathway_data)
+    assert client.get_conversational_pathway(pathway_id)['name'] == sample_pathway_data['name']
+    assert [p['pathway_id'] for p in client.get_all_conversational_pathways()] == [pathway_id]
+    client.delete_conversational_pathway(pathway_id)
+
+    assert fake_bland.state.stats()['requests'] == {
+        'create_agent': 1, 'update_agent': 1, 'delete_agent': 1, 'create_pathway': 1,
+        'get_pathway': 1, 'list_pathways': 1, 'delete_pathway': 1,
+    }
+
+
+def test_injected_errors_are_retried(fake_bland, settings):
+    settings.BLAND_AI_MAX_RETRIES = 2
+    fake_bland.state.error_rate = 1.0
+    client = BlandClient()
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get_conversational_pathway('missing')
+
+    # The first attempt plus two retries
+    assert fake_bland.state.stats()['responses'] == {503: 3}
+
+
+def test_rate_limit_answers_429_with_retry_after(fake_bland):
+    fake_bland.state.rate_limit = 2
+    fake_bland.state.rate_window = 60
+    session = requests.Session()
+
+    statuses = [session.get(f"{fake_bland.url}/convo_pathway").status_code for _ in range(3)]
+    limited = session.get(f"{fake_bland.url}/convo_pathway")
+
+    assert statuses == [200, 200, 429]
+    assert int(limited.headers['Retry-After']) >= 1
+
+
+def test_latency_specs():
+    assert Latency.parse('0.25').sample(None) == 0.25
+    assert Latency.parse('constant:0.1').sample(None) == 0.1
+    rng = random.Random(0)
+    samples = [Latency.parse('uniform:0.01,0.02').sample(rng) for _ in range(100)]
+    assert all(0.01 <= sample <= 0.02 for sample in samples)
+    assert Latency.parse('lognormal:0.05,0.5').sample(rng) > 0
+    with pytest.raises(ValueError):
+        Latency.parse('pareto:1')
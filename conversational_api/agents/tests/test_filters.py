@@ -0,0 +1,64 @@
+import pytest
+from django.urls import reverse
+
+from agents.models import Agent
+
+
+@pytest.fixture
+def agents():
+    return {
+        agent.name: agent for agent in [
+            Agent.objects.create(name='turbo-eng', prompt='p', model='turbo', language='ENG', voice='maya',
+                                 pathway_id='pathway-x', keywords=['demo', 'pricing'],
+                                 metadata={'customer_id': 42, 'region': {'code': 'EU'}}),
+            Agent.objects.create(name='turbo-fr', prompt='p', model='turbo', language='FR', keywords=['demo'],
+                                 metadata={'customer_id': '42', 'vip': True}, dynamic_data={'in': {'tier': 'gold'}}),
+            Agent.objects.create(name='base-eng', prompt='p', model='base', language='ENG', pathway_id='pathway-y',
+                                 metadata={'customer_id': 7, 'note': None, 'vip': 1}),
+        ]
+    }
+
+
+def names(api_client, params):
+    response = api_client.get(reverse('agent-list'), params)
+    assert response.status_code == 200, response.data
+    return sorted(agent['name'] for agent in response.data['results'])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params, expected', [
+    ({'model': 'turbo', 'language': 'ENG'}, ['turbo-eng']),
+    ({'model': 'turbo,base', 'language': 'ENG'}, ['base-eng', 'turbo-eng']),
+    ({'voice': 'maya'}, ['turbo-eng']),
+    ({'pathway_id': 'pathway-y'}, ['base-eng']),
+    ({'keywords': 'demo'}, ['turbo-eng', 'turbo-fr']),
+    ({'keywords': 'demo,pricing'}, ['turbo-eng']),
+    ({'metadata.customer_id': '42'}, ['turbo-eng', 'turbo-fr']),  # Number or string
+    ({'metadata.customer_id': '7', 'language': 'ENG'}, ['base-eng']),
+    ({'metadata.region.code': 'EU'}, ['turbo-eng']),
+    ({'metadata.vip': 'true'}, ['turbo-fr']),
+    ({'metadata.vip': '1'}, ['base-eng']),  # Booleans and numbers never match each other, as on PostgreSQL
+    ({'metadata.vip': '1.0'}, ['base-eng']),
+    ({'metadata.vip': 'false'}, []),
+    ({'metadata.note': 'null'}, ['base-eng']),  # Explicit null, not a missing key
+    ({'dynamic_data.in.tier': 'gold'}, ['turbo-fr']),  # "in" is a key, not a lookup
+    ({'metadata.customer_id': 'missing'}, []),
+    ({'unrelated': 'x'}, ['base-eng', 'turbo-eng', 'turbo-fr']),
+])
+@pytest.mark.filterwarnings('error::django.core.paginator.UnorderedObjectListWarning')
+def test_agent_filters(api_client, agents, params, expected):
+    assert names(api_client, params) == expected
+
+
+@pytest.mark.django_db
+def test_filters_apply_to_export(api_client, agents):
+    response = api_client.get(reverse('agent-export'), {'model': 'base'})
+
+    assert b''.join(response.streaming_content).count(b'\n') == 1
+
+
+@pytest.mark.django_db
+def test_invalid_json_path_is_rejected(api_client):
+    response = api_client.get(reverse('agent-list'), {"metadata.customer_id')--": '1'})
+
+    assert response.status_code == 400
@@ -0,0 +1,120 @@
+import hashlib
+import json
+from datetime import timedelta
+
+import pytest
+import requests
+from django.urls import reverse
+from django.utils import timezone
+from unittest.mock import patch
+from rest_framework.exceptions import APIException
+from agents.bland_client import BlandClient
+from agents.fake_bland import FakeBlandServer
+from agents.idempotency import purge_expired
+from agents.models import Agent, IdempotencyKey
+
+
+def in_progress_key(key, data):
+    now = timezone.now()
+    return IdempotencyKey.objects.create(
+        key=key,
+        scope=f"POST {reverse('agent-list')} anonymous",
+        request_hash=hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest(),
+        locked_at=now,
+        expires_at=now + timedelta(days=1),
+    )
+
+
+@pytest.mark.django_db
+def test_retried_create_replays_stored_response(api_client, sample_agent_data):
+    url = reverse('agent-list')
+
+    with patch('agents.views.BlandClient.create_agent', return_value='bland_ai_id_123') as mock_create_agent:
+        first = api_client.post(url, sample_agent_data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        second = api_client.post(url, sample_agent_data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert second['Idempotent-Replayed'] == 'true'
+    assert mock_create_agent.call_count == 1
+    assert Agent.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_key_reused_for_other_body_is_rejected(api_client, sample_agent_data):
+    url = reverse('agent-list')
+
+    with patch('agents.views.BlandClient.create_agent', return_value='bland_ai_id_123'):
+        api_client.post(url, sample_agent_data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        response = api_client.post(url, dict(sample_agent_data, name='Other'), format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+    assert response.status_code == 422
+    assert Agent.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_duplicate_waits_for_first_request(api_client, sample_agent_data):
+    record = in_progress_key('key-1', sample_agent_data)
+
+    def first_request_finishes(_):
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            status=IdempotencyKey.Status.COMPLETED, response_status=201, response_body={'id': 42},
+        )
+
+    with patch('agents.idempotency.time.sleep', side_effect=first_request_finishes) as mock_sleep, \
+            patch('agents.views.BlandClient.create_agent') as mock_create_agent:
+        response = api_client.post(reverse('agent-list'), sample_agent_data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+    assert mock_sleep.called
+    assert response.status_code == 201
+    assert response.json() == {'id': 42}
+    mock_create_agent.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_duplicate_gets_409_when_first_request_is_slow(api_client, sample_agent_data, settings):
+    settings.IDEMPOTENCY_WAIT_TIMEOUT = 0
+    in_progress_key('key-1', sample_agent_data)
+
+    with patch('agents.views.BlandClient.create_agent') as mock_create_agent:
+        response = api_client.post(reverse('agent-list'), sample_agent_data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+    assert response.status_code == 409
+    mock_create_agent.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_failed_create_releases_key(api_client, sample_agent_data):
+    url = reverse('agent-list')
+
+    with patch('agents.views.BlandClient.create_agent', side_effect=APIException("Bland AI creation failed")):
+        assert api_client.post(url, sample_agent_data, format='json', HTTP_IDEMPOTENCY_KEY='key-1').status_code == 500
+    with patch('agents.views.BlandClient.create_agent', return_value='bland_ai_id_123'):
+        assert api_client.post(url, sample_agent_data, format='json', HTTP_IDEMPOTENCY_KEY='key-1').status_code == 201
+
+
+@pytest.mark.django_db
+def test_purge_expired_keys(sample_agent_data):
+    record = in_progress_key('key-1', sample_agent_data)
+    assert purge_expired() == 0
+    IdempotencyKey.objects.filter(pk=record.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert purge_expired() == 1
+
+
+@pytest.mark.django_db
+def test_client_does_not_resend_create_after_server_error(settings, sample_agent_data):
+    settings.BLAND_AI_BACKOFF_FACTOR = 0
+    settings.BLAND_AI_MAX_RETRIES = 3
+
+    with FakeBlandServer(error_rate=1.0) as fake_bland:
+        settings.BLAND_AI_BASE_URL = fake_bland.url
+        agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+        client = BlandClient()
+
+        with pytest.raises(APIException):
+            client.create_agent(agent, sample_agent_data)
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.update_agent(agent, sample_agent_data)
+
+        # The create may have gone through before the 503, so it is sent once; the update is retried
+        assert fake_bland.state.stats()['requests'] == {'create_agent': 1, 'update_agent': 4}
@@ -0,0 +1,88 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from unittest.mock import patch
+
+from agents.parsers import FastJSONParser
+from agents.renderers import FastJSONRenderer
+
+RENDERED = [
+    {'created_at': timezone.now(), 'naive': datetime.datetime(2024, 1, 2, 3, 4, 5, 6), 'date': datetime.date(2024, 1, 2)},
+    {'price': decimal.Decimal('12.50'), 'id': uuid.UUID(int=1), 'lazy': gettext_lazy('Hello'), 'time': datetime.time(1, 2)},
+    {'separators': 'line\u2028para\u2029', 'unicode': 'café “quotes” 😀', 'float': 0.1, 'nested': [None, True, {}]},
+    {1: 'int key', None: 'none key', False: 'bool key'},
+    {'big': 2 ** 70},  # Over 64 bits, rendered by JSONRenderer
+]
+
+
+@pytest.mark.parametrize('data', RENDERED)
+def test_fast_renderer_matches_json_renderer(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_fast_renderer_indents_like_json_renderer():
+    data = {'nodes': {'1': {'type': 'Default'}}}
+
+    assert FastJSONRenderer().render(data, 'application/json; indent=4') == \
+        JSONRenderer().render(data, 'application/json; indent=4')
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), -float('inf')])
+def test_fast_renderer_rejects_non_finite_floats_like_json_renderer(value):
+    data = {'nodes': [{'score': value}], 'name': None}
+    with pytest.raises(ValueError):
+        JSONRenderer().render(data)
+    with pytest.raises(ValueError):
+        FastJSONRenderer().render(data)
+
+
+def test_fast_renderer_works_without_orjson():
+    with patch('agents.renderers.orjson', None):
+        assert FastJSONRenderer().render({'a': decimal.Decimal('1.5')}) == b'{"a":1.5}'
+
+
+@pytest.mark.parametrize('body', [
+    b'{"nodes": {"1": {"type": "Default", "x": 1.25}}, "edges": [], "name": "caf\\u00e9"}',
+    b'{"lone": "\\ud800"}',  # Rejected by orjson, accepted by the stdlib
+    b'[18446744073709551616]',
+])
+def test_fast_parser_matches_json_parser(body):
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+
+@pytest.mark.parametrize('body', [b'', b'{"a": NaN}', b'{"a": 1', b'\xff'])
+def test_fast_parser_rejects_what_json_parser_rejects(body):
+    with pytest.raises(ParseError) as expected:
+        JSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError) as error:
+        FastJSONParser().parse(io.BytesIO(body))
+
+    assert str(error.value) == str(expected.value)
+
+
+@pytest.mark.django_db
+def test_api_round_trips_through_fast_json(api_client, sample_pathway_data):
+    sample_pathway_data['nodes'] = {str(node): {'type': 'Default', 'text': 'é'} for node in range(100)}
+
+    with patch('agents.views.BlandClient.create_conversational_pathway', return_value='pathway_123'):
+        response = api_client.post('/api/v1/pathways/', sample_pathway_data, format='json')
+
+    assert response.status_code == 201
+    assert response.json()['nodes'] == sample_pathway_data['nodes']
+
+
+def test_benchmark_command_reports_each_size(capsys):
+    call_command('benchmark_json', '--nodes', '2,5', '--number', '1')
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].split()[0] == '2'
+    assert lines[2].split()[0] == '5'
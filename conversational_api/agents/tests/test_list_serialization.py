@@ -0,0 +1,70 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import serializers
+
+from agents.models import Agent, ConversationalPathway
+from agents.serializers import AgentSerializer, ValuesRowMapper
+
+
+def create_agents():
+    Agent.objects.create(name='Minimal', prompt='<h1>Hello</h1>')  # Nullable columns left as None
+    Agent.objects.create(
+        name='Full', prompt='<p>Hi</p>', script='Hi', bland_ai_id='bland-1', pathway_id='',
+        analysis_schema={'budget': 'number'}, metadata={'nested': {'list': [1, 2.5, None]}},
+        first_sentence='Hello!', keywords=['demo'], dynamic_data={'tier': 'gold'},
+        tools=[{'tool_name': 'crm', 'description': 'Lookup', 'timeout': 30, 'retry': None}, {1: True}],
+        webhook='https://example.com/hook',
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name, create', [
+    ('agent-list', create_agents),
+    ('conversationalpathway-list', lambda: [
+        ConversationalPathway.objects.create(name='Empty'),
+        ConversationalPathway.objects.create(
+            name='Graph', description='d', nodes={'1': {'type': 'Default'}}, edges={'1': {'target': '2'}},
+        ),
+    ]),
+])
+def test_values_list_renders_same_bytes_as_serializer(api_client, settings, url_name, create):
+    create()
+    url = reverse(url_name)
+
+    settings.VALUES_LIST_SERIALIZATION = False
+    expected = api_client.get(url, {'page': 1})
+    settings.VALUES_LIST_SERIALIZATION = True
+    response = api_client.get(url, {'page': 1})
+
+    assert response.status_code == expected.status_code == 200
+    assert response['Content-Type'] == expected['Content-Type']
+    assert response.content == expected.content
+
+
+@pytest.mark.django_db
+def test_row_mapper_matches_serializer_data():
+    create_agents()
+    mapper = ValuesRowMapper(AgentSerializer)
+    queryset = Agent.objects.order_by('pk')
+
+    assert mapper.map(queryset.values(*mapper.columns)) == AgentSerializer(queryset, many=True).data
+
+
+def test_row_mapper_rejects_fields_it_cannot_read_from_rows():
+    class NestedSerializer(serializers.Serializer):
+        owner = serializers.CharField(source='owner.name')
+
+    with pytest.raises(ImproperlyConfigured):
+        ValuesRowMapper(NestedSerializer)
+
+
+@pytest.mark.django_db
+def test_benchmark_command_reports_each_page_size(capsys):
+    call_command('benchmark_list_serialization', '--page-sizes', '1,5', '--number', '1')
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].startswith('1 ')
+    assert lines[2].startswith('5 ')
+    assert not Agent.objects.exists()
@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from unittest.mock import patch
+from agents.models import Agent, BlandSyncEvent, ConversationalPathway, SyncStatus
+from agents.outbox import claim_events, debounce_stats, dispatch_pending, enqueue_sync
+
+
+@pytest.fixture
+def outbox_mode(settings):
+    settings.BLAND_AI_SYNC_MODE = 'outbox'
+    settings.BLAND_OUTBOX_RETRY_BACKOFF = 0
+
+
+@pytest.mark.django_db
+def test_create_agent_queues_sync_and_returns_202(api_client, sample_agent_data, outbox_mode):
+    url = reverse('agent-list')
+
+    with patch('agents.views.BlandClient.create_agent') as mock_create_agent:
+        response = api_client.post(url, sample_agent_data, format='json')
+
+    assert response.status_code == 202
+    assert response.data['sync_status'] == SyncStatus.PENDING
+    assert response.data['bland_ai_id'] is None
+    mock_create_agent.assert_not_called()
+
+    event = BlandSyncEvent.objects.get()
+    assert event.operation == BlandSyncEvent.Operation.CREATE
+    assert event.object_id == response.data['id']
+    assert set(event.payload['fields']) == set(sample_agent_data)
+
+
+@pytest.mark.django_db
+def test_dispatcher_pushes_queued_create(api_client, sample_agent_data, outbox_mode):
+    api_client.post(reverse('agent-list'), sample_agent_data, format='json')
+
+    with patch('agents.outbox.get_bland_client') as mock_get_client:
+        mock_get_client.return_value.create_agent.return_value = 'bland_ai_id_123'
+        assert dispatch_pending('worker-1') == 1
+
+    agent = Agent.objects.get()
+    assert agent.bland_ai_id == 'bland_ai_id_123'
+    assert agent.sync_status == SyncStatus.SYNCED
+    assert BlandSyncEvent.objects.get().status == BlandSyncEvent.Status.DONE
+
+
+@pytest.mark.django_db
+def test_dispatcher_keeps_per_object_order(sample_pathway_data):
+    first = ConversationalPathway.objects.create(**sample_pathway_data)
+    second = ConversationalPathway.objects.create(**sample_pathway_data)
+    create_first = enqueue_sync(first, BlandSyncEvent.Operation.CREATE, sample_pathway_data)
+    enqueue_sync(first, BlandSyncEvent.Operation.UPDATE, {'name': 'x'})
+    create_second = enqueue_sync(second, BlandSyncEvent.Operation.CREATE, sample_pathway_data)
+
+    # Only the head of each object's queue can be claimed, and a second worker gets nothing
+    claimed = claim_events('worker-1')
+    assert [event.id for event in claimed] == [create_first.id, create_second.id]
+    assert claim_events('worker-2') == []
+
+
+@pytest.mark.django_db
+def test_dispatcher_retries_then_fails(sample_agent_data, settings, outbox_mode):
+    settings.BLAND_OUTBOX_MAX_ATTEMPTS = 2
+    agent = Agent.objects.create(**sample_agent_data)
+    enqueue_sync(agent, BlandSyncEvent.Operation.CREATE, sample_agent_data)
+
+    with patch('agents.outbox.get_bland_client') as mock_get_client:
+        mock_get_client.return_value.create_agent.side_effect = Exception("Bland AI creation failed")
+        dispatch_pending('worker-1')
+        assert BlandSyncEvent.objects.get().status == BlandSyncEvent.Status.PENDING
+        dispatch_pending('worker-1')
+
+    event = BlandSyncEvent.objects.get()
+    assert event.status == BlandSyncEvent.Status.FAILED
+    assert event.attempts == 2
+    assert 'Bland AI creation failed' in event.last_error
+    agent.refresh_from_db()
+    assert agent.sync_status == SyncStatus.FAILED
+
+
+@pytest.mark.django_db
+def test_delete_queues_remote_delete(api_client, sample_agent_data, outbox_mode):
+    agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+
+    response = api_client.delete(reverse('agent-detail', args=[agent.id]))
+
+    assert response.status_code == 202
+    assert not Agent.objects.filter(id=agent.id).exists()
+
+    with patch('agents.outbox.get_bland_client') as mock_get_client:
+        dispatch_pending('worker-1')
+    mock_get_client.return_value.delete_agent.assert_called_once_with('bland_ai_id_123')
+
+
+@pytest.fixture
+def debounced_mode(settings):
+    settings.BLAND_AI_SYNC_MODE = 'debounced'
+    settings.BLAND_AI_SYNC_DEBOUNCE_SECONDS = 10
+    settings.BLAND_AI_SYNC_DEBOUNCE_MAX_WAIT = 60
+    settings.BLAND_OUTBOX_RETRY_BACKOFF = 0
+
+
+@pytest.mark.django_db
+def test_debounced_updates_are_coalesced(api_client, sample_agent_data, debounced_mode):
+    agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+    url = reverse('agent-detail', args=[agent.id])
+
+    for duration in (10, 20, 30):
+        response = api_client.patch(url, {'max_duration': duration}, format='json')
+        assert response.status_code == 202
+    api_client.patch(url, {'voice': 'maya'}, format='json')
+
+    # Every save is committed locally straight away
+    agent.refresh_from_db()
+    assert agent.max_duration == 30
+    assert agent.voice == 'maya'
+    assert agent.version == 4
+
+    event = BlandSyncEvent.objects.get()
+    assert event.coalesced_count == 3
+    assert event.payload['fields'] == ['max_duration', 'voice']
+    assert event.payload['version'] == 4
+    # Not ready until the window has passed
+    assert claim_events('worker-1') == []
+
+    BlandSyncEvent.objects.update(available_at=timezone.now())
+    with patch('agents.outbox.get_bland_client') as mock_get_client:
+        assert dispatch_pending('worker-1') == 1
+    sent_agent, sent_fields = mock_get_client.return_value.update_agent.call_args.args
+    assert (sent_agent.max_duration, sent_agent.voice) == (30, 'maya')
+    assert sent_fields == ['max_duration', 'voice']
+
+    assert debounce_stats() == {'update_requests': 4, 'remote_updates': 1, 'remote_calls_saved': 3}
+
+
+@pytest.mark.django_db
+def test_debounce_is_capped_by_max_wait(sample_agent_data, settings, debounced_mode):
+    settings.BLAND_AI_SYNC_DEBOUNCE_MAX_WAIT = 15
+    agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+    event = enqueue_sync(agent, BlandSyncEvent.Operation.UPDATE, {'name': 'a'})
+    BlandSyncEvent.objects.filter(pk=event.pk).update(created_at=timezone.now() - timedelta(seconds=10))
+
+    event = enqueue_sync(agent, BlandSyncEvent.Operation.UPDATE, {'name': 'b'})
+
+    # Window would end 10s from now, but the first save was 10s ago and may only wait 15s in total
+    assert event.available_at <= timezone.now() + timedelta(seconds=5)
+
+
+@pytest.mark.django_db
+def test_claimed_update_is_not_coalesced(sample_agent_data, debounced_mode):
+    agent = Agent.objects.create(bland_ai_id='bland_ai_id_123', **sample_agent_data)
+    first = enqueue_sync(agent, BlandSyncEvent.Operation.UPDATE, {'name': 'a'})
+    BlandSyncEvent.objects.filter(pk=first.pk).update(status=BlandSyncEvent.Status.PROCESSING)
+
+    second = enqueue_sync(agent, BlandSyncEvent.Operation.UPDATE, {'name': 'b'})
+
+    assert second.pk != first.pk
+    assert BlandSyncEvent.objects.count() == 2
@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from agents.models import Agent, ConversationalPathway
+
+
+def walk(api_client, url, params):
+    """
+    Follows `next` links from the first page and returns the ids seen and the number of pages.
+    """
+    ids, pages = [], 0
+    response = api_client.get(url, params)
+    while True:
+        assert response.status_code == 200
+        pages += 1
+        ids += [item['id'] for item in response.data['results']]
+        if not response.data['next']:
+            return ids, pages
+        response = api_client.get(response.data['next'])
+
+
+@pytest.fixture
+def pathways():
+    pathways = [ConversationalPathway.objects.create(name=f'Pathway {index}') for index in range(25)]
+    # Several rows share a created_at: the cursor must order ties by id without skipping any
+    ConversationalPathway.objects.filter(pk__in=[pathway.pk for pathway in pathways[5:15]]).update(
+        created_at=timezone.now(),
+    )
+    return list(ConversationalPathway.objects.order_by('created_at', 'id').values_list('id', flat=True))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('values_list', [True, False])
+def test_cursor_pages_cover_every_row_once_in_order(api_client, settings, pathways, values_list):
+    settings.VALUES_LIST_SERIALIZATION = values_list
+
+    ids, pages = walk(api_client, reverse('conversationalpathway-list'), {'pagination': 'cursor', 'page_size': 4})
+
+    assert ids == pathways
+    assert pages == 7
+
+
+@pytest.mark.django_db
+def test_cursor_pages_do_not_count(api_client):
+    Agent.objects.create(name='Agent', prompt='<p>Hi</p>')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse('agent-list'), {'pagination': 'cursor'})
+
+    assert 'count' not in response.data
+    assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_cursor_pages_with_sparse_fields(api_client, pathways):
+    ids, _ = walk(api_client, reverse('conversationalpathway-list'),
+                  {'pagination': 'cursor', 'page_size': 10, 'fields': 'id,name'})
+
+    assert ids == pathways
+
+
+@pytest.mark.django_db
+def test_page_numbers_still_work(api_client, pathways):
+    response = api_client.get(reverse('conversationalpathway-list'), {'page': 2})
+
+    assert response.data['count'] == 25
+    assert [item['id'] for item in response.data['results']] == pathways[10:20]
+
+
+@pytest.mark.django_db
+def test_default_pagination_is_configurable(api_client, settings, pathways):
+    url = reverse('conversationalpathway-list')
+    assert 'count' in api_client.get(url).data
+
+    settings.LIST_PAGINATION_DEFAULT = 'cursor'
+    assert 'count' not in api_client.get(url).data
+    assert 'count' in api_client.get(url, {'page': 1}).data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{'pagination': 'cursor'}, {'page': 1}])
+def test_page_size_is_capped(api_client, settings, pathways, params):
+    settings.PAGINATION_MAX_PAGE_SIZE = 5
+
+    response = api_client.get(reverse('conversationalpathway-list'), {**params, 'page_size': 1000})
+
+    assert len(response.data['results']) == 5
@@ -0,0 +1,254 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from unittest.mock import patch
+
+from agents.models import ConversationalPathway, PathwayEdge, PathwayNode
+from agents.pathway_import import import_pathways
+
+NODES = {
+    'start': {'type': 'Default', 'data': {'prompt': 'Hello'}},
+    'pricing': {'type': 'Default', 'data': {'prompt': 'Our plans'}},
+    'end': {'type': 'End Call', 'data': {'prompt': 'Bye'}},
+}
+EDGES = {
+    'e1': {'source': 'start', 'target': 'pricing', 'label': 'asks price'},
+    'e2': {'source': 'pricing', 'target': 'end'},
+    'e3': {'source': 'start', 'target': 'end'},
+}
+
+
+@pytest.fixture
+def graph_tables(settings):
+    settings.PATHWAY_GRAPH_TABLES = True
+
+
+@pytest.fixture(params=[True, False], ids=['tables', 'json'])
+def graph_mode(request, settings):
+    settings.PATHWAY_GRAPH_TABLES = request.param
+    return request.param
+
+
+def node_rows(pathway):
+    return dict(PathwayNode.objects.filter(pathway=pathway).values_list('node_id', 'data'))
+
+
+def edge_rows(pathway):
+    return {edge_id: (source, target) for edge_id, source, target in
+            PathwayEdge.objects.filter(pathway=pathway).values_list('edge_id', 'source', 'target')}
+
+
+@pytest.mark.django_db
+def test_tables_follow_the_json_documents(graph_tables):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+    assert node_rows(pathway) == NODES
+    assert edge_rows(pathway) == {'e1': ('start', 'pricing'), 'e2': ('pricing', 'end'), 'e3': ('start', 'end')}
+
+    pathway.nodes = {'start': {'type': 'Default', 'data': {'prompt': 'Hi'}}}
+    pathway.edges = {}
+    pathway.save()
+    assert node_rows(pathway) == {'start': {'type': 'Default', 'data': {'prompt': 'Hi'}}}
+    assert edge_rows(pathway) == {}
+
+    pathway.delete()
+    assert not PathwayNode.objects.exists()
+
+
+@pytest.mark.django_db
+def test_queryset_delete_removes_rows_without_loading_documents(graph_tables):
+    kept = ConversationalPathway.objects.create(name='Kept', nodes=NODES, edges=EDGES)
+    deleted = ConversationalPathway.objects.create(name='Deleted', nodes=NODES, edges=EDGES)
+
+    with CaptureQueriesContext(connection) as queries:
+        ConversationalPathway.objects.filter(pk=deleted.pk).delete()
+
+    assert not any('"nodes"' in query['sql'] for query in queries.captured_queries)
+    assert node_rows(deleted) == {} and edge_rows(deleted) == {}
+    assert node_rows(kept) == NODES
+
+
+@pytest.mark.django_db
+def test_save_without_graph_change_leaves_tables_alone(graph_tables):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+    pathway.sync_status = 'synced'
+
+    with CaptureQueriesContext(connection) as queries:
+        pathway.save()
+
+    assert not any('agents_pathwaynode' in query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_bland_list_format_is_synced(graph_tables):
+    pathway = ConversationalPathway.objects.create(
+        name='Remote', nodes=[{'id': 1, 'type': 'Default'}, {'no_id': True}],
+        edges=[{'id': 'e', 'source': 1, 'target': 2}],
+    )
+
+    assert node_rows(pathway) == {'1': {'id': 1, 'type': 'Default'}}
+    assert edge_rows(pathway) == {'e': ('1', '2')}
+
+
+@pytest.mark.django_db
+def test_tables_are_off_by_default():
+    ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+
+    assert not PathwayNode.objects.exists() and not PathwayEdge.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_writes_sync_tables(api_client, graph_tables):
+    lines = [json.dumps({'name': 'Imported', 'nodes': NODES, 'edges': EDGES}).encode()]
+    import_pathways(lines)
+    with patch('agents.views.BlandClient.create_conversational_pathway', return_value='bland-1'):
+        api_client.post(reverse('conversationalpathway-bulk'), [{'name': 'Bulk', 'nodes': NODES}], format='json')
+
+    for pathway in ConversationalPathway.objects.all():
+        assert node_rows(pathway) == NODES
+
+
+@pytest.mark.django_db
+def test_sync_command_backfills_existing_pathways(settings):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+    settings.PATHWAY_GRAPH_TABLES = True
+
+    PathwayNode.objects.create(pathway_id=pathway.pk + 1, node_id='orphan')  # Pathway deleted while off
+    call_command('sync_pathway_graphs')
+
+    assert node_rows(pathway) == NODES
+    assert len(edge_rows(pathway)) == 3
+    assert PathwayNode.objects.count() == len(NODES)
+
+
+@pytest.mark.django_db
+def test_node_endpoint(api_client, graph_mode):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+
+    response = api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, 'pricing']))
+    missing = api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, 'nope']))
+    no_pathway = api_client.get(reverse('conversationalpathway-node', args=[pathway.pk + 1, 'pricing']))
+
+    assert response.status_code == 200
+    assert response.json() == {'id': 'pricing', 'data': NODES['pricing']}
+    assert missing.status_code == no_pathway.status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('direction, expected', [
+    ('both', {'e1', 'e2'}), ('out', {'e2'}), ('in', {'e1'}),
+])
+def test_node_edges_endpoint(api_client, graph_mode, direction, expected):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+
+    response = api_client.get(reverse('conversationalpathway-node-edges', args=[pathway.pk, 'pricing']),
+                              {'direction': direction})
+
+    assert response.status_code == 200
+    assert {edge['id'] for edge in response.json()} == expected
+    if 'e1' in expected:
+        assert {'id': 'e1', 'source': 'start', 'target': 'pricing', 'data': EDGES['e1']} in response.json()
+
+
+@pytest.mark.django_db
+def test_node_edges_rejects_unknown_direction(api_client):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+
+    response = api_client.get(reverse('conversationalpathway-node-edges', args=[pathway.pk, 'start']),
+                              {'direction': 'sideways'})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_node_reads_never_load_the_documents(api_client, graph_tables):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+
+    with CaptureQueriesContext(connection) as queries:
+        api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, 'start']))
+        api_client.get(reverse('conversationalpathway-node-edges', args=[pathway.pk, 'start']))
+
+    assert queries.captured_queries
+    for query in queries.captured_queries:
+        assert '"agents_conversationalpathway"."nodes"' not in query['sql']
+        assert '"agents_conversationalpathway"."edges"' not in query['sql']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('nodes', [
+    {'0': {'type': 'Default'}, '1': {'type': 'End Call'}},
+    [{'id': 0, 'type': 'Default'}, {'id': 1, 'type': 'End Call'}],
+], ids=['dict', 'list'])
+def test_node_endpoint_matches_numeric_ids(api_client, graph_mode, nodes):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=nodes)
+
+    response = api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, '1']))
+    missing = api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, '2']))
+
+    assert response.status_code == 200
+    assert response.json()['id'] == '1'
+    assert response.json()['data']['type'] == 'End Call'
+    assert missing.status_code == 404
+
+
+@pytest.mark.django_db
+def test_node_endpoint_does_not_index_list_documents(api_client, graph_mode):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=[{'id': 'start'}, {'id': 'end'}])
+
+    assert api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, '0'])).status_code == 404
+    assert api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, 'end'])).status_code == 200
+
+
+@pytest.mark.django_db
+def test_repeated_list_ids_keep_the_last_object(api_client, graph_mode):
+    pathway = ConversationalPathway.objects.create(
+        name='Remote', nodes=[{'id': 'a', 'v': 1}, {'id': 'a', 'v': 2}],
+        edges=[{'id': 'e', 'source': 'a', 'target': 'b'}, {'id': 'e', 'source': 'b', 'target': 'a'}],
+    )
+
+    node = api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, 'a'])).json()
+    edges = api_client.get(reverse('conversationalpathway-node-edges', args=[pathway.pk, 'a']),
+                           {'direction': 'out'}).json()
+
+    assert node['data'] == {'id': 'a', 'v': 2}
+    assert edges == []
+    if graph_mode:
+        assert edge_rows(pathway) == {'e': ('b', 'a')}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('document', [
+    {'nodes': {'n' * 256: {}}},
+    {'edges': {'e' * 256: {}}},
+    {'edges': {'e': {'source': 's' * 256}}},
+])
+def test_over_long_ids_are_rejected(api_client, document):
+    with patch('agents.views.BlandClient.create_conversational_pathway', return_value='bland-1') as mock_create:
+        response = api_client.post(reverse('conversationalpathway-list'), dict(name='Long', **document), format='json')
+
+    assert response.status_code == 400
+    assert set(response.json()) == set(document)
+    mock_create.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_over_long_remote_ids_are_left_out_of_the_tables(graph_tables):
+    pathway = ConversationalPathway.objects.create(name='Remote', nodes=[{'id': 'n' * 256}, {'id': 'ok'}])
+
+    assert list(node_rows(pathway)) == ['ok']
+
+
+@pytest.mark.django_db
+def test_node_lookup_without_tables_extracts_only_the_node(api_client):
+    pathway = ConversationalPathway.objects.create(name='Graph', nodes=NODES, edges=EDGES)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse('conversationalpathway-node', args=[pathway.pk, 'pricing']))
+
+    assert response.json() == {'id': 'pricing', 'data': NODES['pricing']}
+    assert queries.captured_queries
+    for query in queries.captured_queries:
+        assert '"agents_conversationalpathway"."nodes" FROM' not in query['sql']
@@ -0,0 +1,101 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from agents.models import BlandSyncEvent, ConversationalPathway, PathwayImport
+from agents.pathway_import import import_pathways
+
+
+def ndjson_lines(count, invalid=()):
+    for index in range(count):
+        if index in invalid:
+            yield b'{"name": ""}\n' if index % 2 else b'not json\n'
+        else:
+            yield json.dumps({'name': f'Pathway {index}', 'nodes': {'1': {'type': 'Default'}}, 'edges': {}}).encode() + b'\n'
+
+
+@pytest.mark.django_db
+def test_import_endpoint_creates_valid_lines_and_reports_invalid(api_client):
+    body = b''.join(ndjson_lines(5, invalid={1, 2})) + b'\n'  # Blank lines are skipped
+
+    response = api_client.post(reverse('conversationalpathway-import'), data=body,
+                               content_type='application/x-ndjson')
+
+    assert response.status_code == 207
+    assert response.data['created'] == 3
+    assert response.data['failed'] == 2
+    assert [error['line'] for error in response.data['errors']] == [2, 3]
+    assert ConversationalPathway.objects.count() == 3
+    assert not ConversationalPathway.objects.filter(content_hash=None).exists()
+
+
+@pytest.mark.django_db
+def test_lines_are_committed_batch_by_batch_while_reading():
+    seen = []
+
+    def lines():
+        for line in ndjson_lines(6):
+            seen.append(ConversationalPathway.objects.count())
+            yield line
+
+    import_pathways(lines(), batch_size=2)
+
+    # The first batch was in the database before its successors were read
+    assert seen == [0, 0, 2, 2, 4, 4]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_interrupted_import_resumes_after_last_committed_batch():
+    real_bulk_create = ConversationalPathway.objects.bulk_create
+    calls = []
+
+    def fail_on_third_batch(pathways):
+        calls.append(len(pathways))
+        if len(calls) == 3:
+            raise ConnectionError('connection lost')
+        return real_bulk_create(pathways)
+
+    with patch.object(ConversationalPathway.objects, 'bulk_create', side_effect=fail_on_third_batch):
+        with pytest.raises(ConnectionError):
+            import_pathways(ndjson_lines(10), key='migration', batch_size=3)
+
+    assert ConversationalPathway.objects.count() == 6
+    assert PathwayImport.objects.get(key='migration').committed_line == 6
+
+    summary = import_pathways(ndjson_lines(10), key='migration', batch_size=3)
+
+    assert summary['resumed_after_line'] == 6
+    assert summary['created'] == 4
+    assert sorted(ConversationalPathway.objects.values_list('name', flat=True)) == \
+        sorted(f'Pathway {index}' for index in range(10))
+    assert import_pathways(ndjson_lines(10), key='migration')['created'] == 0
+
+
+@pytest.mark.django_db
+def test_import_can_queue_bland_sync(api_client):
+    body = b''.join(ndjson_lines(3))
+
+    response = api_client.post(reverse('conversationalpathway-import') + '?queue_sync=true', data=body,
+                               content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    assert BlandSyncEvent.objects.filter(operation=BlandSyncEvent.Operation.CREATE).count() == 3
+
+
+@pytest.mark.django_db
+def test_import_command_resumes_and_restarts(tmp_path, capsys):
+    path = tmp_path / 'pathways.ndjson'
+    path.write_bytes(b''.join(ndjson_lines(4, invalid={3})))
+
+    call_command('import_pathways', str(path), '--batch-size', '2')
+    call_command('import_pathways', str(path))
+    assert ConversationalPathway.objects.count() == 3
+
+    call_command('import_pathways', str(path), '--restart')
+    assert ConversationalPathway.objects.count() == 6
+    out, err = capsys.readouterr()
+    assert 'line 4:' in err
+    assert 'Imported 0 pathway(s), rejected 0, up to line 4, resumed after line 4.' in out
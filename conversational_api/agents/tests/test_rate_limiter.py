@@ -0,0 +1,85 @@
+import pytest
+import requests
+from unittest.mock import call, patch
+from agents.bland_client import BlandClient
+from agents.fake_bland import FakeBlandServer
+from agents.rate_limiter import RateLimiter, get_rate_limiters
+
+
+def fixed_clock():
+    return 1000.0
+
+
+def test_processes_share_the_bucket():
+    # Two limiters with the same name stand in for two worker processes
+    first = RateLimiter('shared', rate=2, per=10, clock=fixed_clock)
+    second = RateLimiter('shared', rate=2, per=10, clock=fixed_clock)
+
+    assert first.reserve() == 0
+    assert first.wait_time() == 5
+    assert second.reserve() == 5  # Tokens are spread evenly over the window
+    assert first.reserve() == 10  # The window is full, so the token comes from the next one
+    assert second.wait_time() == 15
+
+
+def test_disabled_limiter_never_waits():
+    limiter = RateLimiter('off', rate=0, clock=fixed_clock)
+    assert [limiter.reserve() for _ in range(100)] == [0.0] * 100
+
+
+def test_limits_are_configurable_per_api_key(settings):
+    settings.BLAND_AI_READ_RATE_LIMIT = 10
+    settings.BLAND_AI_WRITE_RATE_LIMIT = 2
+    settings.BLAND_AI_RATE_LIMITS = {'key-b': {'write': 7}}
+
+    limiters_a = get_rate_limiters('key-a')
+    limiters_b = get_rate_limiters('key-b')
+
+    assert (limiters_a['read'].rate, limiters_a['write'].rate) == (10, 2)
+    assert (limiters_b['read'].rate, limiters_b['write'].rate) == (10, 7)
+    assert limiters_a['write'].name != limiters_b['write'].name
+    assert 'key-a' not in limiters_a['write'].name
+
+
+def test_client_waits_for_tokens_within_budget(settings):
+    settings.BLAND_AI_READ_RATE_LIMIT = 2
+    settings.BLAND_AI_RATE_LIMIT_PERIOD = 10
+    settings.BLAND_AI_REQUEST_BUDGET = 8
+
+    with FakeBlandServer() as fake_bland:
+        settings.BLAND_AI_BASE_URL = fake_bland.url
+        fake_bland.state.pathways['p1'] = {'pathway_id': 'p1'}
+        client = BlandClient()
+        client.rate_limiters['read'].clock = fixed_clock
+
+        with patch('agents.bland_client.time.sleep') as mock_sleep:
+            client.get_conversational_pathway('p1')
+            client.get_conversational_pathway('p1')
+            # The fake server's own latency sleeps go through the same patched function
+            assert call(5.0) in mock_sleep.call_args_list
+            assert client.rate_limit_stats()['read'] == {'rate': 2, 'per': 10, 'wait': 10.0}
+
+            # The next token is 10s away, past the 8s budget, so the call never reaches Bland AI
+            with pytest.raises(requests.exceptions.Timeout):
+                client.get_conversational_pathway('p1')
+
+        assert fake_bland.state.stats()['requests'] == {'get_pathway': 2}
+        assert client.rate_limit_stats()['write']['wait'] == 0
+
+
+def test_upstream_429_honours_retry_after(settings):
+    settings.BLAND_AI_MAX_RETRIES = 1
+    settings.BLAND_AI_BACKOFF_FACTOR = 0
+
+    with FakeBlandServer(rate_limit=1, rate_window=2) as fake_bland:
+        settings.BLAND_AI_BASE_URL = fake_bland.url
+        fake_bland.state.pathways['p1'] = {'pathway_id': 'p1'}
+        client = BlandClient()
+        client.get_conversational_pathway('p1')
+
+        with patch('agents.bland_client.time.sleep') as mock_sleep:
+            with pytest.raises(requests.exceptions.HTTPError):
+                client.get_conversational_pathway('p1')
+
+        assert max(c.args[0] for c in mock_sleep.call_args_list) >= 1
+        assert fake_bland.state.stats()['responses'] == {200: 1, 429: 2}
@@ -0,0 +1,120 @@
+import pytest
+from unittest.mock import Mock, patch
+from agents.bland_client import BlandClient
+from agents.models import BlandSyncEvent, ConversationalPathway, SyncStatus
+from agents.outbox import enqueue_sync
+from agents.reconcile import reconcile_pathways
+
+
+def remote(bland_id, name, nodes=None):
+    return {'id': bland_id, 'name': name, 'description': 'desc', 'nodes': nodes or {}, 'edges': {}}
+
+
+@pytest.mark.django_db
+def test_reconcile_applies_only_changes(django_assert_max_num_queries):
+    synced = {'description': 'desc', 'sync_status': SyncStatus.SYNCED}
+    ConversationalPathway.objects.create(bland_ai_pathway_id='same', name='Same', nodes={}, edges={}, **synced)
+    changed = ConversationalPathway.objects.create(bland_ai_pathway_id='changed', name='Old', **synced)
+    ConversationalPathway.objects.create(bland_ai_pathway_id='gone', name='Gone', **synced)
+    client = Mock()
+    client.get_all_conversational_pathways.return_value = [
+        remote('same', 'Same'),
+        remote('changed', 'New', nodes={'1': {'name': 'Start'}}),
+        remote('new', 'Brand New'),
+    ]
+
+    with django_assert_max_num_queries(9):
+        stats = reconcile_pathways(client=client, prune=True)
+
+    assert stats == {'remote': 3, 'created': 1, 'updated': 1, 'unchanged': 1, 'skipped': 0, 'conflicts': 0, 'deleted': 1}
+    changed.refresh_from_db()
+    assert changed.name == 'New'
+    assert changed.nodes == {'1': {'name': 'Start'}}
+    assert changed.version == 1
+    assert changed.sync_status == SyncStatus.SYNCED
+    assert ConversationalPathway.objects.get(bland_ai_pathway_id='new').name == 'Brand New'
+    assert not ConversationalPathway.objects.filter(bland_ai_pathway_id='gone').exists()
+
+
+@pytest.mark.django_db
+def test_reconcile_is_a_no_op_when_nothing_changed():
+    client = Mock()
+    client.get_all_conversational_pathways.return_value = [remote('p1', 'One'), remote('p2', 'Two')]
+    reconcile_pathways(client=client)
+
+    stats = reconcile_pathways(client=client)
+
+    assert stats['created'] == 0
+    assert stats['updated'] == 0
+    assert stats['unchanged'] == 2
+
+
+@pytest.mark.django_db
+def test_reverting_a_pulled_change_is_pushed():
+    pathway = ConversationalPathway.objects.create(bland_ai_pathway_id='p1', name='Old', description='desc',
+                                                   sync_status=SyncStatus.SYNCED)
+    client = BlandClient()
+    form = {'name': 'Old', 'description': 'desc', 'nodes': {}, 'edges': {}}
+    response = Mock(status_code=200, json=Mock(return_value={'status': 'success'}))
+    with patch.object(client, '_request', return_value=response) as mock_request:
+        client.update_conversational_pathway(pathway, form)
+
+    remote_client = Mock()
+    remote_client.get_all_conversational_pathways.return_value = [remote('p1', 'New')]
+    reconcile_pathways(client=remote_client)
+
+    pathway.refresh_from_db()
+    pathway.name = 'Old'
+    with patch.object(client, '_request', return_value=response) as mock_request:
+        client.update_conversational_pathway(pathway, form)
+
+    assert mock_request.call_args.kwargs['json'] == {'name': 'Old'}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('event_status', [BlandSyncEvent.Status.PENDING, BlandSyncEvent.Status.FAILED])
+def test_pending_local_edit_survives_reconcile(event_status):
+    pathway = ConversationalPathway.objects.create(bland_ai_pathway_id='p1', name='Local edit', description='desc',
+                                                   sync_status=SyncStatus.SYNCED)
+    enqueue_sync(pathway, BlandSyncEvent.Operation.UPDATE, {'name': 'Local edit'})
+    BlandSyncEvent.objects.update(status=event_status)
+    ConversationalPathway.objects.update(sync_status=SyncStatus.SYNCED)  # Only the outbox knows
+    client = Mock()
+    client.get_all_conversational_pathways.return_value = [remote('p1', 'Remote')]
+    stats = reconcile_pathways(client=client)
+    client.get_all_conversational_pathways.return_value = []
+    pruned = reconcile_pathways(client=client, prune=True)
+
+    assert stats['skipped'] == 1 and stats['updated'] == 0
+    assert pruned['deleted'] == 0
+    pathway.refresh_from_db()
+    assert pathway.name == 'Local edit'
+
+
+@pytest.mark.django_db
+def test_unsynced_row_is_skipped():
+    ConversationalPathway.objects.create(bland_ai_pathway_id='p1', name='Local', sync_status=SyncStatus.PENDING)
+    client = Mock()
+    client.get_all_conversational_pathways.return_value = [remote('p1', 'Remote')]
+
+    assert reconcile_pathways(client=client)['skipped'] == 1
+    assert ConversationalPathway.objects.get().name == 'Local'
+
+
+@pytest.mark.django_db
+def test_local_save_during_reconcile_is_a_conflict_not_overwritten():
+    pathway = ConversationalPathway.objects.create(bland_ai_pathway_id='p1', name='Old', sync_status=SyncStatus.SYNCED)
+    client = Mock()
+    client.get_all_conversational_pathways.return_value = [remote('p1', 'Remote')]
+
+    def save_after_versions_are_read():
+        pathway.name = 'Saved meanwhile'
+        pathway.save()
+        return []
+
+    with patch('agents.reconcile.unsynced_pathway_ids', side_effect=save_after_versions_are_read):
+        stats = reconcile_pathways(client=client)
+
+    assert stats['conflicts'] == 1 and stats['updated'] == 0
+    pathway.refresh_from_db()
+    assert (pathway.name, pathway.version) == ('Saved meanwhile', 1)
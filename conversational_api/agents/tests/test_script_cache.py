@@ -0,0 +1,87 @@
+from unittest.mock import Mock, patch
+from agents.script_cache import ScriptCache, get_script_cache
+from agents.utils import html_to_script, scripts_for
+
+
+def converter():
+    return Mock(side_effect=lambda html_input: html_input.upper())
+
+
+def test_repeated_prompt_is_converted_once():
+    script_cache = ScriptCache(max_entries=10)
+    convert = converter()
+
+    assert script_cache.get_or_convert('<p>hi</p>', convert) == '<P>HI</P>'
+    assert script_cache.get_or_convert('<p>hi</p>', convert) == '<P>HI</P>'
+
+    convert.assert_called_once_with('<p>hi</p>')
+    assert script_cache.stats() == {
+        'hits': 1, 'shared_hits': 0, 'misses': 1, 'skipped': 0, 'entries': 1, 'hit_rate': 0.5,
+    }
+
+
+def test_least_recently_used_prompt_is_evicted():
+    script_cache = ScriptCache(max_entries=2)
+    convert = converter()
+
+    script_cache.get_or_convert('a', convert)
+    script_cache.get_or_convert('b', convert)
+    script_cache.get_or_convert('a', convert)  # 'b' is now the least recently used
+    script_cache.get_or_convert('c', convert)
+    script_cache.get_or_convert('a', convert)
+    script_cache.get_or_convert('b', convert)
+
+    assert [call.args[0] for call in convert.call_args_list] == ['a', 'b', 'c', 'b']
+    assert script_cache.stats()['entries'] == 2
+
+
+def test_large_prompts_are_not_cached():
+    script_cache = ScriptCache(max_entries=10, max_prompt_length=5)
+    convert = converter()
+
+    script_cache.get_or_convert('too long', convert)
+    script_cache.get_or_convert('too long', convert)
+
+    assert convert.call_count == 2
+    assert script_cache.stats()['skipped'] == 2
+    assert script_cache.stats()['entries'] == 0
+
+
+def test_shared_tier_serves_other_processes():
+    convert = converter()
+    ScriptCache(max_entries=10, shared_cache_alias='default').get_or_convert('<p>hi</p>', convert)
+
+    # A second process starts with an empty in-process tier
+    other = ScriptCache(max_entries=10, shared_cache_alias='default')
+    assert other.get_or_convert('<p>hi</p>', convert) == '<P>HI</P>'
+
+    convert.assert_called_once()
+    assert other.stats()['shared_hits'] == 1
+
+
+def test_shared_tier_failure_falls_back_to_converting():
+    script_cache = ScriptCache(max_entries=0, shared_cache_alias='default')
+
+    with patch.object(script_cache.shared_cache, 'get', side_effect=ConnectionError('down')), \
+            patch.object(script_cache.shared_cache, 'set', side_effect=ConnectionError('down')):
+        assert script_cache.get_or_convert('<p>hi</p>', converter()) == '<P>HI</P>'
+
+    assert script_cache.stats()['misses'] == 1
+
+
+def test_html_to_script_is_memoized():
+    with patch('agents.script_converter.html_to_script', return_value='Hello') as mock_convert:
+        assert html_to_script('<h1>Hello</h1>') == 'Hello'
+        assert html_to_script('<h1>Hello</h1>') == 'Hello'
+
+    mock_convert.assert_called_once()
+    assert get_script_cache().stats()['hits'] == 1
+
+
+def test_backfill_conversion_bypasses_cache():
+    html_to_script('<h1>Hello</h1>')
+
+    with patch('agents.script_converter.html_to_script', return_value='Hello') as mock_convert:
+        assert scripts_for([(1, '<h1>Hello</h1>')]) == [(1, 'Hello')]
+
+    mock_convert.assert_called_once()
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+from django.core.management import call_command
+from unittest.mock import patch
+
+from agents import script_converter
+from agents.utils import bleach_html_to_script, html_to_script
+
+# Prompts where the single-pass converter has to reproduce a quirk of bleach or BeautifulSoup
+CORPUS = [
+    '',
+    '   ',
+    'plain text',
+    '<h1>Hello</h1>',
+    '<p>Hello Default</p>',
+    '<h1>Title</h1><p>First <b>bold</b> and <i>italic</i>.</p><ul><li>One</li><li>Two</li></ul>',
+    '<ol><li>One<li>Two<li>Three</ol>',
+    '<p>Unclosed paragraph<p>Another<h2>Heading</h2>after',
+    '<h1>One<h2>Two</h1>Three',
+    '<ul><li>Outer<ul><li>Inner</li></ul>tail</li></ul>',
+    '<b>bold <i>both</b> italic</i> plain',
+    '<p><b>misnested</p> still bold</b>',
+    '<b><b><b><b>Noah</b></b></b></b> ark',
+    '<strong>a<p>b</strong>c</p>',
+    '<div>div text</div><span>span text</span><br>after br<hr>',
+    'first<div>second</div>',
+    '<a href="https://example.com/?a=1&b=2">link</a> text',
+    '<script>alert("x")</script><style>p { color: red }</style>',
+    '<table><tr><td>cell</td></tr></table>',
+    '&amp; &lt; &gt; &quot; &nbsp; &copy; &copy &notit; &bogus; & alone',
+    '&#65; &#x42; &#150; &#0; &#x110000; &#1l; &#;',
+    'AT&T and R&D',
+    '<!-- comment --> visible <!-->x<!--->y<!-- --!> z',
+    '<!DOCTYPE html><?xml version="1.0"?><![CDATA[data]]>text',
+    '</ p>closed</1 x>kept',
+    '<p>cut off <b',
+    '<p>cut off <b class="x',
+    'a<b c=d',
+    '1 < 2 and 3 > 2',
+    '<P>Upper</P><LI>case',
+    '<p class="intro" id=x>attrs</p>',
+    'line one\r\nline two\rline three',
+    '\x00nul \x01control\x0b',
+    '-&amp\x0c',
+    '\x0cform\x0cfeed\x0c<p>\x0cnode\x0c</p>a\x0c<!-- c -->\x0cb<!doctype x>\x0cc',
+    '<p>   </p><p>\n\n</p><p>text</p>',
+    '<ul>\n  <li>Indented</li>\n  <li>List</li>\n</ul>',
+    '<p>café – über \U0001F600</p>',
+]
+
+# Fragments for the randomized corpus
+FRAGMENTS = [
+    '<p>', '</p>', '<b>', '</b>', '<i>', '</i>', '<u>', '</u>', '<strong>', '</strong>', '<em>', '</em>',
+    '<h1>', '</h1>', '<h2>', '</h3>', '<ul>', '</ul>', '<ol>', '</ol>', '<li>', '</li>', '<P>', '<B class="x">',
+    '<div>', '</div>', '<span>', '</span>', '<br>', '<br/>', '<hr/>', '<table>', '<td>', '<a href="x?a=1&b=2">',
+    '</a>', '<script>', '</script>', '<!-- c -->', '<!--', '-->', '<', '>', '</', '/', '=', '"', "'",
+    'hello', ' world ', '\n', '  ', '\t', '\r\n', '\x00', '\x01', '\x0c', 'é', ' ',
+    '&amp;', '&lt;', '&nbsp;', '&copy', '&#150;', '&#x41;', '&#1l;', '&bogus;', '&', '#', ';',
+]
+
+
+@pytest.mark.parametrize('html_input', CORPUS)
+def test_html_parser_converter_matches_bleach(html_input):
+    assert script_converter.html_to_script(html_input) == bleach_html_to_script(html_input)
+
+
+def test_html_parser_converter_matches_bleach_on_random_markup():
+    rng = random.Random(20241016)
+    for _ in range(2000):
+        html_input = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 30)))
+        assert script_converter.html_to_script(html_input) == bleach_html_to_script(html_input), repr(html_input)
+
+
+@pytest.mark.parametrize('converter, used, unused', [
+    ('html_parser', 'agents.script_converter.html_to_script', 'agents.utils.bleach_html_to_script'),
+    ('bleach', 'agents.utils.bleach_html_to_script', 'agents.script_converter.html_to_script'),
+])
+def test_html_to_script_uses_configured_converter(settings, converter, used, unused):
+    settings.HTML_TO_SCRIPT_CONVERTER = converter
+
+    with patch(used, return_value='Hello') as used_mock, patch(unused) as unused_mock:
+        assert html_to_script('<h1>Hello</h1>') == 'Hello'
+
+    used_mock.assert_called_once_with('<h1>Hello</h1>')
+    unused_mock.assert_not_called()
+
+
+def test_benchmark_command_reports_each_size(capsys):
+    call_command('benchmark_html_to_script', '--sizes', '1,3', '--number', '1')
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].startswith('1 section(s)')
+    assert lines[2].startswith('3 section(s)')
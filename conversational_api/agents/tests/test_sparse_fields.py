@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from agents.models import Agent, ConversationalPathway
+
+
+@pytest.fixture
+def pathway():
+    return ConversationalPathway.objects.create(
+        name='Graph', description='d', nodes={'1': {'type': 'Default'}}, edges={'1': {'target': '2'}},
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('values_list', [True, False])
+def test_list_fields_narrow_response_and_columns(api_client, settings, pathway, values_list):
+    settings.VALUES_LIST_SERIALIZATION = values_list
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse('conversationalpathway-list'), {'fields': 'updated_at, name,id'})
+
+    assert response.status_code == 200
+    assert list(response.data['results'][0]) == ['id', 'name', 'updated_at']  # Serializer order
+    select = next(query['sql'] for query in queries.captured_queries if 'COUNT' not in query['sql'])
+    assert '"nodes"' not in select and '"edges"' not in select
+
+
+@pytest.mark.django_db
+def test_retrieve_exclude_defers_columns(api_client, pathway):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(
+            reverse('conversationalpathway-detail', args=[pathway.id]), {'exclude': 'nodes,edges'},
+        )
+
+    assert response.status_code == 200
+    assert 'nodes' not in response.data and 'edges' not in response.data
+    assert response.data['name'] == 'Graph'
+    assert all('"nodes"' not in query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_fields_and_exclude_combine(api_client):
+    Agent.objects.create(name='Agent', prompt='<p>Hi</p>', tools=[{'tool_name': 'crm', 'description': 'd'}])
+
+    response = api_client.get(reverse('agent-list'), {'fields': 'id,name,tools', 'exclude': 'tools'})
+
+    assert list(response.data['results'][0]) == ['id', 'name']
+
+
+@pytest.mark.django_db
+def test_unknown_field_is_rejected(api_client):
+    response = api_client.get(reverse('agent-list'), {'fields': 'name,password'})
+
+    assert response.status_code == 400
+    assert 'password' in response.data['fields'][0]
+
+
+@pytest.mark.django_db
+def test_writes_ignore_sparse_fields(api_client, sample_pathway_data):
+    with patch('agents.views.BlandClient.create_conversational_pathway', return_value='pathway_123'):
+        response = api_client.post(
+            reverse('conversationalpathway-list') + '?fields=id', sample_pathway_data, format='json',
+        )
+
+    assert response.status_code == 201
+    assert 'name' in response.data
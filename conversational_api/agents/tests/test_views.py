@@ -3,7 +3,9 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest.mock import patch
-from agents.models import Agent, ConversationalPathway
+from agents.models import Agent, ConversationalPathway, PathwayNode
+from agents.utils import pathway_content_hash
+from rest_framework.exceptions import APIException
 
 @pytest.mark.django_db
 def test_create_agent(api_client, sample_agent_data):
@@ -170,4 +172,79 @@ def test_get_single_conversational_pathway(api_client, sample_pathway_data):
     response = api_client.get(url, format='json')
     
     assert response.status_code == status.HTTP_200_OK
-    assert response.data['name'] == pathway.name
\ No newline at end of file
+    assert response.data['name'] == pathway.name
+
+# Tests for the bulk create endpoints
+
+@pytest.mark.django_db
+def test_bulk_create_agents(api_client, sample_agent_data):
+    url = reverse('agent-bulk')
+    items = [dict(sample_agent_data, name=f'Bulk Agent {i}') for i in range(20)]
+
+    with patch('agents.views.BlandClient.create_agent') as mock_create_agent:
+        mock_create_agent.side_effect = lambda agent, data: f'bland_{agent.name}'
+
+        response = api_client.post(url, items, format='json')
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['created'] == 20
+    assert mock_create_agent.call_count == 20
+    assert [result['index'] for result in response.data['results']] == list(range(20))
+    assert Agent.objects.get(name='Bulk Agent 7').bland_ai_id == 'bland_Bulk Agent 7'
+    assert Agent.objects.get(name='Bulk Agent 7').script == 'Hello'
+
+
+@pytest.mark.django_db
+def test_bulk_create_agents_reports_per_item_failures(api_client, sample_agent_data):
+    url = reverse('agent-bulk')
+    items = [dict(sample_agent_data, name=f'Bulk Agent {i}') for i in range(3)]
+
+    def create_agent(agent, data):
+        if agent.name == 'Bulk Agent 1':
+            raise APIException("Failed to create agent in Bland AI.")
+        return f'bland_{agent.name}'
+
+    with patch('agents.views.BlandClient.create_agent', side_effect=create_agent):
+        response = api_client.post(url, items, format='json')
+
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    assert response.data['created'] == 2
+    assert response.data['failed'] == 1
+    assert response.data['results'][1] == {'index': 1, 'status': 'failed', 'error': 'Failed to create agent in Bland AI.'}
+    assert sorted(Agent.objects.values_list('name', flat=True)) == ['Bulk Agent 0', 'Bulk Agent 2']
+
+
+@pytest.mark.django_db
+def test_bulk_create_agents_validates_whole_batch(api_client, sample_agent_data):
+    url = reverse('agent-bulk')
+    items = [sample_agent_data, dict(sample_agent_data, prompt='   ')]
+
+    with patch('agents.views.BlandClient.create_agent') as mock_create_agent:
+        response = api_client.post(url, items, format='json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'prompt' in response.data[1]
+    mock_create_agent.assert_not_called()
+    assert Agent.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_create_pathways(api_client, sample_pathway_data, settings):
+    settings.PATHWAY_GRAPH_TABLES = True
+    url = reverse('conversationalpathway-bulk')
+    items = [
+        dict(sample_pathway_data, name=f'Bulk Pathway {i}', nodes={'start': {'type': 'Default'}})
+        for i in range(5)
+    ]
+
+    with patch('agents.views.BlandClient.create_conversational_pathway') as mock_create_pathway:
+        mock_create_pathway.side_effect = lambda pathway, data: f'bland_{pathway.name}'
+
+        response = api_client.post(url, items, format='json')
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['created'] == 5
+    assert ConversationalPathway.objects.filter(bland_ai_pathway_id__startswith='bland_').count() == 5
+    for pathway in ConversationalPathway.objects.all():
+        assert pathway.content_hash == pathway_content_hash(pathway.name, pathway.description, pathway.nodes, pathway.edges)
+    assert PathwayNode.objects.filter(node_id='start').count() == 5
@@ -1,10 +1,19 @@
 # agents/urls.py
 
+from django.urls import path
 from rest_framework import routers
-from .views import AgentViewSet, ConversationalPathwayViewSet
+from .views import AgentViewSet, ConversationalPathwayViewSet, DatabaseStatsView
+from .async_views import AsyncAgentView, AsyncConversationalPathwayView
 
 router = routers.DefaultRouter()
 router.register(r'agents', AgentViewSet)
 router.register(r'pathways', ConversationalPathwayViewSet)
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = router.urls + [
+    # Async write paths for the ASGI deployment
+    path('async/agents/', AsyncAgentView.as_view(), name='async-agent-list'),
+    path('async/agents/<int:pk>/', AsyncAgentView.as_view(), name='async-agent-detail'),
+    path('async/pathways/', AsyncConversationalPathwayView.as_view(), name='async-conversationalpathway-list'),
+    path('async/pathways/<int:pk>/', AsyncConversationalPathwayView.as_view(), name='async-conversationalpathway-detail'),
+    path('stats/database/', DatabaseStatsView.as_view(), name='database-stats'),
+]
\ No newline at end of file
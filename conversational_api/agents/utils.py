@@ -1,18 +1,62 @@
 from bs4 import BeautifulSoup
+import hashlib
+import json
 import logging
 import bleach
+from django.conf import settings
+
+from . import script_converter
+from .script_cache import get_script_cache
 
 logger = logging.getLogger(__name__)
 
 def html_to_script(html_input):
     """
     Sanitizes and converts HTML input to plain text script.
+    Agents often share prompts, so scripts are memoized by prompt hash (see agents.script_cache).
+    """
+    return get_script_cache().get_or_convert(html_input, convert_html_to_script)
+
+
+def convert_html_to_script(html_input):
+    """
+    Converts without the cache.
+    HTML_TO_SCRIPT_CONVERTER picks the single-pass 'html_parser' converter or the original 'bleach' pipeline.
+    """
+    if settings.HTML_TO_SCRIPT_CONVERTER == 'bleach':
+        return bleach_html_to_script(html_input)
+    return script_converter.html_to_script(html_input)
+
+
+def bleach_html_to_script(html_input):
+    """
+    Sanitizes the HTML with bleach, then extracts its text with BeautifulSoup.
     """
     # Sanitize the HTML to allow only certain tags
-    allowed_tags = ['p', 'b', 'i', 'u', 'strong', 'em', 'h1', 'h2', 'h3', 'ul', 'ol', 'li']
+    allowed_tags = sorted(script_converter.ALLOWED_TAGS)
     cleaned_html = bleach.clean(html_input, tags=allowed_tags, strip=True)
     
     # Convert to plain text
     soup = BeautifulSoup(cleaned_html, 'html.parser')
     text = soup.get_text(separator='\n')  # Preserves line breaks
-    return text.strip()
\ No newline at end of file
+    return text.strip()
+
+
+def scripts_for(rows):
+    """
+    Converts `(id, prompt)` pairs to `(id, script)` pairs. Module-level so process pool workers can run it.
+    Bypasses the script cache: backfills run because the rules changed, and must not reuse old scripts.
+    """
+    return [(pk, convert_html_to_script(prompt or '')) for pk, prompt in rows]
+
+
+def pathway_content_hash(name, description, nodes, edges):
+    """
+    Returns a stable SHA-256 of the pathway fields shared with Bland AI.
+    Used to tell which local pathways differ from their remote copy without comparing the JSON itself.
+    """
+    content = json.dumps(
+        [name, description or '', nodes or {}, edges or {}],
+        sort_keys=True, separators=(',', ':'), default=str,
+    )
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
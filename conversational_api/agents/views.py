@@ -1,37 +1,376 @@
 #agents/views.py
 from requests import Response
 
-from .utils import html_to_script
-from .serializers import AgentSerializer, ConversationalPathwaySerializer
+from .utils import html_to_script, pathway_content_hash
+from .serializers import AgentSerializer, ConversationalPathwaySerializer, get_row_mapper
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny
-from .models import Agent, ConversationalPathway
-from .bland_client import BlandClient
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.views import APIView
+from .models import Agent, BlandSyncEvent, ConversationalPathway, SyncStatus, VersionConflict
+from .bland_client import BlandClient, get_bland_client
+from .outbox import enqueue_bulk_create, enqueue_sync, sync_via_outbox
+from .circuit_breaker import BlandServiceUnavailable
+from .db_connections import database_pool_stats
+from .concurrency import ETAG_HEADER, PreconditionFailed, UpdateConflict, check_version, etag, expected_versions
+from .filters import AgentFilterBackend
+from .idempotency import run_idempotent
+from .pathway_graph import get_node, get_node_edges, sync_pathway_graphs
+from .pathway_import import import_pathways
+from .renderers import FastJSONRenderer, NDJSONRenderer
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
 from django.db import transaction
-from rest_framework.exceptions import APIException
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.generics import get_object_or_404
 
 logger = logging.getLogger(__name__)
 
-class AgentViewSet(viewsets.ModelViewSet):
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
+
+class IdempotencyMixin:
+    """
+    Honours the `Idempotency-Key` header on create requests, so a retried POST replays the first
+    response instead of creating a second object locally and in Bland AI.
+    """
+    def create(self, request, *args, **kwargs):
+        create = super().create
+        return run_idempotent(request, lambda: create(request, *args, **kwargs))
+
+
+class OptimisticConcurrencyMixin:
+    """
+    Optimistic concurrency on updates, on top of the conditional UPDATE of `VersionedModel.save()`.
+
+    Single-object responses carry the object's version as an `ETag`. An update sent with
+    `If-Match: "<version>"` (or a `version` field in the body) applies only to that version and answers
+    412 Precondition Failed when the object has moved on, whether before it was read or between the read
+    and the write. An update without one applies to the latest version: when another write lands in
+    between, the object is read again and the update re-applied, up to VERSION_CONFLICT_RETRIES times.
+    """
+    versioned_actions = ('retrieve', 'update', 'partial_update')
+
+    def update(self, request, *args, **kwargs):
+        self.expected_versions = expected_versions(request.headers, request.data)
+        retries = 0 if self.expected_versions is not None else getattr(settings, 'VERSION_CONFLICT_RETRIES', 3)
+        for attempt in range(retries + 1):
+            try:
+                return super().update(request, *args, **kwargs)
+            except VersionConflict as e:
+                if self.expected_versions is not None:
+                    raise PreconditionFailed()
+                logger.info(f"{e} Retrying the update ({attempt + 1}/{retries}).")
+        raise UpdateConflict()
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.action in ('update', 'partial_update'):
+            check_version(instance, getattr(self, 'expected_versions', None))
+        self.versioned_object = instance
+        return instance
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        instance = getattr(self, 'versioned_object', None)
+        if instance is not None and self.action in self.versioned_actions and status.is_success(response.status_code):
+            response[ETAG_HEADER] = etag(instance.version)  # In-memory version is the one just written
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    Lets list and detail requests ask for a subset of the fields, with `?fields=id,name,updated_at`
+    and/or `?exclude=prompt,tools`. The serializer drops the other fields, and the queryset is narrowed
+    with `.only()`, so the columns they read (large JSON such as pathway nodes and edges) are never fetched.
+    """
+    sparse_actions = ('list', 'retrieve', 'export')
+
+    def get_sparse_fields(self):
+        """
+        Returns the requested field names in serializer order, or None when the whole object is wanted.
+        """
+        if getattr(self, 'action', None) not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        requested = self._parse_field_list(params.get('fields', ''))
+        excluded = self._parse_field_list(params.get('exclude', ''))
+        if not requested and not excluded:
+            return None
+
+        available = [field_name for field_name, _, _ in get_row_mapper(self.get_serializer_class()).converters]
+        unknown = (set(requested) | set(excluded)) - set(available)
+        if unknown:
+            raise ValidationError({'fields': [f"Unknown field(s): {', '.join(sorted(unknown))}."]})
+        return tuple(
+            field_name for field_name in available
+            if (not requested or field_name in requested) and field_name not in excluded
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            columns = get_row_mapper(self.get_serializer_class(), fields).columns
+            queryset = queryset.only(*columns, *self.get_pagination_columns())
+        return queryset
+
+    def get_pagination_columns(self):
+        """
+        Columns the paginator reads from each row, whether or not they are serialized (a cursor's ordering).
+        """
+        return [field.lstrip('-') for field in getattr(self.paginator, 'ordering', ())]
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    @staticmethod
+    def _parse_field_list(value):
+        return [field_name.strip() for field_name in value.split(',') if field_name.strip()]
+
+
+class ValuesListMixin(SparseFieldsMixin):
+    """
+    Serves list requests from `.values()` rows through a `ValuesRowMapper` instead of building a model
+    instance and running every serializer field per row. The response body is the same either way;
+    set VALUES_LIST_SERIALIZATION = False to go back to the serializer.
+    """
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, 'VALUES_LIST_SERIALIZATION', True):
+            return super().list(request, *args, **kwargs)
+
+        mapper = get_row_mapper(self.get_serializer_class(), self.get_sparse_fields())
+        columns = dict.fromkeys([*mapper.columns, *self.get_pagination_columns()])
+        queryset = self.filter_queryset(self.get_queryset()).values(*columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(mapper.map(page))
+        return Response(mapper.map(queryset))
+
+
+class ExportMixin(SparseFieldsMixin):
+    """
+    Adds `GET <resource>/export/`, which streams every object as NDJSON (one JSON object per line,
+    the same fields as the list endpoint, in primary key order).
+
+    Rows are read with `queryset.iterator()` in chunks of EXPORT_CHUNK_SIZE and each chunk is written out
+    before the next is fetched, so memory stays flat however many rows there are. Clients that accept
+    gzip get the stream compressed on the fly.
+    """
+    @action(detail=False, methods=['get'], url_path='export', url_name='export',
+            renderer_classes=[NDJSONRenderer, FastJSONRenderer])
+    def export(self, request, *args, **kwargs):
+        mapper = get_row_mapper(self.get_serializer_class(), self.get_sparse_fields())
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk').values(*mapper.columns)
+        chunks = self.export_chunks(queryset, mapper, getattr(settings, 'EXPORT_CHUNK_SIZE', 2000))
+
+        gzipped = ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = StreamingHttpResponse(
+            compress_sequence(chunks) if gzipped else chunks, content_type=NDJSONRenderer.media_type,
+        )
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        filename = self.get_queryset().model._meta.verbose_name_plural.replace(' ', '_')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.ndjson"'
+        return response
+
+    @staticmethod
+    def export_chunks(queryset, mapper, chunk_size):
+        renderer = NDJSONRenderer()
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                return
+            yield renderer.render(mapper.map(batch))
+
+
+class OutboxSyncMixin:
+    """
+    In outbox sync mode (BLAND_AI_SYNC_MODE = 'outbox') writes only queue their Bland AI call,
+    so they answer 202 Accepted and report the pending `sync_status`.
+    """
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        if sync_via_outbox():
+            response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        if sync_via_outbox():
+            response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        if not sync_via_outbox():
+            return super().destroy(request, *args, **kwargs)
+        instance = self.get_object()
+        instance_id = instance.pk
+        self.perform_destroy(instance)
+        return Response({'id': instance_id, 'sync_status': SyncStatus.PENDING}, status=status.HTTP_202_ACCEPTED)
+
+    def perform_create_deferred(self, serializer):
+        with transaction.atomic():
+            instance = serializer.save()
+            enqueue_sync(instance, BlandSyncEvent.Operation.CREATE, self.request.data)
+        logger.info(f"{instance._meta.verbose_name} '{instance.name}' created locally with ID {instance.id}, Bland AI sync queued.")
+
+    def perform_update_deferred(self, serializer):
+        with transaction.atomic():
+            instance = serializer.save()
+            enqueue_sync(instance, BlandSyncEvent.Operation.UPDATE, self.request.data)
+        logger.info(f"{instance._meta.verbose_name} '{instance.name}' updated locally with ID {instance.id}, Bland AI sync queued.")
+
+    def perform_destroy_deferred(self, instance):
+        with transaction.atomic():
+            enqueue_sync(instance, BlandSyncEvent.Operation.DELETE)
+            instance.delete()
+        logger.info(f'{instance._meta.verbose_name} "{instance.name}" deleted locally, Bland AI deletion queued.')
+
+
+class BulkCreateMixin:
+    """
+    Adds `POST <resource>/bulk/` for creating many objects in one request.
+
+    The whole batch is validated up front, inserted with a single `bulk_create`, and then pushed
+    to Bland AI concurrently through a bounded thread pool (or queued in outbox mode).
+    The response reports the outcome of every item; items Bland AI rejected are removed locally.
+
+    Viewsets set `remote_id_field`, the model field holding the Bland AI id, and `bland_create_method`,
+    the BlandClient method called with `(instance, item)` that creates the object and returns that id.
+    """
+    remote_id_field = None
+    bland_create_method = None
+
+    def build_instance(self, validated_data):
+        return self.get_queryset().model(**validated_data)
+
+    def bulk_created(self, instances):
+        """
+        Called with the inserted objects, inside the bulk insert's transaction.
+        """
+
+    @action(detail=False, methods=['post'], url_path='bulk', url_name='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        if not self.remote_id_field or not self.bland_create_method:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} must set remote_id_field and bland_create_method to use BulkCreateMixin."
+            )
+        return run_idempotent(request, lambda: self.perform_bulk_create(request))
+
+    def perform_bulk_create(self, request):
+        items = request.data
+        max_items = getattr(settings, 'BULK_CREATE_MAX_ITEMS', 1000)
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'detail': 'Expected a non-empty list of objects.'})
+        if len(items) > max_items:
+            raise ValidationError({'detail': f'A bulk request may contain at most {max_items} objects.'})
+
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        instances = [self.build_instance(dict(attrs)) for attrs in serializer.validated_data]
+        errors = []
+        for instance in instances:
+            try:
+                instance.full_clean()
+                errors.append({})
+            except DjangoValidationError as e:
+                errors.append(e.message_dict)
+        if any(errors):
+            raise ValidationError(errors)
+
+        model = type(instances[0])
+        with transaction.atomic():
+            instances = model.objects.bulk_create(instances)
+            self.bulk_created(instances)
+            if sync_via_outbox():
+                enqueue_bulk_create(instances, items)
+        logger.info(f"Bulk created {len(instances)} {model._meta.verbose_name_plural} locally.")
+
+        if sync_via_outbox():
+            results = [
+                {'index': index, 'status': 'queued', 'id': instance.id, 'sync_status': instance.sync_status}
+                for index, instance in enumerate(instances)
+            ]
+            return Response({'results': results, 'created': 0, 'queued': len(results), 'failed': 0},
+                            status=status.HTTP_202_ACCEPTED)
+
+        client = get_bland_client()
+
+        def push(index):
+            try:
+                return index, getattr(client, self.bland_create_method)(instances[index], items[index]), None
+            except Exception as e:
+                logger.error(f"Bulk push of item {index} to Bland AI failed: {e}", exc_info=True)
+                return index, None, e
+
+        workers = min(getattr(settings, 'BLAND_AI_BULK_CONCURRENCY', 16), len(instances))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(push, range(len(instances))))
+
+        synced, failed, results = [], [], []
+        for index, remote_id, error in outcomes:
+            instance = instances[index]
+            if error is None and remote_id:
+                setattr(instance, self.remote_id_field, remote_id)
+                instance.sync_status = SyncStatus.SYNCED
+                synced.append(instance)
+                results.append({'index': index, 'status': 'created', 'id': instance.id,
+                                self.remote_id_field: remote_id})
+            else:
+                failed.append(instance.id)
+                detail = error.detail if isinstance(error, APIException) else str(error or 'No id returned by Bland AI.')
+                results.append({'index': index, 'status': 'failed', 'error': detail})
+
+        with transaction.atomic():
+            model.objects.bulk_update(synced, [self.remote_id_field, 'sync_status', 'bland_sync_state'])
+            model.objects.filter(pk__in=failed).delete()
+        logger.info(f"Bulk create synchronized {len(synced)} and rolled back {len(failed)} {model._meta.verbose_name_plural}.")
+
+        return Response(
+            {'results': results, 'created': len(synced), 'queued': 0, 'failed': len(failed)},
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED,
+        )
+
+
+class AgentViewSet(ValuesListMixin, ExportMixin, SparseFieldsMixin, IdempotencyMixin, OptimisticConcurrencyMixin, BulkCreateMixin, OutboxSyncMixin, viewsets.ModelViewSet):
     """
     A viewset for viewing and editing Agent instances.
     """
-    queryset = Agent.objects.all()
+    queryset = Agent.objects.all().order_by('pk')
     serializer_class = AgentSerializer
     permission_classes = [AllowAny]
-            
-    def get_script(self, obj):
-        return html_to_script(obj.prompt)
-    
+    filter_backends = [AgentFilterBackend]
+    remote_id_field = 'bland_ai_id'
+    bland_create_method = 'create_agent'
+
+    def build_instance(self, validated_data):
+        validated_data['script'] = html_to_script(validated_data['prompt'])
+        return Agent(**validated_data)
+
     def perform_create(self, serializer):
         """
         Creates an Agent instance and synchronizes it with Bland AI.
         Ensures that `bland_ai_id` is always set.
         """
-        client = BlandClient()
+        if sync_via_outbox():
+            return self.perform_create_deferred(serializer)
+
+        client = get_bland_client()
         try:
             with transaction.atomic():
                 # Save the agent locally without `bland_ai_id`
@@ -43,6 +382,7 @@ class AgentViewSet(viewsets.ModelViewSet):
     
                 # Update the agent with `bland_ai_id`
                 agent.bland_ai_id = bland_ai_id
+                agent.sync_status = SyncStatus.SYNCED
                 agent.save()
                 logger.info(f"Agent '{agent.name}' synchronized with Bland AI, bland_ai_id: {bland_ai_id}.")
                 
@@ -55,7 +395,10 @@ class AgentViewSet(viewsets.ModelViewSet):
         """
         Updates an Agent instance and synchronizes the changes with Bland AI.
         """
-        client = BlandClient()
+        if sync_via_outbox():
+            return self.perform_update_deferred(serializer)
+
+        client = get_bland_client()
         try:
             with transaction.atomic():
                 agent = serializer.save()
@@ -70,6 +413,11 @@ class AgentViewSet(viewsets.ModelViewSet):
                 client.update_agent(agent, self.request.data)
                 logger.info(f"Agent '{agent.name}' synchronized with Bland AI.")
 
+        except VersionConflict:
+            raise  # Nothing was written or sent; OptimisticConcurrencyMixin retries or answers 412
+        except BlandServiceUnavailable:
+            logger.error("Bland AI circuit breaker is open. Agent update rolled back.")
+            raise
         except Exception as e:
             logger.error(f"Error during agent update or synchronization: {e}", exc_info=True)
             raise APIException("Failed to update agent and synchronize with Bland AI.")
@@ -78,7 +426,10 @@ class AgentViewSet(viewsets.ModelViewSet):
         """
         Deletes an Agent instance locally and from Bland AI.
         """
-        client = BlandClient()
+        if sync_via_outbox():
+            return self.perform_destroy_deferred(instance)
+
+        client = get_bland_client()
 
         try:
             with transaction.atomic():
@@ -100,48 +451,67 @@ class AgentViewSet(viewsets.ModelViewSet):
             raise APIException("Failed to delete agent from Bland AI and locally.")
    
 
-class ConversationalPathwayViewSet(viewsets.ModelViewSet):
+class ConversationalPathwayViewSet(ValuesListMixin, ExportMixin, SparseFieldsMixin, IdempotencyMixin, OptimisticConcurrencyMixin, BulkCreateMixin, OutboxSyncMixin, viewsets.ModelViewSet):
     """
     A viewset for viewing and editing ConversationalPathway instances.
     """
     queryset = ConversationalPathway.objects.all().order_by('created_at')
     serializer_class = ConversationalPathwaySerializer
     permission_classes = [AllowAny]
+    remote_id_field = 'bland_ai_pathway_id'
+    bland_create_method = 'create_conversational_pathway'
 
-    # def list(self, request, *args, **kwargs):
-    #     """
-    #     Override the list method to fetch data from Bland AI and synchronize with the local database.
-    #     """
-    #     client = BlandClient()
+    def build_instance(self, validated_data):
+        # bulk_create skips save(), which fills the hash reconciliation compares against, and the graph tables
+        pathway = ConversationalPathway(**validated_data)
+        pathway.content_hash = pathway_content_hash(pathway.name, pathway.description, pathway.nodes, pathway.edges)
+        return pathway
 
-    #     try:
-    #         # Fetch the pathways from Bland AI
-    #         bland_ai_pathways = client.get_all_conversational_pathways()
-
-    #         # Sync Bland AI pathways with the local database
-    #         for pathway_data in bland_ai_pathways:
-    #             # Sync fields from Bland AI to the local database
-    #             pathway, created = ConversationalPathway.objects.update_or_create(
-    #                 bland_ai_pathway_id=pathway_data['id'],
-    #                 defaults={
-    #                     'name': pathway_data.get('name', ''),
-    #                     'description': pathway_data.get('description', ''),
-    #                     'nodes': pathway_data.get('nodes', {}),
-    #                     'edges': pathway_data.get('edges', {}),
-    #                 }
-    #             )
-
-    #         # After synchronization, return the local pathways
-    #         queryset = self.get_queryset()
-    #         serializer = self.get_serializer(queryset, many=True)
-    #         return Response(serializer.data)
+    def bulk_created(self, pathways):
+        sync_pathway_graphs(pathways)
 
-    #     except Exception as e:
-    #         logger.error(f"Error retrieving pathways from Bland AI: {e}")
-    #         return Response(
-    #             {"detail": "Error retrieving pathways from Bland AI."},
-    #             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-    #         )
+    @action(detail=True, methods=['get'], url_path=r'nodes/(?P<node_id>[^/]+)', url_name='node')
+    def node(self, request, pk=None, node_id=None):
+        """
+        One node of the pathway, read without loading the rest of the graph (see `agents.pathway_graph`).
+        """
+        get_object_or_404(self.get_queryset().only('pk'), pk=pk)
+        node = get_node(pk, node_id)
+        if node is None:
+            raise NotFound(f'Pathway {pk} has no node {node_id!r}.')
+        return Response(node)
+
+    @action(detail=True, methods=['get'], url_path=r'nodes/(?P<node_id>[^/]+)/edges', url_name='node-edges')
+    def node_edges(self, request, pk=None, node_id=None):
+        """
+        The edges touching one node; `?direction=out` or `in` keeps those leaving or entering it.
+        """
+        direction = request.query_params.get('direction', 'both')
+        if direction not in ('both', 'out', 'in'):
+            raise ValidationError({'direction': ['Must be one of both, out, in.']})
+        get_object_or_404(self.get_queryset().only('pk'), pk=pk)
+        return Response(get_node_edges(pk, node_id, direction))
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_ndjson(self, request, *args, **kwargs):
+        """
+        Imports an NDJSON body, one pathway per line, read incrementally (see `agents.pathway_import`).
+        `?key=` makes the import resumable: sending the same body again under that key skips the lines
+        already committed. `?queue_sync=true` queues a Bland AI create for every imported pathway.
+        """
+        try:
+            batch_size = int(request.query_params.get('batch_size', 0)) or None
+        except ValueError:
+            raise ValidationError({'batch_size': ['Must be an integer.']})
+        summary = import_pathways(
+            request._request,  # Iterating the Django request reads the body line by line
+            key=request.query_params.get('key') or None,
+            batch_size=batch_size,
+            queue_sync=request.query_params.get('queue_sync', '').lower() in ('1', 'true', 'yes'),
+        )
+        return Response(summary, status=status.HTTP_207_MULTI_STATUS if summary['failed'] else status.HTTP_200_OK)
+
+    # Listing is a pure local read. Remote pathways are pulled in by `manage.py reconcile_bland_pathways`.
 
     # def retrieve(self, request, *args, **kwargs):
     #     """
@@ -178,7 +548,10 @@ class ConversationalPathwayViewSet(viewsets.ModelViewSet):
         """
         Called when saving a new ConversationalPathway instance. Synchronizes with Bland AI.
         """
-        client = BlandClient()
+        if sync_via_outbox():
+            return self.perform_create_deferred(serializer)
+
+        client = get_bland_client()
         try:
             with transaction.atomic():
                 #save the pathway locally
@@ -189,6 +562,7 @@ class ConversationalPathwayViewSet(viewsets.ModelViewSet):
                 bland_ai_pathway_id = client.create_conversational_pathway(pathway, self.request.data)
                 
                 pathway.bland_ai_pathway_id = bland_ai_pathway_id
+                pathway.sync_status = SyncStatus.SYNCED
                 pathway.save()
                 logger.info(f"Conversational Pathway '{pathway.name}' synchronized with Bland AI, bland_ai_pathway_id: {bland_ai_pathway_id}.")
                 
@@ -206,6 +580,9 @@ class ConversationalPathwayViewSet(viewsets.ModelViewSet):
                     }
 
                 return Response(response_data, status=status.HTTP_201_CREATED)
+        except BlandServiceUnavailable:
+            logger.error("Bland AI circuit breaker is open. Pathway creation rolled back.")
+            raise
         except APIException as e:
             logger.error(f"APIException during pathway creation: {e}", exc_info=True)
             pathway.delete()
@@ -216,7 +593,10 @@ class ConversationalPathwayViewSet(viewsets.ModelViewSet):
         """
         Updates a Pathway instance and synchronizes the changes with Bland AI.
         """
-        client = BlandClient()
+        if sync_via_outbox():
+            return self.perform_update_deferred(serializer)
+
+        client = get_bland_client()
         try:
             with transaction.atomic():
                 pathway = serializer.save()
@@ -231,6 +611,9 @@ class ConversationalPathwayViewSet(viewsets.ModelViewSet):
                 client.update_conversational_pathway(pathway, self.request.data)
                 logger.info(f"Agent '{pathway.name}' synchronized with Bland AI.")
                 return Response(status=status.HTTP_200_OK)
+        except BlandServiceUnavailable:
+            logger.error("Bland AI circuit breaker is open. Pathway update rolled back.")
+            raise
         except APIException as e:
             logger.error(f"APIException during pathway update: {e}", exc_info=True)
             return Response({"detail": "Error occurred while updating the pathway."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -239,7 +622,10 @@ class ConversationalPathwayViewSet(viewsets.ModelViewSet):
         """
         Called when deleting a ConversationalPathway instance. Synchronizes deletion with Bland AI.
         """
-        client = BlandClient()
+        if sync_via_outbox():
+            return self.perform_destroy_deferred(instance)
+
+        client = get_bland_client()
         try:
             with transaction.atomic():
                 # Attempt to delete from Bland AI
@@ -272,4 +658,14 @@ class ConversationalPathwayViewSet(viewsets.ModelViewSet):
                 "message": "Failed to delete the pathway.",
                 "error": str(e)
             },
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DatabaseStatsView(APIView):
+    """
+    Database connection reuse of the worker process that answers (see agents.db_connections). Staff only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(database_pool_stats())
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import importlib.util
+import json
 import os
 from pathlib import Path
 import sys
@@ -88,9 +90,47 @@ WSGI_APPLICATION = 'conversational_api.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Connection reuse (see agents.db_connections):
+#   'none'       - a new connection per request (default)
+#   'persistent' - keep each thread's connection for DATABASE_CONN_MAX_AGE seconds, health-checked before reuse
+#   'pool'       - psycopg 3's driver-level pool (PostgreSQL with psycopg[pool] installed, otherwise 'none')
+# 'persistent' is only safe under WSGI, where a worker's threads are long-lived. Under ASGI the ORM runs on
+# sync_to_async's thread pool, whose threads each keep a connection that request_finished never closes,
+# so use 'none' (behind a transaction-mode pooler such as Supabase port 6543 or PgBouncer) or 'pool' there.
+DATABASE_POOL_MODE = os.getenv('DATABASE_POOL_MODE', 'none')
+DATABASE_CONN_MAX_AGE = int(os.getenv('DATABASE_CONN_MAX_AGE', '60'))  # Seconds; 0 closes after each request
+DATABASE_CONN_HEALTH_CHECKS = os.getenv('DATABASE_CONN_HEALTH_CHECKS', 'True') == 'True'
+DATABASE_POOL_MIN_SIZE = int(os.getenv('DATABASE_POOL_MIN_SIZE', '2'))  # Per worker process
+DATABASE_POOL_MAX_SIZE = int(os.getenv('DATABASE_POOL_MAX_SIZE', '10'))
+DATABASE_POOL_TIMEOUT = float(os.getenv('DATABASE_POOL_TIMEOUT', '10'))  # Seconds a request waits for a free connection
+
 DATABASES = {
     'default': dj_database_url.config(default='sqlite:///db.sqlite3')
 }
+if DATABASE_POOL_MODE == 'pool' and (
+    DATABASES['default']['ENGINE'] != 'django.db.backends.postgresql' or not importlib.util.find_spec('psycopg_pool')
+):
+    DATABASE_POOL_MODE = 'none'
+if DATABASE_POOL_MODE == 'pool':
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': DATABASE_POOL_MIN_SIZE,
+        'max_size': DATABASE_POOL_MAX_SIZE,
+        'timeout': DATABASE_POOL_TIMEOUT,
+    }
+elif DATABASE_POOL_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = DATABASE_CONN_HEALTH_CHECKS
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/ref/settings/#caches
+# The Bland AI rate limiter keeps its buckets here; use a shared backend (e.g. RedisCache) with several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -138,11 +178,92 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-      'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Keyset pagination on (created_at, id) with ?cursor=, page numbers with ?page= (see agents.pagination)
+    'DEFAULT_PAGINATION_CLASS': 'agents.pagination.CursorOrPageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
+    # orjson-backed JSON when it is installed, DRF's stdlib JSON otherwise (same output for the API's data)
+    'DEFAULT_RENDERER_CLASSES': [
+        'agents.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'agents.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Pagination of list requests that ask for neither ?page= nor ?cursor=: 'page' keeps the page-number format
+# for existing clients, 'cursor' switches them to keyset pagination. ?page_size= is capped at the maximum.
+LIST_PAGINATION_DEFAULT = os.getenv('LIST_PAGINATION_DEFAULT', 'page')
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv('PAGINATION_MAX_PAGE_SIZE', '100'))
+
+# List endpoints map `.values()` rows straight to JSON instead of running the serializer per row (same output)
+VALUES_LIST_SERIALIZATION = os.getenv('VALUES_LIST_SERIALIZATION', 'True') == 'True'
+# `GET <resource>/export/` streams NDJSON, reading this many rows per database round trip
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+# NDJSON pathway imports write this many lines per transaction (and resume from the last one committed)
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+# Keep pathway nodes and edges in the PathwayNode/PathwayEdge tables as well as the JSON documents, for node-level
+# reads. Run `manage.py sync_pathway_graphs` after turning it on to fill the tables for existing pathways.
+PATHWAY_GRAPH_TABLES = os.getenv('PATHWAY_GRAPH_TABLES', 'False') == 'True'
+
+# Agent prompts are converted to scripts by 'html_parser' (single pass, agents.script_converter) or 'bleach'
+# (bleach + BeautifulSoup, the original pipeline). Both produce the same script.
+HTML_TO_SCRIPT_CONVERTER = os.getenv('HTML_TO_SCRIPT_CONVERTER', 'html_parser')
+# Scripts are memoized by prompt hash in a per-process LRU (0 disables) and, when HTML_TO_SCRIPT_SHARED_CACHE
+# names a cache alias, in that cache too. Prompts longer than the maximum length are never cached.
+HTML_TO_SCRIPT_CACHE_SIZE = int(os.getenv('HTML_TO_SCRIPT_CACHE_SIZE', '1024'))
+HTML_TO_SCRIPT_CACHE_MAX_PROMPT_LENGTH = int(os.getenv('HTML_TO_SCRIPT_CACHE_MAX_PROMPT_LENGTH', '65536'))  # Characters
+HTML_TO_SCRIPT_SHARED_CACHE = os.getenv('HTML_TO_SCRIPT_SHARED_CACHE', '')
+HTML_TO_SCRIPT_SHARED_CACHE_TIMEOUT = int(os.getenv('HTML_TO_SCRIPT_SHARED_CACHE_TIMEOUT', '86400'))  # Seconds
+
+# Bland AI client
+# One pooled client is shared by all threads of a worker process (see agents.bland_client.get_bland_client).
+# Point BLAND_AI_BASE_URL at `manage.py run_fake_bland` for load and latency testing without the real API
+BLAND_AI_BASE_URL = os.getenv('BLAND_AI_BASE_URL', 'https://api.bland.ai/v1')
+BLAND_AI_POOL_CONNECTIONS = int(os.getenv('BLAND_AI_POOL_CONNECTIONS', '10'))  # Number of host pools to keep
+BLAND_AI_POOL_MAXSIZE = int(os.getenv('BLAND_AI_POOL_MAXSIZE', '20'))  # Connections kept open per host
+BLAND_AI_KEEPALIVE = os.getenv('BLAND_AI_KEEPALIVE', 'True') == 'True'
+BLAND_AI_WARM_CONNECTIONS = int(os.getenv('BLAND_AI_WARM_CONNECTIONS', '0'))  # Connections opened when a worker boots
+# Every Bland AI call (retries and backoff included) must finish within BLAND_AI_REQUEST_BUDGET seconds
+BLAND_AI_REQUEST_BUDGET = float(os.getenv('BLAND_AI_REQUEST_BUDGET', '15'))
+BLAND_AI_MAX_RETRIES = int(os.getenv('BLAND_AI_MAX_RETRIES', '5'))
+BLAND_AI_BACKOFF_FACTOR = float(os.getenv('BLAND_AI_BACKOFF_FACTOR', '1'))
+# Circuit breaker shared by all Bland AI calls of a process; while open, writes fail fast with a 503
+BLAND_AI_BREAKER_FAILURE_RATE = float(os.getenv('BLAND_AI_BREAKER_FAILURE_RATE', '0.5'))
+BLAND_AI_BREAKER_MINIMUM_CALLS = int(os.getenv('BLAND_AI_BREAKER_MINIMUM_CALLS', '10'))
+BLAND_AI_BREAKER_WINDOW_SIZE = int(os.getenv('BLAND_AI_BREAKER_WINDOW_SIZE', '20'))
+BLAND_AI_BREAKER_RESET_TIMEOUT = float(os.getenv('BLAND_AI_BREAKER_RESET_TIMEOUT', '30'))  # Seconds open before a trial call
+BLAND_AI_BREAKER_HALF_OPEN_CALLS = int(os.getenv('BLAND_AI_BREAKER_HALF_OPEN_CALLS', '1'))
+# Outbound rate limits in requests per BLAND_AI_RATE_LIMIT_PERIOD seconds, shared by all workers through the
+# cache (0 disables). BLAND_AI_RATE_LIMITS overrides them per API key: {"<api key>": {"read": 20, "write": 5}}
+BLAND_AI_READ_RATE_LIMIT = int(os.getenv('BLAND_AI_READ_RATE_LIMIT', '0'))
+BLAND_AI_WRITE_RATE_LIMIT = int(os.getenv('BLAND_AI_WRITE_RATE_LIMIT', '0'))
+BLAND_AI_RATE_LIMIT_PERIOD = float(os.getenv('BLAND_AI_RATE_LIMIT_PERIOD', '1'))
+BLAND_AI_RATE_LIMITS = json.loads(os.getenv('BLAND_AI_RATE_LIMITS', '{}'))
+BLAND_AI_RATE_LIMIT_CACHE = 'default'
+# 'inline' calls Bland AI inside the request; 'outbox' queues the call for `manage.py dispatch_bland_outbox`
+BLAND_AI_SYNC_MODE = os.getenv('BLAND_AI_SYNC_MODE', 'inline')
+BLAND_OUTBOX_MAX_ATTEMPTS = int(os.getenv('BLAND_OUTBOX_MAX_ATTEMPTS', '5'))
+BLAND_OUTBOX_RETRY_BACKOFF = int(os.getenv('BLAND_OUTBOX_RETRY_BACKOFF', '5'))  # Seconds, doubled per failed attempt
+BLAND_OUTBOX_LOCK_TIMEOUT = int(os.getenv('BLAND_OUTBOX_LOCK_TIMEOUT', '300'))  # Seconds before a claimed event is re-queued
+# With BLAND_AI_SYNC_MODE=debounced, updates wait this long for later saves of the same object before one push
+BLAND_AI_SYNC_DEBOUNCE_SECONDS = float(os.getenv('BLAND_AI_SYNC_DEBOUNCE_SECONDS', '10'))
+BLAND_AI_SYNC_DEBOUNCE_MAX_WAIT = float(os.getenv('BLAND_AI_SYNC_DEBOUNCE_MAX_WAIT', '60'))  # Upper bound on the delay
+BLAND_AI_BULK_CONCURRENCY = int(os.getenv('BLAND_AI_BULK_CONCURRENCY', '16'))  # Parallel Bland AI calls per bulk request
+BULK_CREATE_MAX_ITEMS = int(os.getenv('BULK_CREATE_MAX_ITEMS', '1000'))
+BLAND_AI_ASYNC_MAX_CONNECTIONS = int(os.getenv('BLAND_AI_ASYNC_MAX_CONNECTIONS', '200'))  # In-flight calls per event loop (ASGI)
+
+# Idempotency-Key support on create endpoints
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', '86400'))  # Seconds a stored response is replayed
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', '10'))  # Seconds a duplicate waits before a 409
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', '120'))  # Seconds before an unfinished key is taken over
+
+# Optimistic concurrency on updates (If-Match / version)
+VERSION_CONFLICT_RETRIES = int(os.getenv('VERSION_CONFLICT_RETRIES', '3'))  # Re-reads of an unconditional update that lost a race
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
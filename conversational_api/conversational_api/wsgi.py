@@ -17,3 +17,8 @@ load_dotenv()
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conversational_api.settings')
 
 application = get_wsgi_application()
+
+# Open pooled connections to Bland AI before the worker takes traffic
+from agents.bland_client import warm_bland_client  # noqa: E402
+
+warm_bland_client()